@@ -1,13 +1,132 @@
+from __future__ import annotations
+
+import dataclasses
+import json
 import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
 
-from config import WEBEX_USER_EMAIL
+from config import (
+    BRIDGE_USER_HOMES_DIR,
+    BRIDGE_USERS_FILE,
+    CLI_TIMEOUT_SECONDS,
+    WEBEX_ALLOWED_DOMAINS,
+    WEBEX_ALLOWED_USERS,
+    WEBEX_USER_EMAIL,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def _home_name(email: str) -> str:
+    """A directory name for a user's Claude home that can't escape the homes directory."""
+    name = re.sub(r"[^a-z0-9@._+-]", "_", email)
+    return "_" if name in ("", ".", "..") else name
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Per-user settings applied to a user's rooms and Claude runs."""
+
+    email: str
+    # Claude home (CLAUDE_CONFIG_DIR) for this user's sessions; None uses the bridge's own
+    claude_config_dir: Path | None = None
+    allow_skip_permissions: bool = False
+    cli_timeout_seconds: float = CLI_TIMEOUT_SECONDS
+
+
+class Authorizer:
+    """Who may use the bridge: the owner, listed addresses, whole domains, and users with a profile.
+
+    Everything is normalized up front, so a check is one or two set lookups however
+    many users are configured. Only the owner uses the bridge's own Claude home and
+    may use skip-permissions mode by default; everyone else gets a home of their own
+    under user_homes and safe mode, unless their profile says otherwise.
+    """
+
+    def __init__(
+        self,
+        emails: Iterable[str] = (),
+        domains: Iterable[str] = (),
+        profiles: Iterable[UserProfile] = (),
+        owner: str = "",
+        user_homes: Path = BRIDGE_USER_HOMES_DIR,
+    ) -> None:
+        self._owner = normalize_email(owner)
+        self._user_homes = user_homes
+        self._profiles = {}
+        for p in profiles:
+            email = normalize_email(p.email)
+            if p.claude_config_dir is None and email != self._owner:
+                p = dataclasses.replace(p, claude_config_dir=self._own_home(email))
+            self._profiles[email] = p
+        self._emails = frozenset(normalize_email(e) for e in emails if e.strip()).union(self._profiles)
+        if self._owner:
+            self._emails |= {self._owner}
+        self._domains = frozenset(d.strip().lower().lstrip("@") for d in domains if d.strip())
+
+    def is_authorized(self, email: str) -> bool:
+        email = normalize_email(email)
+        if email in self._emails:
+            return True
+        local, at, domain = email.rpartition("@")
+        return bool(local and at) and domain in self._domains
+
+    def profile(self, email: str) -> UserProfile:
+        """Settings for a user; users without an entry in the users file get the defaults."""
+        email = normalize_email(email)
+        profile = self._profiles.get(email)
+        if profile is not None:
+            return profile
+        if email == self._owner:
+            return UserProfile(email, allow_skip_permissions=True)
+        return UserProfile(email, claude_config_dir=self._own_home(email))
+
+    def _own_home(self, email: str) -> Path:
+        return self._user_homes / _home_name(email)
+
+
+def load_profiles(path: Path) -> list[UserProfile]:
+    """Read the users file: {"alice@example.com": {"claude_config_dir": "...", ...}, ...}.
+
+    Keys of each entry: claude_config_dir, allow_skip_permissions (default false),
+    cli_timeout_seconds. A missing or invalid file is logged and ignored, so it can
+    only ever grant less.
+    """
+    try:
+        data = json.loads(path.read_text())
+        profiles = []
+        for email, settings in data.items():
+            config_dir = settings.get("claude_config_dir")
+            profiles.append(UserProfile(
+                email=normalize_email(email),
+                claude_config_dir=Path(config_dir).expanduser() if config_dir else None,
+                allow_skip_permissions=bool(settings.get("allow_skip_permissions", False)),
+                cli_timeout_seconds=float(settings.get("cli_timeout_seconds", CLI_TIMEOUT_SECONDS)),
+            ))
+    except (OSError, ValueError, TypeError, AttributeError) as exc:
+        logger.error("Ignoring users file %s: %s", path, exc)
+        return []
+    return profiles
+
+
+authorizer = Authorizer(
+    WEBEX_ALLOWED_USERS,
+    WEBEX_ALLOWED_DOMAINS,
+    load_profiles(BRIDGE_USERS_FILE) if BRIDGE_USERS_FILE is not None else [],
+    owner=WEBEX_USER_EMAIL,
+)
+
+
 def is_authorized(person_email: str) -> bool:
-    """Check if the sender's email matches the authorized user."""
-    if person_email.lower() == WEBEX_USER_EMAIL.lower():
+    """Check if the sender may use the bridge."""
+    if authorizer.is_authorized(person_email):
         return True
     logger.warning("Unauthorized message from: %s", person_email)
     return False
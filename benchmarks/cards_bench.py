@@ -0,0 +1,193 @@
+"""Micro-benchmark: Adaptive Card templates (cards.py) vs building and serializing dicts per message.
+
+Each case produces the bytes of a /messages request body. The "dict" column is
+what the bot did before templates: build the nested card dict, wrap it in the
+message body, and json-encode the whole thing (as httpx does for json=). The
+"template" column renders the pre-serialized template and wraps it with
+webex_api.encode_card_message; for the welcome card the body is cached.
+
+    python benchmarks/cards_bench.py
+    python benchmarks/cards_bench.py --number 20000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ["BRIDGE_STATE_DIR"] = tempfile.mkdtemp(prefix="bridge-bench-")
+os.environ.setdefault("WEBEX_BOT_TOKEN", "bench-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "bench@example.com")
+
+import bot  # noqa: E402
+import cards  # noqa: E402
+from sessions import SessionInfo  # noqa: E402
+from webex_api import ADAPTIVE_CARD_CONTENT_TYPE, encode_card_message  # noqa: E402
+
+SESSIONS = [
+    SessionInfo(
+        session_id=f"5f0c8e2a-1b7d-4c3e-9a{n:02d}-3d2e1f0a9b8c",
+        project="/home/dev/work/project",
+        display=f"fix the failing test in sessions.py and explain the retry loop, attempt {n}",
+        timestamp=int(time.time() * 1000) - n * 3_600_000,
+        cwd="/home/dev/work/project",
+        session_path=Path("/dev/null"),
+    )
+    for n in range(5)
+]
+
+
+def _message_bytes(room_id: str, card: dict, fallback: str) -> bytes:
+    body = {
+        "roomId": room_id,
+        "text": fallback,
+        "attachments": [{"contentType": ADAPTIVE_CARD_CONTENT_TYPE, "content": card}],
+    }
+    # What httpx does with json=
+    return json.dumps(body).encode("utf-8")
+
+
+def _dict_card(*body: dict) -> dict:
+    return {"$schema": cards.CARD_SCHEMA, "type": "AdaptiveCard", "version": "1.2", "body": list(body)}
+
+
+def dict_welcome(room_id: str) -> bytes:
+    commands = [
+        ("/new [dir]", "Start a new session"), ("/sessions", "List recent sessions"),
+        ("/resume N", "Resume session N from the list"), ("/resume", "Quick-resume latest session"),
+        ("/disconnect", "Disconnect from session"), ("/status", "Show connection info"),
+        ("/safe", "Toggle permission mode"), ("/cancel", "Cancel a running command"),
+    ]
+    card = _dict_card(
+        {"type": "TextBlock", "text": "Claude Code Bridge", "size": "Medium", "weight": "Bolder"},
+        {"type": "FactSet", "facts": [{"title": cmd, "value": desc} for cmd, desc in commands]},
+        {
+            "type": "Container", "separator": True, "style": "accent",
+            "items": [{
+                "type": "TextBlock", "text": "Tip: Use `/resume` to jump straight into your latest session.",
+                "wrap": True, "weight": "Bolder",
+            }],
+        },
+    )
+    return _message_bytes(room_id, card, bot.WELCOME_FALLBACK)
+
+
+def dict_sessions(room_id: str) -> bytes:
+    body = [{"type": "TextBlock", "text": "Recent Sessions", "size": "Medium", "weight": "Bolder"}]
+    for i, s in enumerate(SESSIONS, 1):
+        body.append({
+            "type": "Container",
+            "separator": True,
+            "items": [{
+                "type": "ColumnSet",
+                "columns": [
+                    {
+                        "type": "Column", "width": "auto", "verticalContentAlignment": "Center",
+                        "items": [{"type": "TextBlock", "text": str(i), "size": "Large", "weight": "Bolder"}],
+                    },
+                    {
+                        "type": "Column", "width": "stretch",
+                        "items": [
+                            {"type": "TextBlock", "text": bot._session_display(s), "weight": "Bolder", "wrap": True},
+                            {
+                                "type": "TextBlock",
+                                "text": f"{s.session_id} · {bot._relative_time(s.timestamp)}",
+                                "size": "Small", "isSubtle": True, "spacing": "None",
+                            },
+                        ],
+                    },
+                ],
+            }],
+        })
+    body.append({
+        "type": "Container", "separator": True, "style": "accent",
+        "items": [{
+            "type": "TextBlock", "text": "Reply `/resume N` to connect (e.g. `/resume 1`)",
+            "weight": "Bolder", "wrap": True,
+        }],
+    })
+    return _message_bytes(room_id, _dict_card(*body), "fallback")
+
+
+def dict_status(room_id: str) -> bytes:
+    card = _dict_card(
+        {"type": "TextBlock", "text": "Status", "size": "Medium", "weight": "Bolder"},
+        {"type": "FactSet", "facts": [
+            {"title": "Session", "value": "fix the failing test"},
+            {"title": "Directory", "value": ".../work/project"},
+            {"title": "Mode", "value": "safe (Ask before tools)"},
+        ]},
+    )
+    card["body"][1]["facts"].append({"title": "Running", "value": "1m 5s"})
+    return _message_bytes(room_id, card, "fallback")
+
+
+def template_welcome(room_id: str) -> bytes:
+    return bot._welcome_request("roomId", room_id)
+
+
+def template_sessions(room_id: str) -> bytes:
+    return encode_card_message({"roomId": room_id}, bot._build_sessions_card(SESSIONS), "fallback")
+
+
+def template_status(room_id: str) -> bytes:
+    card = cards.STATUS_CONNECTED.render(
+        session="fix the failing test", directory=".../work/project", mode="safe (Ask before tools)",
+        extra=[cards.FACT.render(title="Running", value="1m 5s")],
+    )
+    return encode_card_message({"roomId": room_id}, card, "fallback")
+
+
+CASES = {
+    "welcome": (dict_welcome, template_welcome),
+    "sessions": (dict_sessions, template_sessions),
+    "status": (dict_status, template_status),
+}
+
+
+def _per_call_us(func, room_id: str, number: int, repeat: int) -> float:
+    return min(timeit.repeat(lambda: func(room_id), number=number, repeat=repeat)) / number * 1e6
+
+
+def run(number: int, repeat: int) -> dict:
+    report = {}
+    for name, (build_dict, render_template) in CASES.items():
+        # Same request body either way (key order aside), so the comparison is like for like
+        assert json.loads(build_dict("room-1")) == json.loads(render_template("room-1")), name
+        dict_us = _per_call_us(build_dict, "room-1", number, repeat)
+        template_us = _per_call_us(render_template, "room-1", number, repeat)
+        report[name] = {
+            "dict_us": round(dict_us, 2),
+            "template_us": round(template_us, 2),
+            "speedup": round(dict_us / template_us, 1),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=5000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.number, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'card':<10} {'dict (us)':>10} {'template (us)':>14} {'speedup':>8}")
+    for name, result in report.items():
+        print(f"{name:<10} {result['dict_us']:>10} {result['template_us']:>14} {result['speedup']:>7}x")
+
+
+if __name__ == "__main__":
+    main()
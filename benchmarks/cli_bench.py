@@ -0,0 +1,160 @@
+"""Benchmarks for claude_cli._run_cli against the fake CLI (tests/fake_claude.py).
+
+Measures, without a real Claude install:
+  spawn     per-run overhead of a trivial turn (spawn, capture, exit)
+  stream    output throughput for large replies, in text and stream-json mode
+  timeout   how long after the deadline a hung CLI's turn returns
+  cancel    time from cancelling a turn until its process group is gone
+
+    python benchmarks/cli_bench.py
+    python benchmarks/cli_bench.py --runs 50 --output-mb 16 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+FAKE_CLAUDE = ROOT / "tests" / "fake_claude.py"
+
+# Config is read at import time: use the fake CLI and keep the process registry out of ~/
+os.environ["CLAUDE_CLI_PATH"] = str(FAKE_CLAUDE)
+os.environ["BRIDGE_STATE_DIR"] = tempfile.mkdtemp(prefix="bridge-bench-")
+os.environ.setdefault("WEBEX_BOT_TOKEN", "bench-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "bench@example.com")
+
+import claude_cli  # noqa: E402
+import event_loop  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def _fake_env(**settings: object) -> None:
+    for name in [n for n in os.environ if n.startswith("FAKE_CLAUDE_")]:
+        del os.environ[name]
+    for name, value in settings.items():
+        os.environ[f"FAKE_CLAUDE_{name.upper()}"] = str(value)
+
+
+async def bench_spawn(runs: int, cwd: str) -> dict:
+    _fake_env()
+    timings = []
+    for n in range(runs):
+        started = time.perf_counter()
+        await claude_cli.send_message("bench-session", f"ping {n}", cwd)
+        timings.append(time.perf_counter() - started)
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(timings, 50) * 1000, 1),
+        "p95_ms": round(percentile(timings, 95) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1),
+    }
+
+
+async def bench_stream(output_mb: float, cwd: str) -> dict:
+    size = int(output_mb * 1024 * 1024)
+    results = {}
+    for mode, on_tool_use in (("text", None), ("stream-json", lambda name: None)):
+        _fake_env(output_bytes=size, chunks=64, tool_calls=10)
+        started = time.perf_counter()
+        reply = await claude_cli.send_message("bench-session", "big", cwd, on_tool_use=on_tool_use)
+        elapsed = time.perf_counter() - started
+        results[mode] = {
+            "seconds": round(elapsed, 3),
+            "mb_per_s": round(output_mb / elapsed, 1),
+            "reply_chars": len(reply),
+        }
+    return results
+
+
+async def bench_timeout(timeout: float, cwd: str) -> dict:
+    _fake_env(hang="child")
+    with patch.object(claude_cli, "CLI_TIMEOUT_SECONDS", timeout):
+        started = time.perf_counter()
+        reply = await claude_cli.send_message("bench-session", "hang", cwd)
+        elapsed = time.perf_counter() - started
+    return {
+        "timeout_s": timeout,
+        "returned_after_s": round(elapsed, 3),
+        "overshoot_ms": round((elapsed - timeout) * 1000, 1),
+        "timed_out": reply.startswith("Error: CLI timed out"),
+    }
+
+
+async def bench_cancel(runs: int, cwd: str) -> dict:
+    _fake_env(hang="child")
+    timings = []
+    for _ in range(runs):
+        started_event = asyncio.Event()
+        task = asyncio.ensure_future(
+            claude_cli.send_message("bench-session", "hang", cwd, on_process_started=lambda p: started_event.set())
+        )
+        await started_event.wait()
+        await asyncio.sleep(0.2)  # Let the fake start its child
+        started = time.perf_counter()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        timings.append(time.perf_counter() - started)
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(timings, 50) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    cwd = tempfile.mkdtemp(prefix="bridge-bench-cwd-")
+    # Oversized replies spill to temp files; keep them next to the benchmark's other files
+    tempfile.tempdir = os.environ["BRIDGE_STATE_DIR"]
+    report: dict = {}
+    if "spawn" in args.only:
+        report["spawn"] = await bench_spawn(args.runs, cwd)
+    if "stream" in args.only:
+        report["stream"] = await bench_stream(args.output_mb, cwd)
+    if "timeout" in args.only:
+        report["timeout"] = await bench_timeout(args.timeout, cwd)
+    if "cancel" in args.only:
+        report["cancel"] = await bench_cancel(max(1, args.runs // 10), cwd)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="turns for the spawn benchmark (cancel uses a tenth)")
+    parser.add_argument("--output-mb", type=float, default=4.0, help="reply size for the stream benchmark")
+    parser.add_argument("--timeout", type=float, default=1.0, help="CLI timeout for the timeout benchmark")
+    parser.add_argument(
+        "--only", nargs="+", default=["spawn", "stream", "timeout", "cancel"],
+        choices=["spawn", "stream", "timeout", "cancel"],
+    )
+    parser.add_argument("--loop", default="asyncio", choices=event_loop.BACKENDS, help="event loop backend")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    report = event_loop.run(run(args), args.loop)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for name, result in report.items():
+        print(f"{name}:")
+        for key, value in result.items():
+            print(f"  {key:<16} {value}")
+
+
+if __name__ == "__main__":
+    main()
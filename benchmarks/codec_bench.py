@@ -0,0 +1,96 @@
+"""Micro-benchmark: JSON codecs (json_codec.py) on the bodies a poll cycle handles.
+
+  decode   a /messages page as Webex returns it (html, files, mentions, ...)
+  encode   a reply POST body
+
+    python benchmarks/codec_bench.py
+    python benchmarks/codec_bench.py --messages 100 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ["BRIDGE_STATE_DIR"] = tempfile.mkdtemp(prefix="bridge-bench-")
+os.environ.setdefault("WEBEX_BOT_TOKEN", "bench-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "bench@example.com")
+
+import json_codec  # noqa: E402
+
+FILLER = "The retry loop backs off with jitter and the session index is refreshed when the file changes. "
+
+
+def messages_page(count: int) -> bytes:
+    items = []
+    for n in range(count):
+        text = f"message {n}: " + FILLER * (1 + n % 8)
+        items.append({
+            "id": f"Y2lzY29zcGFyazovL3VzL01FU1NBR0UvbWVzc2FnZS0{n:06d}",
+            "roomId": "Y2lzY29zcGFyazovL3VzL1JPT00vcm9vbS0x",
+            "roomType": "direct",
+            "text": text,
+            "markdown": text,
+            "html": f"<p>{text}</p>",
+            "personId": "Y2lzY29zcGFyazovL3VzL1BFT1BMRS9wZXJzb24tMQ",
+            "personEmail": "user@example.com",
+            "mentionedPeople": [],
+            "files": [f"https://webexapis.com/v1/contents/file-{n}"] if n % 10 == 0 else [],
+            "created": f"2026-10-19T12:{n % 60:02d}:00.000Z",
+            "updated": f"2026-10-19T12:{n % 60:02d}:00.000Z",
+        })
+    return json.dumps({"items": items}).encode()
+
+
+def _per_call_us(func, number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def run(messages: int, number: int, repeat: int) -> dict:
+    page = messages_page(messages)
+    reply = {"roomId": "Y2lzY29zcGFyazovL3VzL1JPT00vcm9vbS0x", "markdown": FILLER * 60}
+    codecs = {"stdlib": json_codec.STDLIB, "orjson": json_codec.ORJSON}
+    report: dict = {"page_kb": round(len(page) / 1024, 1)}
+    for name, codec in codecs.items():
+        if codec is None:
+            report[name] = "not installed"
+            continue
+        report[name] = {
+            "decode_us": round(_per_call_us(lambda: codec.loads(page), number, repeat), 1),
+            "encode_reply_us": round(_per_call_us(lambda: codec.dumps(reply), number * 10, repeat), 2),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100, help="messages per page (Webex max is 100)")
+    parser.add_argument("--number", type=int, default=200, help="decodes per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best is reported)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.messages, args.number, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"/messages page: {args.messages} messages, {report.pop('page_kb')} KB")
+    for name, result in report.items():
+        print(f"{name}:")
+        if isinstance(result, str):
+            print(f"  {result}")
+            continue
+        for key, value in result.items():
+            print(f"  {key:<16} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Generate a synthetic Claude home (history.jsonl + projects/*/*.jsonl) for benchmarks.
+
+The layout matches what sessions.py reads: history.jsonl has one line per prompt,
+each carrying a sessionId and project path. projects/<encoded project>/<sessionId>.jsonl
+holds the transcript, whose first user entry carries the cwd. Sizes, malformed-line
+rate and the share of history sessions whose transcript was deleted are configurable.
+
+    python benchmarks/gen_claude_home.py /tmp/claude-home --sessions 2000 --history-lines 50000 --session-kb 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROMPTS = [
+    "git status summary", "what changed since yesterday?", "fix the failing test in {f}",
+    "explain {f}", "add logging to {f}", "refactor the retry loop", "why is CI red?",
+    "write a docstring for {f}", "run the benchmarks", "summarize the open TODOs",
+]
+FILES = ["bot.py", "webex_api.py", "sessions.py", "config.py", "src/app/main.ts", "README.md"]
+FILLER = (
+    "The change updates the handler so that retries back off with jitter and the "
+    "session index is refreshed only when the underlying file changes. "
+)
+
+
+def _encode_project_path(project: str) -> str:
+    return project.replace("/", "-")
+
+
+def _malformed(rng: random.Random) -> str:
+    return rng.choice(["{\"type\": \"user\", \"cwd\": ", "not json at all", "", "[1, 2", "{}}"])
+
+
+def _transcript_lines(rng: random.Random, session_id: str, project: str, target_bytes: int, malformed: float):
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(500_000))
+    written = 0
+    turn = 0
+    # Real transcripts often open with non-user entries before the first user message
+    yield json.dumps({"type": "summary", "summary": "Synthetic session", "leafUuid": str(uuid.uuid4())})
+    while written < target_bytes or turn == 0:
+        if malformed and rng.random() < malformed:
+            line = _malformed(rng)
+        elif turn % 2 == 0:
+            line = json.dumps({
+                "type": "user",
+                "sessionId": session_id,
+                "cwd": project,
+                "uuid": str(uuid.uuid4()),
+                "timestamp": (started + timedelta(seconds=turn * 30)).isoformat(),
+                "message": {"role": "user", "content": rng.choice(PROMPTS).format(f=rng.choice(FILES))},
+            })
+        else:
+            line = json.dumps({
+                "type": "assistant",
+                "sessionId": session_id,
+                "uuid": str(uuid.uuid4()),
+                "timestamp": (started + timedelta(seconds=turn * 30 + 12)).isoformat(),
+                "message": {"role": "assistant", "content": [{"type": "text", "text": FILLER * rng.randint(1, 40)}]},
+            })
+        written += len(line) + 1
+        turn += 1
+        yield line
+
+
+def generate(
+    out: Path,
+    sessions: int = 500,
+    history_lines: int = 10_000,
+    session_kb: float = 64.0,
+    projects: int = 20,
+    malformed: float = 0.01,
+    missing: float = 0.05,
+    seed: int = 1,
+) -> dict:
+    """Write a synthetic Claude home under out/ and return a summary of what was written."""
+    rng = random.Random(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    projects_dir = out / "projects"
+    project_paths = [f"/home/dev/work/project-{n}" for n in range(projects)]
+    session_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(sessions)]
+    session_project = {sid: rng.choice(project_paths) for sid in session_ids}
+
+    # Skewed activity: a few sessions get most of the prompts, as in real use
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(sessions)))
+    base_ms = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    history_bytes = 0
+    with open(out / "history.jsonl", "w") as f:
+        for n in range(history_lines):
+            if malformed and rng.random() < malformed:
+                line = _malformed(rng)
+            else:
+                sid = rng.choices(session_ids, cum_weights=cum_weights)[0]
+                line = json.dumps({
+                    "display": rng.choice(PROMPTS).format(f=rng.choice(FILES)),
+                    "pastedContents": {},
+                    "timestamp": base_ms + n * 60_000,
+                    "project": session_project[sid],
+                    "sessionId": sid,
+                })
+            history_bytes += len(line) + 1
+            f.write(line + "\n")
+
+    transcript_bytes = 0
+    transcripts = 0
+    for sid in session_ids:
+        if rng.random() < missing:
+            continue  # Listed in history, but the transcript was deleted
+        project = session_project[sid]
+        directory = projects_dir / _encode_project_path(project)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = int(rng.expovariate(1 / (session_kb * 1024)))
+        with open(directory / f"{sid}.jsonl", "w") as f:
+            for line in _transcript_lines(rng, sid, project, target, malformed):
+                transcript_bytes += len(line) + 1
+                f.write(line + "\n")
+        transcripts += 1
+
+    return {
+        "home": str(out),
+        "sessions": sessions,
+        "transcripts": transcripts,
+        "history_lines": history_lines,
+        "history_mb": round(history_bytes / 2**20, 2),
+        "transcripts_mb": round(transcript_bytes / 2**20, 2),
+        "session_ids": session_ids,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out", type=Path, help="directory to create (becomes the Claude home)")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--history-lines", type=int, default=10_000)
+    parser.add_argument("--session-kb", type=float, default=64.0, help="mean transcript size (exponential)")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--malformed", type=float, default=0.01, help="fraction of malformed lines")
+    parser.add_argument("--missing", type=float, default=0.05, help="fraction of sessions without a transcript")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    summary = generate(
+        args.out, args.sessions, args.history_lines, args.session_kb,
+        args.projects, args.malformed, args.missing, args.seed,
+    )
+    summary.pop("session_ids")
+    print(json.dumps(summary, indent=2))
+    print(f"\nCLAUDE_HISTORY_FILE={args.out / 'history.jsonl'}")
+    print(f"CLAUDE_PROJECTS_DIR={args.out / 'projects'}")
+
+
+if __name__ == "__main__":
+    main()
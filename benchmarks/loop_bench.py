@@ -0,0 +1,99 @@
+"""The bridge on the asyncio event loop vs uvloop (event_loop.py, BRIDGE_EVENT_LOOP).
+
+Runs poll_load.py (poll cycles against the mock Webex server) and cli_bench.py
+(turns against the fake claude CLI) once per backend with the same arguments, and
+prints the numbers side by side:
+  poll      messages/s handled, detection latency, mean poll-cycle time
+  spawn     per-turn subprocess overhead
+  stream    CLI output throughput (text mode) and cancel time
+
+The mock server runs in the bridge's process, so it gets the same loop as the bridge.
+uvloop is skipped when it is not installed (pip install uvloop).
+
+    python benchmarks/loop_bench.py
+    python benchmarks/loop_bench.py --rooms 50 --rate 100 --duration 10 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import event_loop  # noqa: E402
+
+BENCHMARKS = Path(__file__).resolve().parent
+
+
+def _run(script: str, loop: str, extra: list[str]) -> dict:
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARKS / script), "--json", "--loop", loop, *extra],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def run(args: argparse.Namespace) -> dict:
+    poll_args = [
+        "--rooms", str(args.rooms), "--rate", str(args.rate), "--duration", str(args.duration),
+        "--interval", str(args.interval), "--latency", "0", "--jitter", "0", "--echo",
+    ]
+    cli_args = ["--runs", str(args.runs), "--output-mb", str(args.output_mb), "--only", "spawn", "stream", "cancel"]
+    report: dict = {}
+    for loop in ("asyncio", "uvloop"):
+        if loop == "uvloop" and event_loop.uvloop is None:
+            report[loop] = None
+            continue
+        poll = _run("poll_load.py", loop, poll_args)
+        cli = _run("cli_bench.py", loop, cli_args)
+        report[loop] = {
+            "throughput": poll["throughput"],
+            "detection_p50_ms": poll["detection_ms"]["p50"],
+            "detection_p95_ms": poll["detection_ms"]["p95"],
+            "poll_cycle_ms": poll["poll_cycle_ms"],
+            "spawn_p50_ms": cli["spawn"]["p50_ms"],
+            "stream_mb_per_s": cli["stream"]["text"]["mb_per_s"],
+            "cancel_p50_ms": cli["cancel"]["p50_ms"],
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20, help="simulated users for the poll benchmark")
+    parser.add_argument("--rate", type=float, default=40.0, help="messages per second across all rooms")
+    parser.add_argument("--duration", type=float, default=8.0, help="seconds of poll load")
+    parser.add_argument("--interval", type=float, default=0.2, help="poll interval")
+    parser.add_argument("--runs", type=int, default=30, help="turns for the spawn benchmark")
+    parser.add_argument("--output-mb", type=float, default=8.0, help="reply size for the stream benchmark")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    rows = [
+        ("poll throughput (msg/s)", "throughput"),
+        ("detection p50 (ms)", "detection_p50_ms"),
+        ("detection p95 (ms)", "detection_p95_ms"),
+        ("poll cycle mean (ms)", "poll_cycle_ms"),
+        ("spawn p50 (ms)", "spawn_p50_ms"),
+        ("stream (MB/s)", "stream_mb_per_s"),
+        ("cancel p50 (ms)", "cancel_p50_ms"),
+    ]
+    print(f"{'':<26}{'asyncio':>10}{'uvloop':>10}")
+    for label, key in rows:
+        cells = [f"{report[loop][key]:>10}" if report[loop] else f"{'-':>10}" for loop in ("asyncio", "uvloop")]
+        print(f"{label:<26}{''.join(cells)}")
+    if report["uvloop"] is None:
+        print("uvloop is not installed (pip install uvloop); only asyncio was measured")
+
+
+if __name__ == "__main__":
+    main()
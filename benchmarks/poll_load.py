@@ -0,0 +1,191 @@
+"""Load test for bot.poll_loop against the mock Webex server (tests/mock_webex.py).
+
+Simulated users post messages across many rooms at a fixed rate while the real
+poll loop runs against the mock. Turns are replaced by a recorder (optionally
+echoing a reply, to exercise delivery), so only polling and Webex traffic are
+measured. Reports throughput, detection latency percentiles and API call counts.
+
+    python benchmarks/poll_load.py --rooms 20 --rate 10 --duration 30 --latency 0.05
+    python benchmarks/poll_load.py --rate-limit 0.02 --echo --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Config is read at import time: keep the benchmark's cursors out of the real state directory
+os.environ["BRIDGE_STATE_DIR"] = tempfile.mkdtemp(prefix="bridge-bench-")
+os.environ.setdefault("WEBEX_BOT_TOKEN", "bench-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "user0@example.com")
+
+import bot  # noqa: E402
+import event_loop  # noqa: E402
+from tests.mock_webex import MockWebex  # noqa: E402
+from webex_api import WebexAPI  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _summary_ms(values: list[float]) -> dict[str, float]:
+    return {f"p{p}": round(percentile(values, p) * 1000, 1) for p in (50, 95, 99)} | {
+        "max": round(max(values, default=0.0) * 1000, 1),
+    }
+
+
+async def _wait_for(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mock = MockWebex(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_probability=args.rate_limit,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    await mock.start()
+    room_ids = [mock.add_room(f"user{i}@example.com") for i in range(args.rooms)]
+    for room_id in room_ids:
+        mock.post_user_message(room_id, "hello")
+
+    sent_at: dict[str, float] = {}
+    detected: dict[str, float] = {}
+    delivered: list[float] = []
+    echo_tasks: set[asyncio.Task] = set()
+
+    async def echo(api: WebexAPI, room_id: str, text: str) -> None:
+        await api.send_message(room_id, f"echo: {text}")
+        delivered.append(time.time() - sent_at[text])
+
+    def record_turn(api: WebexAPI, room_id: str, text: str, use_cache: bool = True) -> None:
+        if text in sent_at and text not in detected:
+            detected[text] = time.time() - sent_at[text]
+            if args.echo:
+                task = asyncio.ensure_future(echo(api, room_id, text))
+                echo_tasks.add(task)
+                task.add_done_callback(echo_tasks.discard)
+
+    bot._start_turn = record_turn
+    bot.is_authorized = lambda email: True
+    bot.POLL_INTERVAL_SECONDS = args.interval
+
+    api = WebexAPI(base_url=mock.url, token="bench")
+    await api.start()
+    poller = asyncio.ensure_future(bot.poll_loop(api))
+    try:
+        # Warm-up: the poller welcomes each room the first time it sees it
+        warmed = await _wait_for(lambda: all(mock.bot_messages(r) for r in room_ids), args.warmup_timeout)
+        if not warmed:
+            print("warning: not every room was initialized during warm-up", file=sys.stderr)
+        mock.calls.clear()
+        mock.rate_limited = 0
+        cycles_before = bot._poll_cycle_seconds.count()
+        cycle_seconds_before = bot._poll_cycle_seconds.sum()
+
+        rng = random.Random(args.seed)
+        total = int(args.rate * args.duration)
+        started = time.monotonic()
+        for n in range(total):
+            # Fixed schedule so slow iterations don't lower the offered rate
+            await asyncio.sleep(max(0.0, started + n / args.rate - time.monotonic()))
+            text = f"load-{n}"
+            sent_at[text] = time.time()
+            mock.post_user_message(rng.choice(room_ids), text)
+        load_seconds = time.monotonic() - started
+
+        await _wait_for(lambda: len(detected) == total, args.drain)
+        if echo_tasks:
+            await asyncio.wait(echo_tasks, timeout=args.drain)
+        elapsed = time.monotonic() - started
+        cycles = bot._poll_cycle_seconds.count() - cycles_before
+        cycle_seconds = bot._poll_cycle_seconds.sum() - cycle_seconds_before
+    finally:
+        poller.cancel()
+        await asyncio.gather(poller, return_exceptions=True)
+        await api.close()
+        await mock.close()
+
+    latencies = list(detected.values())
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "sent": total,
+        "detected": len(detected),
+        "missed": total - len(detected),
+        "offered_rate": round(total / load_seconds, 2) if load_seconds else 0.0,
+        "throughput": round(len(detected) / elapsed, 2) if elapsed else 0.0,
+        "detection_ms": _summary_ms(latencies),
+        "delivery_ms": _summary_ms(delivered) if args.echo else None,
+        "poll_cycles": cycles,
+        "poll_cycle_ms": round(cycle_seconds / cycles * 1000, 2) if cycles else 0.0,
+        "api_calls": dict(sorted(mock.calls.items())),
+        "api_calls_per_message": round(sum(mock.calls.values()) / max(1, len(detected)), 2),
+        "rate_limited": mock.rate_limited,
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"sent {report['sent']}  detected {report['detected']}  missed {report['missed']}")
+    print(f"offered {report['offered_rate']}/s  throughput {report['throughput']}/s")
+    print("detection latency (ms): " + "  ".join(f"{k} {v}" for k, v in report["detection_ms"].items()))
+    if report["delivery_ms"]:
+        print("delivery latency (ms):  " + "  ".join(f"{k} {v}" for k, v in report["delivery_ms"].items()))
+    print(f"poll cycles: {report['poll_cycles']}  mean {report['poll_cycle_ms']}ms")
+    print(f"429s served: {report['rate_limited']}")
+    print(f"API calls ({report['api_calls_per_message']} per message):")
+    for name, count in report["api_calls"].items():
+        print(f"  {name:<28} {count}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=10, help="simulated users, one direct room each")
+    parser.add_argument("--rate", type=float, default=5.0, help="messages per second across all rooms")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--interval", type=float, default=bot.POLL_INTERVAL_SECONDS, help="poll interval")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock response latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra random latency up to this (s)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a 429 per request")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After sent with injected 429s")
+    parser.add_argument("--echo", action="store_true", help="reply to every message to load delivery too")
+    parser.add_argument("--warmup-timeout", type=float, default=30.0)
+    parser.add_argument("--drain", type=float, default=30.0, help="max seconds to wait for stragglers")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--loop", default="asyncio", choices=event_loop.BACKENDS, help="event loop backend")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    # Only the harness's own output, not per-request log lines
+    logging.getLogger().setLevel(logging.ERROR)
+
+    report = event_loop.run(run(args), args.loop)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
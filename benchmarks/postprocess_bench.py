@@ -0,0 +1,151 @@
+"""Event-loop lag while replies are split into Webex messages (postprocess.py).
+
+A ticker coroutine asks to wake every millisecond and records how late it runs while
+replies are split. Each strategy handles the same replies:
+  legacy    the previous character-by-character split_message, on the event loop (before)
+  inline    the linear split_message, on the event loop
+  thread    PostProcessor with a thread pool
+  process   PostProcessor with a process pool (the default)
+
+Replies: many short lines, long lines, and one line with no newlines (hard split),
+each --size KB (the CLI keeps at most CLI_OUTPUT_SPILL_BYTES, 1 MB by default, in a reply).
+
+    python benchmarks/postprocess_bench.py
+    python benchmarks/postprocess_bench.py --size 1024 --replies 5 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import postprocess  # noqa: E402
+
+MAX_BYTES = 7439  # Webex message limit (config.WEBEX_MAX_MESSAGE_BYTES)
+TICK_SECONDS = 0.001
+
+
+def legacy_split(text: str, max_bytes: int) -> list[str]:
+    """split_message as it was before postprocess.py (re-encodes the growing chunk per line/char)."""
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+    chunks: list[str] = []
+    current = ""
+    for line in text.split("\n"):
+        candidate = current + "\n" + line if current else line
+        if len(candidate.encode("utf-8")) > max_bytes:
+            if current:
+                chunks.append(current)
+                current = ""
+            if len(line.encode("utf-8")) > max_bytes:
+                part = ""
+                for char in line:
+                    candidate = part + char
+                    if len(candidate.encode("utf-8")) > max_bytes:
+                        if part:
+                            chunks.append(part)
+                        part = char
+                    else:
+                        part = candidate
+                if part:
+                    chunks.append(part)
+            else:
+                current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def replies(size_kb: int) -> dict[str, str]:
+    size = size_kb * 1024
+    short = "\n".join(f"{n:>6}  src/module_{n % 40}.py: ok" for n in range(size // 32))
+    long = "\n".join(f"{n}: " + "the retry loop backs off with jitter; " * 40 for n in range(size // 1600))
+    return {"short_lines": short[:size], "long_lines": long[:size], "one_line": ("données " * (size // 9))[:size]}
+
+
+async def _with_ticker(work) -> dict:
+    lags: list[float] = []
+    done = False
+
+    async def ticker() -> None:
+        while not done:
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.05)  # Let the ticker settle
+    lags.clear()
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    done = True
+    await task
+    lags.sort()
+    return {
+        "wall_ms": round(elapsed * 1000, 1),
+        "max_lag_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+        "p99_lag_ms": round(lags[int(len(lags) * 0.99)] * 1000, 2) if lags else 0.0,
+    }
+
+
+async def run(size_kb: int, count: int, strategies: list[str]) -> dict:
+    report: dict = {}
+    for name, text in replies(size_kb).items():
+        report[name] = {}
+        for strategy in strategies:
+            if strategy in ("legacy", "inline"):
+                split = legacy_split if strategy == "legacy" else postprocess.split_message
+
+                async def work() -> None:
+                    for _ in range(count):
+                        split(text, MAX_BYTES)
+                        await asyncio.sleep(0)
+            else:
+                processor = postprocess.PostProcessor(offload_bytes=1, executor=strategy)
+                await processor.split(text, MAX_BYTES)  # Start the pool outside the measurement
+
+                async def work() -> None:
+                    for _ in range(count):
+                        await processor.split(text, MAX_BYTES)
+            try:
+                report[name][strategy] = await _with_ticker(work)
+            finally:
+                if strategy not in ("legacy", "inline"):
+                    processor.shutdown()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1024, help="reply size in KB")
+    parser.add_argument("--replies", type=int, default=3, help="replies split per measurement")
+    parser.add_argument(
+        "--only", nargs="+", default=["legacy", "inline", "thread", "process"],
+        choices=["legacy", "inline", "thread", "process"],
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.size, args.replies, args.only))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for name, results in report.items():
+        print(f"{name} ({args.size} KB x {args.replies}):")
+        for strategy, result in results.items():
+            print(f"  {strategy:<8} wall {result['wall_ms']:>8}ms  max lag {result['max_lag_ms']:>8}ms  "
+                  f"p99 lag {result['p99_lag_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    main()
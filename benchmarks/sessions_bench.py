@@ -0,0 +1,148 @@
+"""Benchmarks for sessions.py against a synthetic Claude home (benchmarks/gen_claude_home.py).
+
+Generates a Claude home in a temp directory (or reuses one given with --home), points
+CLAUDE_HISTORY_FILE and CLAUDE_PROJECTS_DIR at it, and times:
+  recent    list_recent_sessions()
+  by_id     get_session_by_id() for the most recent session
+  missing   get_session_by_id() for an ID that is not in history
+
+Each runs warm (the shared SessionCatalog, which only reads history lines appended
+since its last call) and cold (a new catalog per call, i.e. a full scan). Each reports
+latency, peak Python heap (tracemalloc) and bytes read per call, plus the catalog's
+estimated size (what counts against SESSION_CATALOG_BUDGET_MB).
+
+    python benchmarks/sessions_bench.py
+    python benchmarks/sessions_bench.py --sessions 2000 --history-lines 100000 --session-kb 512 --json
+    python benchmarks/sessions_bench.py --home /tmp/claude-home
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from gen_claude_home import generate  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def _measure(sessions, scan: str, call, runs: int) -> dict:
+    """Time call() over runs, then measure its peak heap in one traced run."""
+    call()  # Warm the page cache so every timed run sees the same disk state
+    timings = []
+    bytes_before = sessions._scan_bytes.value(scan=scan)
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    bytes_read = (sessions._scan_bytes.value(scan=scan) - bytes_before) / runs
+
+    tracemalloc.start()
+    try:
+        result = call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 95) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+        "peak_heap_mb": round(peak / 2**20, 2),
+        "read_mb_per_call": round(bytes_read / 2**20, 2),
+        "found": len(result) if isinstance(result, list) else result is not None,
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    if args.home:
+        home = args.home
+        generated = None
+    else:
+        home = Path(tempfile.mkdtemp(prefix="claude-home-"))
+        generated = generate(
+            home, args.sessions, args.history_lines, args.session_kb,
+            args.projects, args.malformed, args.missing, args.seed,
+        )
+        generated.pop("session_ids")
+
+    # Config is read at import time: point it at the synthetic home before importing sessions
+    os.environ["CLAUDE_HISTORY_FILE"] = str(home / "history.jsonl")
+    os.environ["CLAUDE_PROJECTS_DIR"] = str(home / "projects")
+    os.environ["BRIDGE_STATE_DIR"] = tempfile.mkdtemp(prefix="bridge-bench-")
+    os.environ.setdefault("WEBEX_BOT_TOKEN", "bench-token")
+    os.environ.setdefault("WEBEX_USER_EMAIL", "bench@example.com")
+    import sessions
+
+    recent = sessions.list_recent_sessions()
+    catalog = sessions.catalogs.get(sessions.DEFAULT_HOME)
+    report: dict = {"home": str(home), "generated": generated}
+    calls = {"recent": lambda c: c.list_recent()}
+    if recent:
+        target = recent[0].session_id
+        calls["by_id"] = lambda c: c.get(target)
+    calls["missing"] = lambda c: c.get("00000000-0000-0000-0000-000000000000")
+    for name, call in calls.items():
+        if name not in args.only:
+            continue
+        scan = "recent" if name == "recent" else "by_id"
+        report[name] = {
+            "warm": _measure(sessions, scan, lambda: call(catalog), args.runs),
+            "cold": _measure(sessions, scan, lambda: call(sessions.SessionCatalog(sessions.DEFAULT_HOME)), args.runs),
+        }
+    report["catalog_kb"] = round(catalog.size / 1024, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--home", type=Path, help="existing Claude home to benchmark instead of generating one")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--history-lines", type=int, default=10_000)
+    parser.add_argument("--session-kb", type=float, default=64.0, help="mean transcript size (exponential)")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--malformed", type=float, default=0.01, help="fraction of malformed lines")
+    parser.add_argument("--missing", type=float, default=0.05, help="fraction of sessions without a transcript")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=10, help="timed calls per benchmark")
+    parser.add_argument(
+        "--only", nargs="+", default=["recent", "by_id", "missing"], choices=["recent", "by_id", "missing"],
+    )
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"home: {report['home']}")
+    if report["generated"]:
+        g = report["generated"]
+        print(f"  {g['history_lines']} history lines ({g['history_mb']} MB), "
+              f"{g['transcripts']} transcripts ({g['transcripts_mb']} MB)")
+    print(f"catalog: {report['catalog_kb']} KB (estimated)")
+    for name in ("recent", "by_id", "missing"):
+        if name in report:
+            for mode, result in report[name].items():
+                print(f"{name} ({mode}):")
+                for key, value in result.items():
+                    print(f"  {key:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Startup benchmark: time from launching `python bot.py` to its first completed poll.
+
+Runs the real bot as a subprocess against the mock Webex server (tests/mock_webex.py)
+and a synthetic Claude home (benchmarks/gen_claude_home.py), then reads the bot's
+"Startup: first poll after ..." log line. Two scenarios:
+  first_run   empty state directory: welcome card and session list are sent first
+  restart     saved cursors and room state from the previous run
+
+    python benchmarks/startup_bench.py
+    python benchmarks/startup_bench.py --runs 5 --latency 0.05 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from gen_claude_home import generate  # noqa: E402
+from tests.mock_webex import MockWebex  # noqa: E402
+
+STARTUP_LINE = re.compile(r"Startup: first poll after (\d+)ms \((.*)\)")
+USER_EMAIL = "bench@example.com"
+
+
+async def launch(env: dict[str, str], timeout: float) -> dict:
+    """Run bot.py until it logs its first poll; return wall-clock and logged timings."""
+    launched = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(ROOT / "bot.py"),
+        cwd=str(ROOT), env=env,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        while True:
+            line = await asyncio.wait_for(process.stderr.readline(), timeout)
+            if not line:
+                raise RuntimeError(f"bot.py exited before its first poll (status {await process.wait()})")
+            match = STARTUP_LINE.search(line.decode(errors="replace"))
+            if match:
+                wall = time.perf_counter() - launched
+                phases = dict(p.rsplit(" ", 1) for p in match.group(2).split(", "))
+                return {
+                    "wall_ms": round(wall * 1000, 1),
+                    "logged_ms": int(match.group(1)),
+                    "phases": {name: int(ms.rstrip("ms")) for name, ms in phases.items()},
+                }
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    work = Path(tempfile.mkdtemp(prefix="bridge-startup-bench-"))
+    home = work / "claude-home"
+    generate(home, sessions=args.sessions, history_lines=args.history_lines, session_kb=args.session_kb)
+
+    mock = MockWebex(latency=args.latency)
+    await mock.start()
+    base_env = {
+        **os.environ,
+        "WEBEX_BOT_TOKEN": "bench-token",
+        "WEBEX_USER_EMAIL": USER_EMAIL,
+        "WEBEX_BASE_URL": mock.url,
+        "CLAUDE_HISTORY_FILE": str(home / "history.jsonl"),
+        "CLAUDE_PROJECTS_DIR": str(home / "projects"),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    report: dict = {"first_run": [], "restart": []}
+    try:
+        for n in range(args.runs):
+            env = {**base_env, "BRIDGE_STATE_DIR": str(work / f"state-{n}")}
+            report["first_run"].append(await launch(env, args.timeout))
+            report["restart"].append(await launch(env, args.timeout))
+    finally:
+        await mock.close()
+        shutil.rmtree(work, ignore_errors=True)
+    return report
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="launches per scenario")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock Webex response latency (s)")
+    parser.add_argument("--sessions", type=int, default=500, help="sessions in the synthetic Claude home")
+    parser.add_argument("--history-lines", type=int, default=20_000)
+    parser.add_argument("--session-kb", type=float, default=64.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="max seconds to wait for a first poll")
+    parser.add_argument("--json", action="store_true", help="print every run as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for scenario, runs in report.items():
+        print(f"{scenario}: median wall {_median([r['wall_ms'] for r in runs])}ms "
+              f"(in-process {_median([r['logged_ms'] for r in runs])}ms)")
+        for name in runs[0]["phases"]:
+            print(f"  {name:<14} {_median([r['phases'][name] for r in runs])}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,64 @@
 from __future__ import annotations
 
+import time
+
+# Startup timing includes this module's imports (httpx is most of them)
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
+import functools
 import logging
-import time
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-
-from auth import is_authorized
-from claude_cli import generate_session_id, send_message as cli_send_message, start_new_session as cli_start_new_session
-from config import POLL_INTERVAL_SECONDS, WEBEX_MAX_MESSAGE_BYTES, WEBEX_USER_EMAIL
-from sessions import SessionInfo, get_session_by_id, list_recent_sessions
-from webex_api import WebexAPI
+from typing import Awaitable, Callable
+
+from auth import UserProfile, authorizer, is_authorized, normalize_email
+import cards
+from claude_cli import (
+    generate_session_id,
+    registry as cli_registry,
+    send_message as cli_send_message,
+    start_new_session as cli_start_new_session,
+)
+from config import (
+    BRIDGE_EVENT_LOOP,
+    BRIDGE_WORKER_ID,
+    LOOP_DEBUG,
+    LOOP_MONITOR_INTERVAL_SECONDS,
+    LOOP_SLOW_CALLBACK_SECONDS,
+    METRICS_HOST,
+    METRICS_PORT,
+    POLL_BACKLOG_MAX_AGE_SECONDS,
+    POLL_CURSOR_FILE,
+    POLL_INTERVAL_SECONDS,
+    POSTPROCESS_EXECUTOR,
+    POSTPROCESS_OFFLOAD_BYTES,
+    POSTPROCESS_WORKERS,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_FILES,
+    RESPONSE_CACHE_TTL_SECONDS,
+    STATE_DB_FILE,
+    WEBEX_MAX_MESSAGE_BYTES,
+    WEBEX_USER_EMAIL,
+    WORKER_HEARTBEAT_SECONDS,
+    WORKER_TTL_SECONDS,
+    WORKERS_DB_FILE,
+)
+from cursor_store import CursorStore
+import event_loop
+from loop_monitor import LoopMonitor, configure_loop
+import metrics
+import postprocess
+from process_registry import terminate_tree
+from progress import ProgressHandle, ProgressScheduler, format_elapsed
+from response_cache import ResponseCache, TurnFingerprint, fingerprint
+from sessions import DEFAULT_HOME, ClaudeHome, SessionCatalog, SessionInfo, catalogs
+from sharding import Shard, WorkerRegistry
+from startup import StartupTimer
+from state_store import StateStore
+from tracing import tracer
+from webex_api import CircuitOpenError, WebexAPI, encode_card_message, parse_webex_time
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -21,21 +69,87 @@ logger = logging.getLogger(__name__)
 # Suppress httpx INFO logs (too verbose during polling)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# Poll fetch window bounds (Webex returns at most 100 messages per page)
+POLL_WINDOW_MIN = 10
+POLL_WINDOW_MAX = 100
+# Window is sized to this multiple of the recent burst rate
+POLL_WINDOW_HEADROOM = 2.0
+# Weight of the latest poll in the burst-rate moving average
+POLL_BURST_SMOOTHING = 0.3
+
+_poll_cycle_seconds = metrics.histogram("bridge_poll_cycle_seconds", "Duration of a complete poll cycle")
+_poll_rooms = metrics.histogram(
+    "bridge_poll_rooms_scanned", "Rooms checked per poll cycle", buckets=metrics.COUNT_BUCKETS,
+)
+_split_chunks = metrics.histogram(
+    "bridge_split_message_chunks", "Webex messages needed per reply", buckets=metrics.COUNT_BUCKETS,
+)
+
 
 @dataclass
 class BotState:
     session_id: str | None = None
     session_cwd: str | None = None
+    # Transcript of the connected session, which may live under a project other than session_cwd
+    session_path: str = ""
     session_label: str = ""
     session_is_new: bool = False
     skip_permissions: bool = False
     pending_sessions: list[SessionInfo] = field(default_factory=list)
+    # The user the room belongs to (its most recent authorized sender)
+    user_email: str = ""
     processing: bool = False
     _active_process: asyncio.subprocess.Process | None = field(default=None, repr=False)
     _thinking_id: str | None = field(default=None, repr=False)
+    _progress: ProgressHandle | None = field(default=None, repr=False)
+    _turn: asyncio.Task | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        """Snapshot the fields worth keeping across restarts (not in-flight turn state)."""
+        return {
+            "session_id": self.session_id,
+            "session_cwd": self.session_cwd,
+            "session_path": self.session_path,
+            "session_label": self.session_label,
+            "session_is_new": self.session_is_new,
+            "skip_permissions": self.skip_permissions,
+            "pending_sessions": [
+                {**asdict(s), "session_path": str(s.session_path)} for s in self.pending_sessions
+            ],
+            "user_email": self.user_email,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> BotState:
+        return cls(
+            session_id=data.get("session_id"),
+            session_cwd=data.get("session_cwd"),
+            session_path=data.get("session_path", ""),
+            session_label=data.get("session_label", ""),
+            session_is_new=data.get("session_is_new", False),
+            skip_permissions=data.get("skip_permissions", False),
+            pending_sessions=[
+                SessionInfo(**{**s, "session_path": Path(s["session_path"])})
+                for s in data.get("pending_sessions", [])
+            ],
+            user_email=data.get("user_email", ""),
+        )
 
 
 _room_states: dict[str, BotState] = {}
+# Write-behind persistence for _room_states; set up by async_main
+_state_store: StateStore | None = None
+# One scheduler refreshes every room's "Thinking..." placeholder
+_progress = ProgressScheduler()
+# Replies to repeated read-only prompts (None when the cache is disabled)
+_response_cache = (
+    ResponseCache(RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES) if RESPONSE_CACHE_ENABLED else None
+)
+# Splits replies too large to split on the event loop in a worker pool
+_postprocessor = postprocess.PostProcessor(POSTPROCESS_OFFLOAD_BYTES, POSTPROCESS_EXECUTOR, POSTPROCESS_WORKERS)
+CACHED_REPLY_NOTE = "\n\n_(Cached reply: nothing has changed since this was answered. Use `/nocache <message>` to rerun.)_"
+# Replies from claude_cli that describe a failure rather than Claude's answer
+_CLI_ERROR_PREFIXES = ("Error:", "Claude encountered an error", "Claude completed the request but returned no output")
 
 
 def get_state(room_id: str) -> BotState:
@@ -45,53 +159,47 @@ def get_state(room_id: str) -> BotState:
     return _room_states[room_id]
 
 
+def save_state(room_id: str) -> None:
+    """Queue the room's state for persistence (returns immediately)."""
+    if _state_store is not None:
+        _state_store.schedule(room_id, get_state(room_id).to_dict())
+
+
+def _set_room_user(room_id: str, email: str) -> None:
+    state = get_state(room_id)
+    if state.user_email != email:
+        state.user_email = email
+        save_state(room_id)
+
+
+def _profile(room_id: str) -> UserProfile:
+    """Settings of the user a room belongs to (the owner's until a user has written in it)."""
+    return authorizer.profile(get_state(room_id).user_email or WEBEX_USER_EMAIL)
+
+
+def _catalog(profile: UserProfile) -> SessionCatalog:
+    """The session catalog of the user's Claude home."""
+    if profile.claude_config_dir is None:
+        return catalogs.get(DEFAULT_HOME)
+    return catalogs.get(ClaudeHome.at(profile.claude_config_dir))
+
+
 # ---------------------------------------------------------------------------
 # Message splitting (byte-aware for Webex)
 # ---------------------------------------------------------------------------
 
 def split_message(text: str, max_bytes: int = WEBEX_MAX_MESSAGE_BYTES) -> list[str]:
     """Split text into chunks that each fit within max_bytes when UTF-8 encoded."""
-    if len(text.encode("utf-8")) <= max_bytes:
-        return [text]
-
-    chunks: list[str] = []
-    current = ""
-
-    for line in text.split("\n"):
-        candidate = current + "\n" + line if current else line
-        if len(candidate.encode("utf-8")) > max_bytes:
-            if current:
-                chunks.append(current)
-                current = ""
-            # Check if the single line itself exceeds the limit
-            if len(line.encode("utf-8")) > max_bytes:
-                # Hard-split the line without breaking multi-byte characters
-                chunks.extend(_hard_split_line(line, max_bytes))
-            else:
-                current = line
-        else:
-            current = candidate
-
-    if current:
-        chunks.append(current)
+    chunks = postprocess.split_message(text, max_bytes)
+    _split_chunks.observe(len(chunks))
     return chunks
 
 
-def _hard_split_line(line: str, max_bytes: int) -> list[str]:
-    """Split a single long line by byte length without breaking UTF-8 characters."""
-    parts: list[str] = []
-    current = ""
-    for char in line:
-        candidate = current + char
-        if len(candidate.encode("utf-8")) > max_bytes:
-            if current:
-                parts.append(current)
-            current = char
-        else:
-            current = candidate
-    if current:
-        parts.append(current)
-    return parts
+async def split_reply(text: str) -> list[str]:
+    """split_message for CLI replies: large ones are split in the post-processing pool."""
+    chunks = await _postprocessor.split(text, WEBEX_MAX_MESSAGE_BYTES)
+    _split_chunks.observe(len(chunks))
+    return chunks
 
 
 # ---------------------------------------------------------------------------
@@ -144,8 +252,8 @@ def _short_path(cwd: str) -> str:
 # Command handlers
 # ---------------------------------------------------------------------------
 
-def _build_welcome_card() -> tuple[dict, str]:
-    """Build the welcome Adaptive Card and fallback text."""
+def _build_welcome_card() -> tuple[str, str]:
+    """Build the welcome Adaptive Card (as JSON text) and fallback text."""
     commands = [
         ("/new [dir]", "Start a new session"),
         ("/sessions", "List recent sessions"),
@@ -156,154 +264,64 @@ def _build_welcome_card() -> tuple[dict, str]:
         ("/safe", "Toggle permission mode"),
         ("/cancel", "Cancel a running command"),
     ]
-
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.2",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "Claude Code Bridge",
-                "size": "Medium",
-                "weight": "Bolder",
-            },
-            {
-                "type": "FactSet",
-                "facts": [
-                    {"title": cmd, "value": desc}
-                    for cmd, desc in commands
-                ],
-            },
-            {
-                "type": "Container",
-                "separator": True,
-                "style": "accent",
-                "items": [
-                    {
-                        "type": "TextBlock",
-                        "text": "Tip: Use `/resume` to jump straight into your latest session.",
-                        "wrap": True,
-                        "weight": "Bolder",
-                    }
-                ],
-            },
-        ],
-    }
+    if RESPONSE_CACHE_ENABLED:
+        commands.append(("/nocache msg", "Send a message without using cached replies"))
+    tip = "Tip: Use `/resume` to jump straight into your latest session."
 
     fallback = (
         "**Claude Code Bridge**\n\n"
         + "\n".join(f"- `{cmd}` -- {desc}" for cmd, desc in commands)
-        + "\n\nTip: Use `/resume` to jump straight into your latest session."
+        + f"\n\n{tip}"
     )
 
-    return card, fallback
+    return cards.welcome(commands, tip), fallback
+
+
+# The welcome card never changes, so neither does its request body for a given room or person
+WELCOME_CARD, WELCOME_FALLBACK = _build_welcome_card()
+
+
+@functools.lru_cache(maxsize=64)
+def _welcome_request(destination: str, value: str) -> bytes:
+    """Pre-encoded /messages body carrying the welcome card, e.g. ("roomId", room_id)."""
+    return encode_card_message({destination: value}, WELCOME_CARD, WELCOME_FALLBACK)
 
 
 async def handle_start(api: WebexAPI, room_id: str) -> None:
-    card, fallback = _build_welcome_card()
-    await api.send_card_message(room_id, card, fallback)
+    await api.send_encoded_message(_welcome_request("roomId", room_id), room_id=room_id, text=WELCOME_FALLBACK)
 
     # Auto-send sessions list so user can immediately /resume
     await handle_sessions(api, room_id)
 
 
-def _build_sessions_card(sessions: list[SessionInfo]) -> dict:
-    """Build an Adaptive Card JSON for the session list."""
-    body: list[dict] = [
-        {
-            "type": "TextBlock",
-            "text": "Recent Sessions",
-            "size": "Medium",
-            "weight": "Bolder",
-        }
-    ]
+def _session_display(session: SessionInfo) -> str:
+    display = session.display if session.display else session.session_id[:12]
+    # Truncate display text to keep rows compact
+    if len(display) > 60:
+        display = display[:57] + "..."
+    return display
 
-    for i, s in enumerate(sessions, 1):
-        display = s.display if s.display else s.session_id[:12]
-        ago = _relative_time(s.timestamp)
 
-        # Truncate display text to keep rows compact
-        if len(display) > 60:
-            display = display[:57] + "..."
-
-        # Right column: conversation snippet (primary), session ID · time (secondary)
-        right_items: list[dict] = [
-            {
-                "type": "TextBlock",
-                "text": display,
-                "weight": "Bolder",
-                "wrap": True,
-            },
-            {
-                "type": "TextBlock",
-                "text": f"{s.session_id} \u00b7 {ago}",
-                "size": "Small",
-                "isSubtle": True,
-                "spacing": "None",
-            },
-        ]
-
-        body.append(
-            {
-                "type": "Container",
-                "separator": True,
-                "items": [
-                    {
-                        "type": "ColumnSet",
-                        "columns": [
-                            {
-                                "type": "Column",
-                                "width": "auto",
-                                "verticalContentAlignment": "Center",
-                                "items": [
-                                    {
-                                        "type": "TextBlock",
-                                        "text": str(i),
-                                        "size": "Large",
-                                        "weight": "Bolder",
-                                    }
-                                ],
-                            },
-                            {
-                                "type": "Column",
-                                "width": "stretch",
-                                "items": right_items,
-                            },
-                        ],
-                    }
-                ],
-            }
+def _build_sessions_card(sessions: list[SessionInfo]) -> str:
+    """Build the session list Adaptive Card as JSON text."""
+    rows = [
+        cards.SESSION_ROW.render(
+            index=str(i),
+            display=_session_display(s),
+            detail=f"{s.session_id} \u00b7 {_relative_time(s.timestamp)}",
         )
-
-    body.append(
-        {
-            "type": "Container",
-            "separator": True,
-            "style": "accent",
-            "items": [
-                {
-                    "type": "TextBlock",
-                    "text": "Reply `/resume N` to connect (e.g. `/resume 1`)",
-                    "weight": "Bolder",
-                    "wrap": True,
-                }
-            ],
-        }
-    )
-
-    return {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.2",
-        "body": body,
-    }
+        for i, s in enumerate(sessions, 1)
+    ]
+    return cards.SESSIONS.render(rows=rows)
 
 
-async def handle_sessions(api: WebexAPI, room_id: str) -> None:
+async def handle_sessions(api: WebexAPI, room_id: str, recent: list[SessionInfo] | None = None) -> None:
+    """Send the session list. recent is an already-loaded list_recent(20) result."""
     state = get_state(room_id)
     # Fetch extra sessions to account for filtered ones (run in thread to avoid blocking event loop)
-    all_sessions = await asyncio.to_thread(list_recent_sessions, 20)
+    if recent is None:
+        recent = await asyncio.to_thread(_catalog(_profile(room_id)).list_recent, 20)
+    all_sessions = recent
     if not all_sessions:
         await api.send_message(room_id, "No recent sessions found. Make sure you've used Claude Code at least once.")
         return
@@ -318,15 +336,13 @@ async def handle_sessions(api: WebexAPI, room_id: str) -> None:
     # Limit to 5 for display
     filtered = filtered[:5]
     state.pending_sessions = filtered
+    save_state(room_id)
 
     # Build fallback text for clients without card support
     lines = ["**Recent Sessions**\n"]
     for i, s in enumerate(filtered, 1):
-        display = s.display if s.display else s.session_id[:12]
-        if len(display) > 60:
-            display = display[:57] + "..."
         ago = _relative_time(s.timestamp)
-        lines.append(f"**{i}.** {display}")
+        lines.append(f"**{i}.** {_session_display(s)}")
         lines.append(f"   {s.session_id} \u00b7 {ago}\n")
     lines.append("Reply `/resume N` to connect (e.g. `/resume 1`)")
     fallback_text = "\n".join(lines)
@@ -340,40 +356,18 @@ async def _connect_to_session(api: WebexAPI, room_id: str, session: SessionInfo)
     state = get_state(room_id)
     state.session_id = session.session_id
     state.session_cwd = session.cwd
+    state.session_path = str(session.session_path)
     state.session_label = session.display or session.session_id[:12]
     state.session_is_new = False
+    save_state(room_id)
 
     mode_label = "skip-permissions" if state.skip_permissions else "safe"
     mode_desc = "Auto-approve tools" if state.skip_permissions else "Ask before tools"
     path = _short_path(session.cwd)
 
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.2",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "\u2705 Connected",
-                "size": "Medium",
-                "weight": "Bolder",
-            },
-            {
-                "type": "FactSet",
-                "facts": [
-                    {"title": "Session", "value": state.session_label},
-                    {"title": "Directory", "value": path},
-                    {"title": "Mode", "value": f"{mode_label} ({mode_desc})"},
-                ],
-            },
-            {
-                "type": "TextBlock",
-                "text": "Send a message to interact with this session.",
-                "isSubtle": True,
-                "spacing": "Medium",
-            },
-        ],
-    }
+    card = cards.CONNECTED.render(
+        session=state.session_label, directory=path, mode=f"{mode_label} ({mode_desc})",
+    )
     fallback = (
         f"**Connected to:** {state.session_label}\n"
         f"**Directory:** {path}\n"
@@ -403,39 +397,16 @@ async def handle_new_session(api: WebexAPI, room_id: str, arg: str) -> None:
     # Update state
     state.session_id = new_id
     state.session_cwd = cwd
+    state.session_path = ""
     state.session_label = "New session"
     state.session_is_new = True
+    save_state(room_id)
 
     mode_label = "skip-permissions" if state.skip_permissions else "safe"
     mode_desc = "Auto-approve tools" if state.skip_permissions else "Ask before tools"
     path = _short_path(cwd)
 
-    card = {
-        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-        "type": "AdaptiveCard",
-        "version": "1.2",
-        "body": [
-            {
-                "type": "TextBlock",
-                "text": "\u2728 New Session",
-                "size": "Medium",
-                "weight": "Bolder",
-            },
-            {
-                "type": "FactSet",
-                "facts": [
-                    {"title": "Directory", "value": path},
-                    {"title": "Mode", "value": f"{mode_label} ({mode_desc})"},
-                ],
-            },
-            {
-                "type": "TextBlock",
-                "text": "Send your first message to begin.",
-                "isSubtle": True,
-                "spacing": "Medium",
-            },
-        ],
-    }
+    card = cards.NEW_SESSION.render(directory=path, mode=f"{mode_label} ({mode_desc})")
     fallback = (
         f"**New Session**\n"
         f"**Directory:** {path}\n"
@@ -450,7 +421,7 @@ async def handle_connect(api: WebexAPI, room_id: str, arg: str) -> None:
 
     # No argument: connect to the most recent session
     if not arg:
-        all_sessions = await asyncio.to_thread(list_recent_sessions, 5)
+        all_sessions = await asyncio.to_thread(_catalog(_profile(room_id)).list_recent, 5)
         if not all_sessions:
             await api.send_message(room_id, "No recent sessions found. Use Claude Code first, then try again.")
             return
@@ -478,7 +449,7 @@ async def handle_connect(api: WebexAPI, room_id: str, arg: str) -> None:
     selected = state.pending_sessions[index - 1]
 
     # Re-verify the session still exists on disk (run in thread to avoid blocking event loop)
-    session = await asyncio.to_thread(get_session_by_id, selected.session_id)
+    session = await asyncio.to_thread(_catalog(_profile(room_id)).get, selected.session_id)
     if session is None:
         await api.send_message(room_id, "Session not found. It may have been deleted. Run `/sessions` again.")
         return
@@ -495,80 +466,66 @@ async def handle_disconnect(api: WebexAPI, room_id: str) -> None:
     label = state.session_label
     state.session_id = None
     state.session_cwd = None
+    state.session_path = ""
     state.session_label = ""
     state.session_is_new = False
+    save_state(room_id)
     await api.send_message(room_id, f"Disconnected from: {label}\n\nUse `/sessions` to connect to another session.")
 
 
+async def _running_summary(state: BotState) -> str | None:
+    """Describe the room's running CLI turn (elapsed, memory, CPU), if any."""
+    process = state._active_process
+    entry = cli_registry.get(process.pid) if process is not None else None
+    if entry is None:
+        return None
+    summary = format_elapsed(time.time() - entry.started_at)
+    # Scans the process table, so keep it off the event loop
+    usage = await asyncio.to_thread(cli_registry.usage, process.pid)
+    if usage is not None:
+        summary += (
+            f" \u00b7 {usage.rss_bytes / 1048576:.0f} MB RSS"
+            f" \u00b7 {usage.cpu_seconds:.1f}s CPU"
+            f" \u00b7 {usage.processes} process{'es' if usage.processes != 1 else ''}"
+        )
+    return summary
+
+
 async def handle_status(api: WebexAPI, room_id: str) -> None:
     state = get_state(room_id)
     mode_label = "skip-permissions" if state.skip_permissions else "safe"
     mode_desc = "Auto-approve tools" if state.skip_permissions else "Ask before tools"
 
+    mode = f"{mode_label} ({mode_desc})"
+
     if state.session_id is None:
-        card = {
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "type": "AdaptiveCard",
-            "version": "1.2",
-            "body": [
-                {
-                    "type": "TextBlock",
-                    "text": "Status",
-                    "size": "Medium",
-                    "weight": "Bolder",
-                },
-                {
-                    "type": "FactSet",
-                    "facts": [
-                        {"title": "Session", "value": "Not connected"},
-                        {"title": "Mode", "value": f"{mode_label} ({mode_desc})"},
-                    ],
-                },
-                {
-                    "type": "TextBlock",
-                    "text": "Use /sessions to browse and connect.",
-                    "isSubtle": True,
-                    "spacing": "Medium",
-                },
-            ],
-        }
+        card = cards.STATUS_DISCONNECTED.render(mode=mode)
         fallback = f"**Status:** Not connected\n**Mode:** {mode_label}\n\nUse `/sessions` to browse and connect."
     else:
         path = _short_path(state.session_cwd)
-        card = {
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "type": "AdaptiveCard",
-            "version": "1.2",
-            "body": [
-                {
-                    "type": "TextBlock",
-                    "text": "Status",
-                    "size": "Medium",
-                    "weight": "Bolder",
-                },
-                {
-                    "type": "FactSet",
-                    "facts": [
-                        {"title": "Session", "value": state.session_label},
-                        {"title": "Directory", "value": path},
-                        {"title": "Mode", "value": f"{mode_label} ({mode_desc})"},
-                    ],
-                },
-            ],
-        }
         fallback = (
             f"**Status:** Connected\n"
             f"**Session:** {state.session_label}\n"
             f"**Directory:** {path}\n"
             f"**Mode:** {mode_label}"
         )
+        extra = []
+        running = await _running_summary(state)
+        if running:
+            extra.append(cards.FACT.render(title="Running", value=running))
+            fallback += f"\n**Running:** {running}"
+        card = cards.STATUS_CONNECTED.render(session=state.session_label, directory=path, mode=mode, extra=extra)
 
     await api.send_card_message(room_id, card, fallback)
 
 
 async def handle_safe(api: WebexAPI, room_id: str) -> None:
     state = get_state(room_id)
+    if not state.skip_permissions and not _profile(room_id).allow_skip_permissions:
+        await api.send_message(room_id, "**Mode: safe**\nSkip-permissions mode isn't enabled for your account.")
+        return
     state.skip_permissions = not state.skip_permissions
+    save_state(room_id)
 
     if state.skip_permissions:
         await api.send_message(
@@ -585,30 +542,6 @@ async def handle_safe(api: WebexAPI, room_id: str) -> None:
         )
 
 
-def _format_elapsed(seconds: float) -> str:
-    """Format elapsed seconds as a compact string like '15s', '1m 30s', '5m'."""
-    s = int(seconds)
-    if s < 60:
-        return f"{s}s"
-    m = s // 60
-    remaining = s % 60
-    if remaining == 0:
-        return f"{m}m"
-    return f"{m}m {remaining}s"
-
-
-async def _update_thinking(api: WebexAPI, msg_id: str, room_id: str) -> None:
-    """Periodically update the 'Thinking...' message with elapsed time."""
-    start = time.monotonic()
-    try:
-        while True:
-            await asyncio.sleep(15)
-            elapsed = _format_elapsed(time.monotonic() - start)
-            await api.edit_message(msg_id, room_id, f"Thinking... ({elapsed})")
-    except asyncio.CancelledError:
-        pass
-
-
 async def handle_cancel(api: WebexAPI, room_id: str) -> None:
     """Cancel the currently running CLI process."""
     state = get_state(room_id)
@@ -616,50 +549,94 @@ async def handle_cancel(api: WebexAPI, room_id: str) -> None:
         await api.send_message(room_id, "Nothing to cancel.")
         return
 
-    process = state._active_process
-    if process is not None:
-        try:
-            process.kill()
-            await process.wait()
-        except ProcessLookupError:
-            pass  # Already exited
+    thinking_id = state._thinking_id
+    turn = state._turn
+    if turn is not None and not turn.done():
+        # Cancelling the turn kills its process tree and runs its cleanup
+        turn.cancel()
+        await asyncio.gather(turn, return_exceptions=True)
+    else:
+        process = state._active_process
+        if process is not None:
+            # Kill the whole process group so tool subprocesses don't linger
+            await terminate_tree(process)
+        if state._progress is not None:
+            await _progress.untrack(state._progress)
+        state._active_process = None
+        state._thinking_id = None
+        state._progress = None
+        state.processing = False
 
     # Edit thinking message to show cancellation
-    if state._thinking_id:
-        await api.edit_message(state._thinking_id, room_id, "Cancelled.")
+    if thinking_id:
+        await api.edit_message(thinking_id, room_id, "Cancelled.")
 
-    state._active_process = None
-    state._thinking_id = None
-    state.processing = False
     logger.info("Command cancelled by user in room %s", room_id[:12])
 
 
-async def handle_text_message(api: WebexAPI, room_id: str, text: str) -> None:
+async def _turn_fingerprint(
+    session_id: str, session_path: str, cwd: str, catalog: SessionCatalog,
+) -> TurnFingerprint | None:
+    """Fingerprint a session transcript and working tree (off the event loop).
+
+    The transcript is found from the session's own project, not cwd: the two differ
+    when the session has moved to another directory.
+    """
+    def compute() -> TurnFingerprint | None:
+        path = Path(session_path) if session_path else None
+        if path is None or not path.exists():
+            info = catalog.get(session_id)
+            # Sessions started from the bridge may not be in the history yet; they live under cwd
+            path = info.session_path if info is not None else catalog.find_session_file(session_id, cwd)
+        if path is None:
+            return None
+        return fingerprint(path, cwd, RESPONSE_CACHE_MAX_FILES)
+
+    return await asyncio.to_thread(compute)
+
+
+async def handle_text_message(api: WebexAPI, room_id: str, text: str, use_cache: bool = True) -> None:
     """Forward a plain text message to the connected Claude session."""
     state = get_state(room_id)
     if state.session_id is None:
         await api.send_message(room_id, "Not connected to any session. Use `/sessions` to browse and connect.")
         return
 
-    # Safe without a lock because the poll loop dispatches messages sequentially (await).
-    if state.processing:
-        await api.send_message(room_id, "**Still processing** the previous message. Please wait, or use `/cancel` to abort.")
-        return
-
     state.processing = True
+    state._turn = asyncio.current_task()
     thinking_id = None
-    updater_task = None
+    progress = None
     try:
+        session_id, session_path, cwd = state.session_id, state.session_path, state.session_cwd
+        profile = _profile(room_id)
+        catalog = _catalog(profile)
+        config_dir = str(profile.claude_config_dir) if profile.claude_config_dir is not None else None
+        # A user whose profile forbids it never runs with skip-permissions, whatever the room says
+        skip_permissions = state.skip_permissions and profile.allow_skip_permissions
+        before = None
+        if _response_cache is not None and use_cache and not state.session_is_new:
+            before = await _turn_fingerprint(session_id, session_path, cwd, catalog)
+            cached = None
+            if before is not None:
+                cached = _response_cache.get(session_id, before, skip_permissions, text)
+            if cached is not None:
+                logger.info("Serving cached reply in room %s", room_id[:12])
+                chunks = await split_reply(cached + CACHED_REPLY_NOTE)
+                with tracer.span("deliver", chunks=len(chunks), cached=True):
+                    for chunk in chunks:
+                        await api.send_message(room_id, chunk)
+                return
+
         # Send "Thinking..." placeholder
         thinking = await api.send_message(room_id, "Thinking...")
         thinking_id = thinking.get("id")
         state._thinking_id = thinking_id
 
-        # Start progress updater
+        # Register with the shared progress scheduler
         if thinking_id:
-            updater_task = asyncio.create_task(
-                _update_thinking(api, thinking_id, room_id)
-            )
+            progress = _progress.track(api, room_id, thinking_id)
+            state._progress = progress
+        on_tool_use = progress.note_tool_use if progress is not None else None
 
         was_new = state.session_is_new
         if was_new:
@@ -667,46 +644,68 @@ async def handle_text_message(api: WebexAPI, room_id: str, text: str) -> None:
                 session_id=state.session_id,
                 message=text,
                 cwd=state.session_cwd,
-                skip_permissions=state.skip_permissions,
+                skip_permissions=skip_permissions,
                 on_process_started=lambda p: setattr(state, '_active_process', p),
+                on_tool_use=on_tool_use,
+                room_id=room_id,
+                config_dir=config_dir,
+                timeout=profile.cli_timeout_seconds,
             )
             # Only flip the flag if the CLI didn't return an error
             if not response.startswith("Error:"):
                 state.session_is_new = False
+                save_state(room_id)
         else:
             response = await cli_send_message(
                 session_id=state.session_id,
                 message=text,
                 cwd=state.session_cwd,
-                skip_permissions=state.skip_permissions,
+                skip_permissions=skip_permissions,
                 on_process_started=lambda p: setattr(state, '_active_process', p),
+                on_tool_use=on_tool_use,
+                room_id=room_id,
+                config_dir=config_dir,
+                timeout=profile.cli_timeout_seconds,
             )
 
-        chunks = split_message(response)
-
-        # Edit "Thinking..." with first chunk, fallback to new message
-        if thinking_id:
-            result = await api.edit_message(thinking_id, room_id, chunks[0])
-            if result is None:
+        if before is not None and not response.startswith(_CLI_ERROR_PREFIXES):
+            after = await _turn_fingerprint(session_id, session_path, cwd, catalog)
+            # Only cache turns that left the working tree alone; anything else must rerun
+            if after is not None and after.tree == before.tree:
+                _response_cache.put(session_id, after, skip_permissions, text, response)
+
+        chunks = await split_reply(response)
+        if progress is not None:
+            await _progress.untrack(progress)
+
+        with tracer.span("deliver", chunks=len(chunks)):
+            # Edit "Thinking..." with first chunk, fallback to new message
+            if thinking_id:
+                result = await api.edit_message(thinking_id, room_id, chunks[0])
+                if result is None:
+                    await api.send_message(room_id, chunks[0])
+            else:
                 await api.send_message(room_id, chunks[0])
-        else:
-            await api.send_message(room_id, chunks[0])
 
-        # Send remaining chunks as new messages
-        for chunk in chunks[1:]:
-            await api.send_message(room_id, chunk)
+            # Send remaining chunks as new messages
+            for chunk in chunks[1:]:
+                await api.send_message(room_id, chunk)
     except Exception:
         logger.exception("Error processing message")
+        if progress is not None:
+            await _progress.untrack(progress)
         error_text = "Something went wrong while talking to Claude. Try sending your message again. If the problem persists, restart the bot."
         if thinking_id:
             await api.edit_message(thinking_id, room_id, error_text)
         else:
             await api.send_message(room_id, error_text)
     finally:
-        if updater_task is not None:
-            updater_task.cancel()
+        if progress is not None:
+            await _progress.untrack(progress)
         state._active_process = None
         state._thinking_id = None
+        state._progress = None
+        state._turn = None
         state.processing = False
 
 
@@ -730,7 +729,7 @@ async def dispatch(api: WebexAPI, room_id: str, text: str) -> None:
     stripped = text.strip()
 
     if not stripped.startswith("/"):
-        await handle_text_message(api, room_id, stripped)
+        _start_turn(api, room_id, stripped)
         return
 
     parts = stripped.split(None, 1)
@@ -741,6 +740,11 @@ async def dispatch(api: WebexAPI, room_id: str, text: str) -> None:
         await handle_connect(api, room_id, arg.strip())
     elif command == "/new":
         await handle_new_session(api, room_id, arg.strip())
+    elif command == "/nocache":
+        if arg.strip():
+            _start_turn(api, room_id, arg.strip(), use_cache=False)
+        else:
+            await api.send_message(room_id, "Usage: `/nocache <message>` sends the message to Claude without using a cached reply.")
     elif command in COMMANDS:
         await COMMANDS[command](api, room_id)
     else:
@@ -751,96 +755,255 @@ async def dispatch(api: WebexAPI, room_id: str, text: str) -> None:
 # Polling loop
 # ---------------------------------------------------------------------------
 
-async def _send_startup_welcome(api: WebexAPI) -> str | None:
+async def _send_startup_welcome(api: WebexAPI, recent: list[SessionInfo] | None = None) -> str | None:
     """Send welcome card to the authorized user on startup. Returns the room ID or None."""
     try:
-        card, fallback = _build_welcome_card()
-        result = await api.send_card_to_email(WEBEX_USER_EMAIL, card, fallback)
+        result = await api.send_encoded_message(
+            _welcome_request("toPersonEmail", WEBEX_USER_EMAIL), to_email=WEBEX_USER_EMAIL, text=WELCOME_FALLBACK,
+        )
         room_id = result.get("roomId")
         if room_id:
             logger.info("Sent startup welcome to %s (room=%s)", WEBEX_USER_EMAIL, room_id[:12])
+            _set_room_user(room_id, normalize_email(WEBEX_USER_EMAIL))
             # Also send sessions list into the same room
-            await handle_sessions(api, room_id)
+            await handle_sessions(api, room_id, recent)
         return room_id
     except Exception:
         logger.exception("Failed to send startup welcome (will still poll normally)")
         return None
 
 
-async def poll_loop(api: WebexAPI) -> None:
-    """Poll Webex for new messages in direct rooms."""
-    # Track the newest seen message ID per room to avoid replaying history
-    last_seen: dict[str, str] = {}
-    # Rooms we've initialized (first poll marks position, doesn't process)
-    initialized_rooms: set[str] = set()
+# Claude turns in flight, one task per message being answered
+_turn_tasks: set[asyncio.Task] = set()
+# Each room's most recently started turn; the room's next turn waits for it
+_room_turns: dict[str, asyncio.Task] = {}
+
+
+async def _run_turn(
+    api: WebexAPI, room_id: str, text: str, use_cache: bool, previous: asyncio.Task | None,
+) -> None:
+    if previous is not None:
+        with tracer.span("turn.queue_wait"):
+            # wait() rather than await, so cancelling this turn leaves the one before it running
+            await asyncio.wait({previous})
+    with tracer.span("turn", use_cache=use_cache):
+        await handle_text_message(api, room_id, text, use_cache)
+
+
+def _start_turn(api: WebexAPI, room_id: str, text: str, use_cache: bool = True) -> None:
+    """Answer a message in the background, after the turns already started for its room."""
+    # The task inherits the current trace context, so its spans join the message's trace,
+    # and the message's span stays open until the reply is delivered
+    release_span = tracer.hold()
+    task = asyncio.ensure_future(_run_turn(api, room_id, text, use_cache, _room_turns.get(room_id)))
+    _turn_tasks.add(task)
+    _room_turns[room_id] = task
+    task.add_done_callback(lambda t: _turn_done(room_id, t, release_span))
+
+
+def _turn_done(room_id: str, task: asyncio.Task, release_span: Callable[[], None]) -> None:
+    release_span()
+    _turn_tasks.discard(task)
+    if _room_turns.get(room_id) is task:
+        del _room_turns[room_id]
+
+
+# Per-room smoothed count of new messages per poll, used to size the fetch window
+_burst_rates: dict[str, float] = {}
+
 
-    # Send welcome to the user proactively so they don't need to find the bot
-    startup_room = await _send_startup_welcome(api)
-    if startup_room:
-        initialized_rooms.add(startup_room)
+def _poll_window(room_id: str) -> int:
+    """Messages to request per page: small normally, larger for rooms that see bursts."""
+    expected = _burst_rates.get(room_id, 0.0) * POLL_WINDOW_HEADROOM
+    window = -(-int(expected) // POLL_WINDOW_MIN) * POLL_WINDOW_MIN  # Round up to a multiple
+    return max(POLL_WINDOW_MIN, min(POLL_WINDOW_MAX, window))
+
+
+def _record_burst(room_id: str, new_count: int) -> None:
+    previous = _burst_rates.get(room_id, 0.0)
+    _burst_rates[room_id] = POLL_BURST_SMOOTHING * new_count + (1 - POLL_BURST_SMOOTHING) * previous
+
+
+async def _take_over_rooms(cursors: CursorStore) -> None:
+    """After the set of workers changed, pick up what other workers saved for rooms now ours."""
+    await cursors.flush()
+    await asyncio.to_thread(cursors.load)
+    if _state_store is None:
+        return
+    await _state_store.flush()
+    saved = await asyncio.to_thread(_state_store.read)
+    for room_id, data in saved.items():
+        current = _room_states.get(room_id)
+        # A room mid-turn was already ours; its in-memory state is the latest
+        if current is not None and current.processing:
+            continue
+        try:
+            _room_states[room_id] = BotState.from_dict(data)
+        except (TypeError, KeyError):
+            logger.warning("Ignoring malformed saved state for room %s", room_id[:12])
+
+
+async def _owns_owner_room(api: WebexAPI, shard: Shard) -> bool:
+    """Whether this worker sends the first-run welcome: the one that owns the owner's room.
+
+    Without a room yet, one worker is picked by the owner's email. The welcome then
+    creates the room, and its owner finds the bot's message newest and doesn't welcome again.
+    """
+    try:
+        room_id = await api.find_direct_room(WEBEX_USER_EMAIL)
+    except Exception:
+        logger.exception("Failed to look up the owner's room; skipping the startup welcome")
+        return False
+    return shard.owns(room_id or WEBEX_USER_EMAIL)
+
+
+async def poll_loop(
+    api: WebexAPI,
+    startup: StartupTimer | None = None,
+    rooms: list[dict] | None = None,
+    recent: Awaitable[list[SessionInfo] | None] | None = None,
+    shard: Shard | None = None,
+) -> None:
+    """Poll Webex for new messages in direct rooms.
+
+    rooms (the direct room listing) and recent (the owner's list_recent(20), possibly
+    still loading) come from startup. The first cycle and the first-run welcome use
+    them instead of fetching again. In worker mode, only the rooms in shard are handled.
+    """
+    # Newest handled message per room, persisted so restarts resume where they left off.
+    # Rooms without a cursor get initialized (first poll marks position, doesn't process).
+    cursors = CursorStore(POLL_CURSOR_FILE, shared=shard is not None)
+    await asyncio.to_thread(cursors.load)
+    shard_version = shard.version if shard is not None else 0
+
+    if len(cursors):
+        logger.info("Resuming from saved poll cursors (%d rooms)", len(cursors))
+    elif shard is None or await _owns_owner_room(api, shard):
+        # First run: send welcome to the user proactively so they don't need to find the bot
+        startup_room = await _send_startup_welcome(api, await recent if recent is not None else None)
+        if startup_room and (shard is None or shard.owns(startup_room)):
+            messages = await api.list_messages(startup_room, max_messages=1)
+            if messages:
+                cursors.advance(startup_room, messages[0]["id"], messages[0].get("created", ""))
+            await cursors.flush()
 
     logger.info("Polling started (interval=%.1fs)", POLL_INTERVAL_SECONDS)
 
     while True:
+        cycle_started = time.perf_counter()
         try:
-            rooms = await api.list_direct_rooms(max_rooms=50)
+            if shard is not None and shard.version != shard_version:
+                shard_version = shard.version
+                await _take_over_rooms(cursors)
+            if rooms is None:
+                rooms = await api.list_direct_rooms(max_rooms=50)
 
             for room in rooms:
                 room_id = room["id"]
-                messages = await api.list_messages(room_id, max_messages=10)
-
-                if not messages:
+                if shard is not None and not shard.owns(room_id):
                     continue
-
-                newest_id = messages[0]["id"]
+                cursor = cursors.get(room_id)
 
                 # First time seeing this room: mark position and send welcome
-                if room_id not in initialized_rooms:
-                    initialized_rooms.add(room_id)
-                    last_seen[room_id] = newest_id
-                    logger.info("Initialized room %s (last_seen=%s)", room_id[:12], newest_id[:12])
-                    await handle_start(api, room_id)
+                if cursor is None:
+                    messages = await api.list_messages(room_id, max_messages=1)
+                    if not messages:
+                        continue
+                    if shard is not None and not await shard.claim(room_id):
+                        continue
+                    newest = messages[0]
+                    cursors.advance(room_id, newest["id"], newest.get("created", ""))
+                    await cursors.flush()
+                    logger.info("Initialized room %s (last_seen=%s)", room_id[:12], newest["id"][:12])
+                    # Only welcome rooms of authorized users; the bot's own message means it has been here before
+                    if newest.get("personId") == api.bot_id:
+                        user_email = get_state(room_id).user_email
+                    else:
+                        user_email = newest.get("personEmail", "")
+                    if user_email and is_authorized(user_email):
+                        _set_room_user(room_id, normalize_email(user_email))
+                        await handle_start(api, room_id)
                     continue
 
+                # Collect messages newer than last-seen, paging back after a burst
+                new_messages, reached = await api.list_messages_since(
+                    room_id,
+                    cursor.last_seen,
+                    cursor.last_created,
+                    window=_poll_window(room_id),
+                )
+                _record_burst(room_id, len(new_messages))
+
                 # No new messages
-                if last_seen.get(room_id) == newest_id:
+                if not new_messages:
                     continue
+                # Workers may briefly disagree about the ring; the room's lease decides who answers
+                if shard is not None and not await shard.claim(room_id):
+                    continue
+                if not reached:
+                    logger.warning(
+                        "Cursor for room %s not found while catching up; handling the newest %d messages",
+                        room_id[:12], len(new_messages),
+                    )
+                newest = new_messages[0]
 
-                # Collect messages newer than last-seen
-                new_messages = []
-                for msg in messages:
-                    if msg["id"] == last_seen.get(room_id):
-                        break
-                    new_messages.append(msg)
-
-                # Update position
-                last_seen[room_id] = newest_id
+                # Update position before handling, so a crash mid-turn doesn't replay it
+                cursors.advance(room_id, newest["id"], newest.get("created", ""))
+                await cursors.flush()
 
                 # Process in chronological order (API returns newest-first)
                 new_messages.reverse()
 
+                backlog_cutoff = time.time() - POLL_BACKLOG_MAX_AGE_SECONDS
                 for msg in new_messages:
                     # Skip bot's own messages
                     if msg.get("personId") == api.bot_id:
                         continue
 
+                    # Skip stale messages left over from a long downtime
+                    created = parse_webex_time(msg.get("created", ""))
+                    if created is not None and created < backlog_cutoff:
+                        logger.info("Skipping stale message in room %s from %s", room_id[:12], msg.get("created"))
+                        continue
+
                     # Check authorization
                     sender_email = msg.get("personEmail", "")
                     if not is_authorized(sender_email):
                         continue
+                    _set_room_user(room_id, normalize_email(sender_email))
 
                     text = msg.get("text", "").strip()
                     if not text:
                         continue
 
                     logger.info("Message from %s: %s", sender_email, text[:80])
-                    await dispatch(api, room_id, text)
-
+                    with tracer.trace("webex.message", room_id=room_id[:12], message_id=msg["id"][:12]):
+                        if created is not None:
+                            # How long the message sat in Webex before this poll picked it up
+                            tracer.record("poll.detect", created, time.time())
+                        if text.startswith("/"):
+                            await dispatch(api, room_id, text)
+                        else:
+                            # Claude turns run in the background so other rooms (and /cancel) aren't
+                            # blocked; a room's turns still run one after another, in order
+                            _start_turn(api, room_id, text)
+
+            _poll_rooms.observe(len(rooms))
+            _poll_cycle_seconds.observe(time.perf_counter() - cycle_started)
+            if startup is not None:
+                startup.report("first poll")
         except SystemExit:
             raise
+        except CircuitOpenError as exc:
+            # Webex is degraded: skip whole cycles instead of hammering it room by room
+            logger.warning("Skipping poll cycle: %s", exc)
+            await asyncio.sleep(max(api.breaker.retry_in(), POLL_INTERVAL_SECONDS))
+            continue
         except Exception:
             logger.exception("Error during poll cycle")
             await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        finally:
+            rooms = None
 
         await asyncio.sleep(POLL_INTERVAL_SECONDS)
 
@@ -849,17 +1012,78 @@ async def poll_loop(api: WebexAPI) -> None:
 # Main
 # ---------------------------------------------------------------------------
 
+async def _restore_states() -> None:
+    """Open the state store and load every room's saved state."""
+    global _state_store
+    store = StateStore(STATE_DB_FILE)
+    start = time.monotonic()
+    try:
+        saved = await asyncio.to_thread(store.open)
+    except Exception:
+        logger.exception("Could not open state store %s; room state won't persist", STATE_DB_FILE)
+        return
+    for room_id, data in saved.items():
+        try:
+            _room_states[room_id] = BotState.from_dict(data)
+        except (TypeError, KeyError):
+            logger.warning("Ignoring malformed saved state for room %s", room_id[:12])
+    _state_store = store
+    logger.info("Restored state for %d rooms in %.1fms", len(saved), (time.monotonic() - start) * 1000)
+
+
 async def async_main() -> None:
+    startup = StartupTimer(_IMPORT_STARTED)
+    startup.record("imports", _IMPORT_STARTED)
+    configure_loop(asyncio.get_running_loop(), LOOP_DEBUG, LOOP_SLOW_CALLBACK_SECONDS)
+    monitor = None
+    if LOOP_MONITOR_INTERVAL_SECONDS > 0:
+        monitor = LoopMonitor(LOOP_MONITOR_INTERVAL_SECONDS, LOOP_SLOW_CALLBACK_SECONDS)
+        monitor.start()
     api = WebexAPI()
-    await api.start()
+    api.open()
+    # Builds the owner's session index for /sessions; only the first-run welcome waits for it
+    owner_catalog = _catalog(authorizer.profile(WEBEX_USER_EMAIL))
+    recent = asyncio.ensure_future(
+        startup.run("warm_sessions", asyncio.to_thread(owner_catalog.list_recent, 20), critical=False)
+    )
+    shard = None
+    steps = [
+        startup.run("verify_token", api.verify()),
+        startup.run("reap_orphans", asyncio.to_thread(cli_registry.reap_orphans), critical=False),
+        startup.run("list_rooms", api.list_direct_rooms(max_rooms=50), critical=False),
+        startup.run("restore_state", _restore_states()),
+    ]
+    if BRIDGE_WORKER_ID:
+        shard = Shard(WorkerRegistry(WORKERS_DB_FILE, BRIDGE_WORKER_ID, WORKER_TTL_SECONDS), WORKER_HEARTBEAT_SECONDS)
+        steps.append(startup.run("join_workers", shard.start()))
+    # The other steps don't depend on each other, so run them together; the first poll needs them all.
+    # Rooms can be listed before the token check completes: a bad token fails both the same way.
+    _, reaped, rooms, _, *_ = await asyncio.gather(*steps)
+    if reaped:
+        logger.warning("Reaped %d orphaned claude process(es) from a previous run", reaped)
+    metrics_server = await metrics.serve(METRICS_PORT, METRICS_HOST) if METRICS_PORT else None
     try:
-        await poll_loop(api)
+        await poll_loop(api, startup, rooms=rooms, recent=recent, shard=shard)
     finally:
+        if shard is not None:
+            await shard.stop()
+        if metrics_server is not None:
+            metrics_server.close()
+        # Cancelling a turn kills its claude process tree
+        for task in list(_turn_tasks):
+            task.cancel()
+        await asyncio.gather(*_turn_tasks, return_exceptions=True)
         await api.close()
+        _postprocessor.shutdown()
+        if monitor is not None:
+            await monitor.stop()
+        if _state_store is not None:
+            await _state_store.close()
+        tracer.close()
 
 
 def main() -> None:
-    asyncio.run(async_main())
+    event_loop.run(async_main(), BRIDGE_EVENT_LOOP)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""Adaptive Card templates, serialized once at import and filled in per message."""
+
+from __future__ import annotations
+
+import json
+import re
+from json.encoder import encode_basestring
+
+CARD_SCHEMA = "http://adaptivecards.io/schemas/adaptive-card.json"
+
+_SLOT_RE = re.compile(r'(,?)"\{\{(\w+)(\.\.\.)?\}\}"')
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(value: object) -> str:
+    """Compact JSON, the same encoding templates are built with."""
+    return _encoder.encode(value)
+
+
+def dumps_str(value: str) -> str:
+    """A str as a JSON string literal, skipping the encoder's type dispatch."""
+    return encode_basestring(value)
+
+
+def slot(name: str) -> str:
+    """Placeholder for a string value filled in at render time."""
+    return "{{%s}}" % name
+
+
+def spread(name: str) -> str:
+    """Placeholder list element replaced by zero or more pre-encoded elements."""
+    return "{{%s...}}" % name
+
+
+def adaptive_card(*body: dict | str) -> dict:
+    return {"$schema": CARD_SCHEMA, "type": "AdaptiveCard", "version": "1.2", "body": list(body)}
+
+
+class CardTemplate:
+    """JSON split around its slots, so rendering is string joins instead of a dict build and dump.
+
+    Scalar slots take a str (JSON-escaped on render). Spread slots take a list of
+    already-encoded JSON elements, e.g. other templates' render() output; they must
+    not be the first element of their list.
+    """
+
+    def __init__(self, template: dict) -> None:
+        encoded = dumps(template)
+        self._literals: list[str] = []
+        self._slots: list[tuple[str, bool]] = []
+        pos = 0
+        for match in _SLOT_RE.finditer(encoded):
+            comma, name, is_spread = match.groups()
+            if is_spread and not comma:
+                raise ValueError(f"spread slot {name!r} must follow another list element")
+            # A spread slot's leading comma is re-added per element, so an empty spread leaves valid JSON
+            cut = match.start() if is_spread else match.start() + len(comma)
+            self._literals.append(encoded[pos:cut])
+            self._slots.append((name, bool(is_spread)))
+            pos = match.end()
+        self._literals.append(encoded[pos:])
+        self.slots = frozenset(name for name, _ in self._slots)
+
+    def render(self, **values: str | list[str]) -> str:
+        """Return the template as JSON text with every slot filled in."""
+        if not self._slots:
+            return self._literals[0]
+        parts = [self._literals[0]]
+        for (name, is_spread), literal in zip(self._slots, self._literals[1:]):
+            value = values[name]
+            if is_spread:
+                parts.extend("," + element for element in value)
+            else:
+                parts.append(encode_basestring(value))
+            parts.append(literal)
+        return "".join(parts)
+
+
+def _heading(text: str) -> dict:
+    return {"type": "TextBlock", "text": text, "size": "Medium", "weight": "Bolder"}
+
+
+def _subtle(text: str) -> dict:
+    return {"type": "TextBlock", "text": text, "isSubtle": True, "spacing": "Medium"}
+
+
+def _accent_tip(text: str) -> dict:
+    return {
+        "type": "Container",
+        "separator": True,
+        "style": "accent",
+        "items": [{"type": "TextBlock", "text": text, "wrap": True, "weight": "Bolder"}],
+    }
+
+
+def _fact(title: str) -> dict:
+    return {"title": title, "value": slot(title.lower())}
+
+
+FACT = CardTemplate({"title": slot("title"), "value": slot("value")})
+
+SESSION_ROW = CardTemplate({
+    "type": "Container",
+    "separator": True,
+    "items": [
+        {
+            "type": "ColumnSet",
+            "columns": [
+                {
+                    "type": "Column",
+                    "width": "auto",
+                    "verticalContentAlignment": "Center",
+                    "items": [{"type": "TextBlock", "text": slot("index"), "size": "Large", "weight": "Bolder"}],
+                },
+                {
+                    "type": "Column",
+                    "width": "stretch",
+                    # Conversation snippet (primary), session ID · time (secondary)
+                    "items": [
+                        {"type": "TextBlock", "text": slot("display"), "weight": "Bolder", "wrap": True},
+                        {
+                            "type": "TextBlock",
+                            "text": slot("detail"),
+                            "size": "Small",
+                            "isSubtle": True,
+                            "spacing": "None",
+                        },
+                    ],
+                },
+            ],
+        }
+    ],
+})
+
+SESSIONS = CardTemplate(adaptive_card(
+    _heading("Recent Sessions"),
+    spread("rows"),
+    _accent_tip("Reply `/resume N` to connect (e.g. `/resume 1`)"),
+))
+
+CONNECTED = CardTemplate(adaptive_card(
+    _heading("\u2705 Connected"),
+    {"type": "FactSet", "facts": [_fact("Session"), _fact("Directory"), _fact("Mode")]},
+    _subtle("Send a message to interact with this session."),
+))
+
+NEW_SESSION = CardTemplate(adaptive_card(
+    _heading("\u2728 New Session"),
+    {"type": "FactSet", "facts": [_fact("Directory"), _fact("Mode")]},
+    _subtle("Send your first message to begin."),
+))
+
+STATUS_DISCONNECTED = CardTemplate(adaptive_card(
+    _heading("Status"),
+    {"type": "FactSet", "facts": [{"title": "Session", "value": "Not connected"}, _fact("Mode")]},
+    _subtle("Use /sessions to browse and connect."),
+))
+
+STATUS_CONNECTED = CardTemplate(adaptive_card(
+    _heading("Status"),
+    {"type": "FactSet", "facts": [_fact("Session"), _fact("Directory"), _fact("Mode"), spread("extra")]},
+))
+
+
+def welcome(commands: list[tuple[str, str]], tip: str) -> str:
+    """The welcome card as JSON text; it has no per-room content."""
+    return dumps(adaptive_card(
+        _heading("Claude Code Bridge"),
+        {"type": "FactSet", "facts": [{"title": cmd, "value": desc} for cmd, desc in commands]},
+        _accent_tip(tip),
+    ))
@@ -4,69 +4,210 @@ import asyncio
 import logging
 import os
 import shutil
+import time
 import uuid
 from typing import Callable, Optional
 
-from config import CLI_TIMEOUT_SECONDS
+from cli_scheduler import CliScheduler
+from config import (
+    CLAUDE_CLI_PATH,
+    CLI_MAX_CONCURRENCY,
+    CLI_MAX_LOAD_PER_CPU,
+    CLI_MAX_OUTPUT_BYTES,
+    CLI_MIN_FREE_MEMORY_MB,
+    CLI_OUTPUT_SPILL_BYTES,
+    CLI_OUTPUT_SPILL_DIR,
+    CLI_OUTPUT_SPILL_MAX_AGE_HOURS,
+    CLI_OUTPUT_SPILL_MAX_MB,
+    CLI_PROCESS_FILE,
+    CLI_STDERR_TAIL_BYTES,
+    CLI_STREAM_PROGRESS,
+    CLI_TIMEOUT_SECONDS,
+)
+import metrics
+from output_capture import BoundedCapture, CapturedOutput, StreamJsonParser, TailBuffer, prune_spills, pump
+from process_registry import ProcessRegistry, spawn_kwargs, terminate_tree
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# Every live CLI process, mirrored to disk so the next run can reap orphans
+registry = ProcessRegistry(CLI_PROCESS_FILE)
+# Admission control in front of every CLI spawn
+scheduler = CliScheduler(CLI_MAX_CONCURRENCY, CLI_MAX_LOAD_PER_CPU, CLI_MIN_FREE_MEMORY_MB)
+
+_queue_wait_seconds = metrics.histogram("bridge_cli_queue_wait_seconds", "Time CLI runs spent waiting for a slot")
+_spawn_seconds = metrics.histogram("bridge_cli_spawn_seconds", "Time taken to start a claude process")
+_turn_seconds = metrics.histogram(
+    "bridge_cli_turn_seconds", "Wall time of claude runs from spawn to exit", ("outcome",),
+)
+
 
 def generate_session_id() -> str:
     """Generate a new UUID suitable for a Claude Code session."""
     return str(uuid.uuid4())
 
 
-def _clean_env() -> dict[str, str]:
-    """Return a copy of the environment with CLAUDECODE stripped to avoid nesting detection."""
+def _clean_env(config_dir: Optional[str] = None) -> dict[str, str]:
+    """Return a copy of the environment with CLAUDECODE stripped to avoid nesting detection.
+
+    config_dir points the CLI at another Claude home (its CLAUDE_CONFIG_DIR), e.g. a
+    bridge user's own credentials and sessions.
+    """
     env = os.environ.copy()
     env.pop("CLAUDECODE", None)
+    if config_dir is not None:
+        env["CLAUDE_CONFIG_DIR"] = config_dir
     return env
 
 
+def _output_args(on_tool_use: Optional[Callable[[str], None]]) -> list[str]:
+    """Pick the output format: stream-json when someone wants tool-call progress, else text."""
+    if on_tool_use is not None and CLI_STREAM_PROGRESS:
+        return ["--output-format", "stream-json", "--verbose"]
+    return ["--output-format", "text"]
+
+
 async def _run_cli(
     cmd: list[str],
     cwd: str,
     on_process_started: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    on_tool_use: Optional[Callable[[str], None]] = None,
+    room_id: str = "",
+    session_id: str = "",
+    config_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> str:
-    """Run a claude CLI command and return the output text."""
-    try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            env=_clean_env(),
-        )
-    except FileNotFoundError:
-        return "Error: 'claude' CLI not found on PATH. Make sure Claude Code is installed."
-    except OSError as e:
-        return f"Error starting CLI: {e}"
+    """Run a claude CLI command and return the output text.
 
-    if on_process_started is not None:
-        on_process_started(process)
+    Waits for a slot from the scheduler first. With on_tool_use, the command is
+    expected to emit stream-json and each tool call is reported as it happens.
+    The process runs in its own process group and is tracked in the registry
+    until it exits.
+    """
+    async with scheduler.slot(room_id) as waited:
+        _queue_wait_seconds.observe(waited)
+        now = time.time()
+        tracer.record("cli.queue_wait", now - waited, now)
+        if waited >= 1:
+            logger.info("CLI run for room %s waited %.1fs for a slot", room_id[:12], waited)
+        spawn_started = time.perf_counter()
+        try:
+            with tracer.span("cli.spawn"):
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd,
+                    env=_clean_env(config_dir),
+                    **spawn_kwargs(),
+                )
+        except FileNotFoundError:
+            return "Error: 'claude' CLI not found on PATH. Make sure Claude Code is installed."
+        except OSError as e:
+            return f"Error starting CLI: {e}"
+        started = time.perf_counter()
+        _spawn_seconds.observe(started - spawn_started)
+        # Before any await, so a cancel can always find the process to stop
+        if on_process_started is not None:
+            on_process_started(process)
 
-    try:
-        stdout, stderr = await asyncio.wait_for(
-            process.communicate(),
-            timeout=CLI_TIMEOUT_SECONDS,
+        outcome = "error"
+        try:
+            await registry.add(process, room_id, session_id)
+            with tracer.span("cli.run", pid=process.pid) as span:
+                reply = await _collect_output(process, on_tool_use, timeout)
+                if span is not None:
+                    span.set(exit_code=process.returncode, reply_chars=len(reply))
+            if process.returncode == 0:
+                outcome = "ok"
+            return reply
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            await terminate_tree(process)
+            raise
+        finally:
+            _turn_seconds.observe(time.perf_counter() - started, outcome=outcome)
+            await registry.remove(process.pid)
+
+
+def _format_size(num_bytes: int) -> str:
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    return f"{num_bytes / 1024:.0f} KB"
+
+
+def _reply_text(captured: CapturedOutput) -> str:
+    """Reply text for captured output, noting where it was cut short."""
+    text = captured.text.strip()
+    if captured.spill_path is None:
+        return text
+    note = (
+        f"_Output was too large to post in full ({_format_size(captured.total_bytes)}"
+        f"{', truncated' if captured.truncated else ''}); showing the first "
+        f"{_format_size(CLI_OUTPUT_SPILL_BYTES)}. The rest is saved on the bot host at `{captured.spill_path}`._"
+    )
+    return f"{text}\n\n{note}"
+
+
+async def _collect_output(
+    process: asyncio.subprocess.Process,
+    on_tool_use: Optional[Callable[[str], None]],
+    timeout: Optional[float] = None,
+) -> str:
+    """Wait for a started CLI process and turn its output into reply text.
+
+    stdout and stderr are read incrementally into bounded buffers rather than
+    with communicate(), so a runaway turn can't hold unbounded output in memory.
+    """
+    stream_json = on_tool_use is not None and CLI_STREAM_PROGRESS
+    capture = BoundedCapture(CLI_MAX_OUTPUT_BYTES, CLI_OUTPUT_SPILL_BYTES, CLI_OUTPUT_SPILL_DIR)
+    stdout_sink = StreamJsonParser(on_tool_use, CLI_OUTPUT_SPILL_BYTES, capture) if stream_json else capture
+    stderr_tail = TailBuffer(CLI_STDERR_TAIL_BYTES)
+
+    async def drain() -> None:
+        await asyncio.gather(
+            pump(process.stdout, stdout_sink),
+            pump(process.stderr, stderr_tail),
+            process.wait(),
         )
+
+    if timeout is None:
+        timeout = CLI_TIMEOUT_SECONDS
+    try:
+        await asyncio.wait_for(drain(), timeout=timeout)
     except asyncio.TimeoutError:
-        process.kill()
-        await process.wait()
-        return f"Error: CLI timed out after {CLI_TIMEOUT_SECONDS} seconds. The process was killed."
+        capture.discard()
+        await terminate_tree(process)
+        return f"Error: CLI timed out after {timeout:g} seconds. The process was killed."
+    except BaseException:
+        capture.discard()
+        raise
 
-    stdout_text = stdout.decode("utf-8", errors="replace").strip()
-    stderr_text = stderr.decode("utf-8", errors="replace").strip()
+    if stream_json:
+        stdout_sink.finish()
+    captured = capture.finish()
+    stderr_text = stderr_tail.text().strip()
 
     if process.returncode != 0:
+        capture.discard()
         error_msg = f"Claude encountered an error (exit code {process.returncode}). Try sending your message again."
         if stderr_text:
-            logger.error("CLI stderr: %s", stderr_text[:1000])
+            logger.error("CLI stderr: %s", stderr_text[-1000:])
         if "expired" in stderr_text.lower() or "credential" in stderr_text.lower():
             error_msg += "\n\nThis may be an AWS credentials issue. Check your credentials."
         return error_msg
 
+    if captured.spill_path is not None:
+        logger.warning(
+            "CLI wrote %d bytes of output; spilled past %d bytes to %s",
+            stdout_sink.total_bytes, CLI_OUTPUT_SPILL_BYTES, captured.spill_path,
+        )
+        await asyncio.to_thread(
+            prune_spills, CLI_OUTPUT_SPILL_DIR, CLI_OUTPUT_SPILL_MAX_AGE_HOURS * 3600,
+            CLI_OUTPUT_SPILL_MAX_MB * 1024 * 1024, captured.spill_path,
+        )
+    stdout_text = _reply_text(captured)
     if not stdout_text:
         return "Claude completed the request but returned no output."
 
@@ -79,16 +220,23 @@ async def send_message(
     cwd: str,
     skip_permissions: bool = False,
     on_process_started: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    on_tool_use: Optional[Callable[[str], None]] = None,
+    room_id: str = "",
+    config_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> str:
-    """Send a message to a Claude Code session via CLI and return the response."""
-    claude_path = shutil.which("claude")
+    """Send a message to a Claude Code session via CLI and return the response.
+
+    config_dir sets the CLI's CLAUDE_CONFIG_DIR; timeout overrides CLI_TIMEOUT_SECONDS.
+    """
+    claude_path = shutil.which(CLAUDE_CLI_PATH)
     if claude_path is None:
         return "Error: 'claude' CLI not found on PATH. Make sure Claude Code is installed."
 
     cmd = [
         claude_path,
         "--print",
-        "--output-format", "text",
+        *_output_args(on_tool_use),
         "--resume", session_id,
     ]
     if skip_permissions:
@@ -97,7 +245,7 @@ async def send_message(
     cmd.append(message)
 
     logger.info("Running: %s (cwd=%s)", " ".join(cmd[:6]) + " ...", cwd)
-    return await _run_cli(cmd, cwd, on_process_started)
+    return await _run_cli(cmd, cwd, on_process_started, on_tool_use, room_id, session_id, config_dir, timeout)
 
 
 async def start_new_session(
@@ -106,16 +254,20 @@ async def start_new_session(
     cwd: str,
     skip_permissions: bool = False,
     on_process_started: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    on_tool_use: Optional[Callable[[str], None]] = None,
+    room_id: str = "",
+    config_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> str:
-    """Start a new Claude Code session and send the first message."""
-    claude_path = shutil.which("claude")
+    """Start a new Claude Code session and send the first message (options as for send_message)."""
+    claude_path = shutil.which(CLAUDE_CLI_PATH)
     if claude_path is None:
         return "Error: 'claude' CLI not found on PATH. Make sure Claude Code is installed."
 
     cmd = [
         claude_path,
         "--print",
-        "--output-format", "text",
+        *_output_args(on_tool_use),
         "--session-id", session_id,
     ]
     if skip_permissions:
@@ -124,4 +276,4 @@ async def start_new_session(
     cmd.append(message)
 
     logger.info("Starting new session: %s (cwd=%s)", " ".join(cmd[:6]) + " ...", cwd)
-    return await _run_cli(cmd, cwd, on_process_started)
+    return await _run_cli(cmd, cwd, on_process_started, on_tool_use, room_id, session_id, config_dir, timeout)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+try:
+    import psutil
+except ImportError:  # Optional: /proc/meminfo is used instead
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# How often a blocked queue re-checks host load while nothing finishes
+ADMISSION_RECHECK_SECONDS = 2.0
+# How long a host load/memory reading is reused, so dispatch doesn't read /proc every time
+HOST_SAMPLE_SECONDS = 1.0
+
+
+def _free_memory_bytes() -> int | None:
+    """Memory available for new processes, or None if it can't be determined."""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _load_per_cpu() -> float | None:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):  # Not available on Windows
+        return None
+
+
+class CliScheduler:
+    """Bounds concurrent claude CLI runs and hands out slots fairly between rooms.
+
+    Waiters queue per room and rooms are served round-robin, so one busy room can't
+    starve the others. Beyond the concurrency cap, a new run is only admitted while
+    host load and free memory are within limits; the first run is always admitted
+    so a loaded host still makes progress.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_load_per_cpu: float = 0.0,
+        min_free_memory_mb: int = 0,
+        host_sample_seconds: float = HOST_SAMPLE_SECONDS,
+    ) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._max_load_per_cpu = max_load_per_cpu
+        self._min_free_bytes = min_free_memory_mb * 1024 * 1024
+        self._running = 0
+        self._queues: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self._recheck: asyncio.TimerHandle | None = None
+        self._host_sample_seconds = host_sample_seconds
+        self._host_sampled_at = float("-inf")
+        self._host_ok = True
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _host_has_capacity(self) -> bool:
+        now = time.monotonic()
+        if now - self._host_sampled_at >= self._host_sample_seconds:
+            self._host_ok = self._sample_host()
+            self._host_sampled_at = now
+        return self._host_ok
+
+    def _sample_host(self) -> bool:
+        if self._max_load_per_cpu > 0:
+            load = _load_per_cpu()
+            if load is not None and load > self._max_load_per_cpu:
+                logger.info("Holding CLI run: load %.2f per CPU exceeds %.2f", load, self._max_load_per_cpu)
+                return False
+        if self._min_free_bytes > 0:
+            free = _free_memory_bytes()
+            if free is not None and free < self._min_free_bytes:
+                logger.info("Holding CLI run: %d MB free memory is below %d MB", free >> 20, self._min_free_bytes >> 20)
+                return False
+        return True
+
+    def _can_admit(self) -> bool:
+        if self._running >= self._max_concurrency:
+            return False
+        return self._running == 0 or self._host_has_capacity()
+
+    @asynccontextmanager
+    async def slot(self, room_id: str) -> AsyncIterator[float]:
+        """Hold one CLI slot for the duration of the block; yields seconds spent queued."""
+        waited = await self._acquire(room_id)
+        try:
+            yield waited
+        finally:
+            self._running -= 1
+            self._dispatch()
+
+    async def _acquire(self, room_id: str) -> float:
+        start = time.monotonic()
+        if not self._queues and self._can_admit():
+            self._running += 1
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(room_id, deque()).append(future)
+        logger.info("CLI run for room %s queued (%d running, %d queued)", room_id[:12], self._running, self.queued)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self._running -= 1
+                self._dispatch()
+            else:
+                self._discard(room_id, future)
+            raise
+        return time.monotonic() - start
+
+    def _discard(self, room_id: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(room_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[room_id]
+
+    def _dispatch(self) -> None:
+        """Grant slots round-robin across rooms while capacity allows."""
+        if self._recheck is not None:
+            self._recheck.cancel()
+            self._recheck = None
+        while self._queues and self._can_admit():
+            room_id, queue = self._queues.popitem(last=False)
+            future = queue.popleft()
+            if queue:
+                self._queues[room_id] = queue  # Back of the line for its next run
+            if future.done():
+                continue
+            self._running += 1
+            future.set_result(None)
+        if self._queues and self._running < self._max_concurrency:
+            # Held back by host load: look again later even if nothing finishes
+            self._recheck = asyncio.get_running_loop().call_later(ADMISSION_RECHECK_SECONDS, self._dispatch)
@@ -1,10 +1,26 @@
+from __future__ import annotations
+
 import os
 import sys
 from pathlib import Path
 
-from dotenv import load_dotenv
 
-load_dotenv()
+def _find_env_file() -> Path | None:
+    """The .env load_dotenv() would pick: the nearest one at or above this file's directory."""
+    here = Path(__file__).resolve().parent
+    for directory in (here, *here.parents):
+        candidate = directory / ".env"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+_env_file = _find_env_file()
+if _env_file is not None:
+    # Imported only when there is a file to load; python-dotenv is config's slowest import
+    from dotenv import load_dotenv
+
+    load_dotenv(_env_file)
 
 
 def _require_env(name: str) -> str:
@@ -16,15 +32,134 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _env_float(name: str, default: float) -> float:
+    """Read an optional float environment variable, falling back to default if missing or invalid."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        print(f"Warning: {name}={raw!r} is not a number, using {default}.", file=sys.stderr)
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an optional integer environment variable, falling back to default if missing or invalid."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        print(f"Warning: {name}={raw!r} is not an integer, using {default}.", file=sys.stderr)
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read an optional boolean environment variable (1/true/yes/on)."""
+    raw = os.environ.get(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "on")
+
+
+def _env_list(name: str) -> list[str]:
+    """Read an optional comma-separated environment variable as a list of non-empty items."""
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+
 WEBEX_BOT_TOKEN: str = _require_env("WEBEX_BOT_TOKEN")
+# The bridge's owner: always allowed, and sent the welcome card on first start
 WEBEX_USER_EMAIL: str = _require_env("WEBEX_USER_EMAIL")
+# More people allowed to use the bridge, and domains whose addresses all are (comma-separated)
+WEBEX_ALLOWED_USERS: list[str] = _env_list("WEBEX_ALLOWED_USERS")
+WEBEX_ALLOWED_DOMAINS: list[str] = _env_list("WEBEX_ALLOWED_DOMAINS")
+# Optional JSON file of per-user settings (Claude config dir, limits); listed users are allowed too
+BRIDGE_USERS_FILE: Path | None = (
+    Path(os.environ["BRIDGE_USERS_FILE"].strip()).expanduser() if os.environ.get("BRIDGE_USERS_FILE", "").strip() else None
+)
 
-WEBEX_BASE_URL: str = "https://webexapis.com/v1"
+# Overridable so the bridge can be pointed at a mock server (tests/mock_webex.py)
+WEBEX_BASE_URL: str = os.environ.get("WEBEX_BASE_URL", "").strip().rstrip("/") or "https://webexapis.com/v1"
 WEBEX_MAX_MESSAGE_BYTES: int = 7000  # Webex limit is ~7439 bytes; 7000 for safety margin
 POLL_INTERVAL_SECONDS: float = 2.5
+# GET responses younger than this are served from memory (0 disables; ETag revalidation still applies)
+WEBEX_GET_CACHE_TTL_SECONDS: float = _env_float("WEBEX_GET_CACHE_TTL_SECONDS", 0.0)
+WEBEX_GET_CACHE_MAX_ENTRIES: int = 256
+# JSON library for Webex request and response bodies: auto (orjson if installed), orjson or stdlib
+WEBEX_JSON_CODEC: str = os.environ.get("WEBEX_JSON_CODEC", "").strip().lower() or "auto"
 
 # Shared constants — names must match what sessions.py and claude_cli.py import
-CLAUDE_HISTORY_FILE: Path = Path.home() / ".claude" / "history.jsonl"
-CLAUDE_PROJECTS_DIR: Path = Path.home() / ".claude" / "projects"
+# Overridable so sessions.py can be pointed at a synthetic Claude home (benchmarks/gen_claude_home.py)
+CLAUDE_HISTORY_FILE: Path = Path(os.environ.get("CLAUDE_HISTORY_FILE", "").strip() or Path.home() / ".claude" / "history.jsonl").expanduser()
+CLAUDE_PROJECTS_DIR: Path = Path(os.environ.get("CLAUDE_PROJECTS_DIR", "").strip() or Path.home() / ".claude" / "projects").expanduser()
 MAX_SESSIONS_DISPLAYED: int = 10
+# Memory budget shared by the session indexes of all Claude homes; the least recently used are dropped
+SESSION_CATALOG_BUDGET_MB: float = _env_float("SESSION_CATALOG_BUDGET_MB", 64.0)
+# Local state that survives restarts (poll cursors, etc.)
+BRIDGE_STATE_DIR: Path = Path(os.environ.get("BRIDGE_STATE_DIR", "").strip() or Path.home() / ".claude-webex-bridge")
+POLL_CURSOR_FILE: Path = BRIDGE_STATE_DIR / "cursors.json"
+STATE_DB_FILE: Path = BRIDGE_STATE_DIR / "state.db"
+# Claude homes of users other than the owner, one directory per user, unless the users file sets one
+BRIDGE_USER_HOMES_DIR: Path = BRIDGE_STATE_DIR / "homes"
+# Worker mode: set a distinct ID per process to let several share the bot and state directory,
+# each polling its own shard of rooms (unset = a single process handles every room)
+BRIDGE_WORKER_ID: str = os.environ.get("BRIDGE_WORKER_ID", "").strip()
+WORKERS_DB_FILE: Path = BRIDGE_STATE_DIR / "workers.db"
+# How often workers heartbeat, and how long without one before a worker's rooms move elsewhere
+WORKER_HEARTBEAT_SECONDS: float = _env_float("WORKER_HEARTBEAT_SECONDS", 2.0)
+WORKER_TTL_SECONDS: float = _env_float("WORKER_TTL_SECONDS", 10.0)
+# Each worker reaps only its own orphans on restart
+CLI_PROCESS_FILE: Path = BRIDGE_STATE_DIR / (f"cli_processes-{BRIDGE_WORKER_ID}.json" if BRIDGE_WORKER_ID else "cli_processes.json")
+# Messages that arrived while the bot was down are replayed on restart unless older than this
+POLL_BACKLOG_MAX_AGE_SECONDS: float = _env_float("POLL_BACKLOG_MAX_AGE_SECONDS", 3600.0)
+
+# The claude executable (name on PATH or a full path, e.g. tests/fake_claude.py for benchmarks)
+CLAUDE_CLI_PATH: str = os.environ.get("CLAUDE_CLI_PATH", "").strip() or "claude"
 CLI_TIMEOUT_SECONDS: int = 300  # 5 minutes
+# At most this many claude processes run at once across all rooms; extra turns queue
+CLI_MAX_CONCURRENCY: int = _env_int("CLI_MAX_CONCURRENCY", 4)
+# Beyond the first run, hold new ones while the 1-min load average per CPU exceeds this (0 = off)
+CLI_MAX_LOAD_PER_CPU: float = _env_float("CLI_MAX_LOAD_PER_CPU", 1.5)
+# ...or while available memory is below this many MB (0 = off)
+CLI_MIN_FREE_MEMORY_MB: int = _env_int("CLI_MIN_FREE_MEMORY_MB", 512)
+# Run the CLI with stream-json output so "Thinking..." can show tool-call counts
+CLI_STREAM_PROGRESS: bool = _env_bool("CLI_STREAM_PROGRESS", True)
+# CLI output kept in memory; beyond this it spills to a temp file and the reply is cut short
+CLI_OUTPUT_SPILL_BYTES: int = _env_int("CLI_OUTPUT_SPILL_BYTES", 1024 * 1024)
+# Where spilled output is saved; files older than the max age, or beyond the total size
+# (oldest first), are removed whenever new output spills
+CLI_OUTPUT_SPILL_DIR: Path = BRIDGE_STATE_DIR / "output"
+CLI_OUTPUT_SPILL_MAX_AGE_HOURS: float = _env_float("CLI_OUTPUT_SPILL_MAX_AGE_HOURS", 24.0)
+CLI_OUTPUT_SPILL_MAX_MB: int = _env_int("CLI_OUTPUT_SPILL_MAX_MB", 256)
+# Hard cap on captured CLI output (memory + spill file); anything further is dropped
+CLI_MAX_OUTPUT_BYTES: int = _env_int("CLI_MAX_OUTPUT_BYTES", 16 * 1024 * 1024)
+# Only the end of stderr is kept, for error diagnostics
+CLI_STDERR_TAIL_BYTES: int = _env_int("CLI_STDERR_TAIL_BYTES", 64 * 1024)
+# Replies longer than this are split into Webex messages in a worker pool instead of on the
+# event loop (0 = always inline); the pool is "process" or "thread"
+POSTPROCESS_OFFLOAD_BYTES: int = _env_int("POSTPROCESS_OFFLOAD_BYTES", 256 * 1024)
+POSTPROCESS_EXECUTOR: str = os.environ.get("POSTPROCESS_EXECUTOR", "").strip().lower() or "process"
+POSTPROCESS_WORKERS: int = _env_int("POSTPROCESS_WORKERS", 1)
+# Reuse a session's previous reply to an identical prompt when neither the session nor its
+# working tree has changed since (opt-in; `/nocache <message>` always runs the CLI)
+RESPONSE_CACHE_ENABLED: bool = _env_bool("RESPONSE_CACHE_ENABLED", False)
+RESPONSE_CACHE_TTL_SECONDS: float = _env_float("RESPONSE_CACHE_TTL_SECONDS", 600.0)
+RESPONSE_CACHE_MAX_ENTRIES: int = _env_int("RESPONSE_CACHE_MAX_ENTRIES", 128)
+# Working trees with more entries than this aren't fingerprinted, so their replies aren't cached
+RESPONSE_CACHE_MAX_FILES: int = _env_int("RESPONSE_CACHE_MAX_FILES", 20000)
+# Serve Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics (0 = off)
+METRICS_PORT: int = _env_int("METRICS_PORT", 0)
+METRICS_HOST: str = os.environ.get("METRICS_HOST", "").strip() or "127.0.0.1"
+# Event loop backend: asyncio (default), uvloop, or auto (uvloop if installed)
+BRIDGE_EVENT_LOOP: str = os.environ.get("BRIDGE_EVENT_LOOP", "").strip().lower() or "asyncio"
+# Event-loop watchdog: probe the loop every this many seconds (0 = off) and log the loop
+# thread's stack when it is blocked longer than LOOP_SLOW_CALLBACK_SECONDS. Blocks longer
+# than the threshold plus the interval are always caught; shorter ones may slip between probes
+LOOP_MONITOR_INTERVAL_SECONDS: float = _env_float("LOOP_MONITOR_INTERVAL_SECONDS", 0.5)
+LOOP_SLOW_CALLBACK_SECONDS: float = _env_float("LOOP_SLOW_CALLBACK_SECONDS", 0.1)
+# asyncio debug mode: also logs every callback slower than LOOP_SLOW_CALLBACK_SECONDS (costly)
+LOOP_DEBUG: bool = _env_bool("LOOP_DEBUG", False)
+# Append per-message latency spans (JSON lines, OpenTelemetry-style fields) to this file (unset = off)
+TRACE_FILE: Path | None = Path(os.environ["TRACE_FILE"].strip()).expanduser() if os.environ.get("TRACE_FILE", "").strip() else None
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; only worker mode (shared cursors) needs it
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RoomCursor:
+    last_seen: str  # ID of the newest message already handled
+    last_created: str  # Webex "created" timestamp of that message ("" if unknown)
+    updated_at: float  # Epoch seconds when the cursor last moved
+
+
+def write_json_atomic(path: Path, data: object) -> None:
+    """Write JSON to path via a temp file + rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class CursorStore:
+    """Durable per-room poll positions, so a restart resumes instead of re-initializing.
+
+    Changes are held in memory and written out by flush(), which is a no-op when
+    nothing moved. A shared store (worker mode) is written by several processes, each
+    for its own rooms: flush() merges this process's changes into the file under a lock.
+    """
+
+    def __init__(self, path: Path, shared: bool = False) -> None:
+        if shared and fcntl is None:
+            raise RuntimeError("Shared poll cursors need POSIX file locks")
+        self._path = path
+        self._shared = shared
+        self._cursors: dict[str, RoomCursor] = {}
+        self._changed: set[str] = set()
+        self._dirty = False
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self._cursors
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def get(self, room_id: str) -> RoomCursor | None:
+        return self._cursors.get(room_id)
+
+    def load(self) -> None:
+        """Read cursors from disk. A missing or unreadable file starts fresh."""
+        self._cursors = self._read()
+        self._changed.clear()
+        self._dirty = False
+
+    def _read(self) -> dict[str, RoomCursor]:
+        try:
+            with open(self._path) as f:
+                raw = json.load(f)
+            return {room_id: RoomCursor(**c) for room_id, c in raw.get("rooms", {}).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable cursor file %s: %s", self._path, e)
+            return {}
+
+    def advance(self, room_id: str, message_id: str, created: str = "") -> None:
+        cursor = self._cursors.get(room_id)
+        if cursor is not None and cursor.last_seen == message_id:
+            return
+        self._cursors[room_id] = RoomCursor(last_seen=message_id, last_created=created, updated_at=time.time())
+        self._changed.add(room_id)
+        self._dirty = True
+
+    async def flush(self) -> None:
+        """Persist pending changes off the event loop."""
+        if not self._dirty:
+            return
+        changed = {room_id: self._cursors[room_id] for room_id in self._changed}
+        self._changed = set()
+        self._dirty = False
+        try:
+            if self._shared:
+                await asyncio.to_thread(self._merge, changed)
+            else:
+                snapshot = {"rooms": {room_id: asdict(c) for room_id, c in self._cursors.items()}}
+                await asyncio.to_thread(write_json_atomic, self._path, snapshot)
+        except OSError:
+            self._changed.update(changed)
+            self._dirty = True
+            logger.exception("Failed to save poll cursors to %s", self._path)
+
+    def _merge(self, changed: dict[str, RoomCursor]) -> None:
+        """Write this process's changed cursors over the file's latest contents, under a lock."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path.with_name(self._path.name + ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            cursors = self._read()
+            cursors.update(changed)
+            write_json_atomic(self._path, {"rooms": {room_id: asdict(c) for room_id, c in cursors.items()}})
@@ -0,0 +1,44 @@
+"""Event loop backend: the stdlib asyncio loop, or uvloop when selected and installed."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from typing import Any, Callable, Coroutine, TypeVar
+
+try:
+    import uvloop
+except ImportError:  # Optional: the stdlib loop is used instead
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BACKENDS = ("asyncio", "uvloop", "auto")
+
+
+def loop_factory(name: str) -> Callable[[], asyncio.AbstractEventLoop]:
+    """New-loop factory for a backend: asyncio, uvloop, or auto (uvloop if installed)."""
+    if name in ("uvloop", "auto") and uvloop is not None:
+        return uvloop.new_event_loop
+    if name == "uvloop":
+        logger.warning("uvloop is not installed; using the asyncio event loop")
+    elif name not in BACKENDS:
+        logger.warning("Unknown event loop %r; using the asyncio event loop", name)
+    return asyncio.new_event_loop
+
+
+def run(main: Coroutine[Any, Any, T], backend: str = "asyncio") -> T:
+    """asyncio.run() on the chosen backend."""
+    factory = loop_factory(backend)
+    name = "uvloop" if factory is not asyncio.new_event_loop else "asyncio"
+    logger.info("Event loop: %s", name)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=factory) as runner:
+            return runner.run(main)
+    # Before 3.11 asyncio.run() takes no loop factory; uvloop is selected through the policy
+    if name == "uvloop":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(main)
@@ -0,0 +1,40 @@
+"""JSON encoding for Webex API bodies: orjson when it is installed, the stdlib otherwise."""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib json module is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+# One shared encoder: json.dumps builds a new one per call whenever options are passed
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+STDLIB = JsonCodec("stdlib", lambda obj: _encoder.encode(obj).encode(), json.loads)
+ORJSON = JsonCodec("orjson", orjson.dumps, orjson.loads) if orjson is not None else None
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """Resolve a codec name (auto, orjson or stdlib), falling back to the stdlib."""
+    if name in ("auto", "orjson") and ORJSON is not None:
+        return ORJSON
+    if name == "orjson":
+        logger.warning("orjson is not installed, using the stdlib json module")
+    elif name not in ("auto", "stdlib"):
+        logger.warning("Unknown JSON codec %r, using the stdlib json module", name)
+    return STDLIB
@@ -0,0 +1,91 @@
+"""Event-loop health: scheduling lag, and the stack of whatever is blocking the loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_loop_lag = metrics.histogram("bridge_event_loop_lag_seconds", "How late the event loop ran a timer due now")
+_loop_stalls = metrics.counter("bridge_event_loop_stalls_total", "Times the event loop was blocked past the threshold")
+
+
+def configure_loop(loop: asyncio.AbstractEventLoop, debug: bool, slow_callback_seconds: float) -> None:
+    """Turn on asyncio debug mode, which logs each callback that runs longer than slow_callback_seconds."""
+    if debug:
+        loop.set_debug(True)
+        logger.info("asyncio debug mode on (slow callbacks: > %.0fms)", slow_callback_seconds * 1000)
+    loop.slow_callback_duration = slow_callback_seconds
+
+
+class LoopMonitor:
+    """Watches the event loop from a separate thread.
+
+    The watchdog thread schedules a no-op callback on the loop every interval seconds
+    and times how long it takes to run: that is the loop's scheduling lag. When the
+    callback is overdue by more than threshold, something is running on the loop
+    without yielding, and the loop thread's current stack is logged so the blocking
+    call can be found. Each stall is logged once. Any block longer than
+    threshold + interval is caught.
+    """
+
+    def __init__(self, interval: float, threshold: float) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop (call from the loop's thread)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            sent = time.monotonic()
+            answered = threading.Event()
+            lag: list[float] = []
+            try:
+                self._loop.call_soon_threadsafe(self._answer, sent, answered, lag)
+            except RuntimeError:
+                return  # Loop closed
+            reported = False
+            while not answered.wait(self.threshold):
+                if self._stopped.is_set():
+                    return
+                if not reported:
+                    reported = True
+                    self._report_blocked(time.monotonic() - sent)
+            # A stall caught while it lasted was logged with its stack already
+            if not reported and lag[0] > self.threshold:
+                logger.warning("Event loop lag: a callback ran %.0fms late", lag[0] * 1000)
+            self._stopped.wait(self.interval)
+
+    def _answer(self, sent: float, answered: threading.Event, lag: list[float]) -> None:
+        lag.append(time.monotonic() - sent)
+        answered.set()
+        _loop_lag.observe(lag[0])
+
+    def _report_blocked(self, blocked: float) -> None:
+        _loop_stalls.inc()
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "  (unavailable)\n"
+        logger.warning("Event loop blocked for %.0fms so far; loop thread stack:\n%s", blocked * 1000, stack.rstrip())
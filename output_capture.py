@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 65536
+SPILL_PREFIX = "claude-output-"
+
+
+@dataclass
+class CapturedOutput:
+    text: str  # Everything captured in memory (the head, if the output spilled)
+    total_bytes: int  # Bytes the process wrote, including any that were dropped
+    spill_path: str | None = None  # Temp file holding the output beyond the in-memory head
+    truncated: bool = False  # Output exceeded the hard cap and the excess was dropped
+
+
+class BoundedCapture:
+    """Incrementally decode a byte stream, bounding how much of it is kept.
+
+    The first ``spill_bytes`` stay in memory. Anything after that, up to
+    ``max_bytes`` in total, is appended to a file in ``spill_dir`` (the system temp
+    directory if None) instead, and bytes past ``max_bytes`` are counted but
+    dropped. UTF-8 is decoded as it arrives, so a character split across reads is
+    handled without buffering the whole stream.
+    """
+
+    def __init__(self, max_bytes: int, spill_bytes: int, spill_dir: Path | None = None) -> None:
+        self._max_bytes = max_bytes
+        self._spill_bytes = min(spill_bytes, max_bytes)
+        self._spill_dir = spill_dir
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._head: list[str] = []
+        self._kept = 0
+        self._spill = None
+        self.total_bytes = 0
+        self.truncated = False
+
+    def feed(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        room = self._max_bytes - self._kept
+        if room <= 0:
+            self.truncated = True
+            return
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+
+        in_memory = max(0, self._spill_bytes - self._kept)
+        if in_memory:
+            self._head.append(self._decoder.decode(data[:in_memory]))
+        if len(data) > in_memory:
+            if self._spill is None:
+                if self._spill_dir is not None:
+                    self._spill_dir.mkdir(parents=True, exist_ok=True)
+                self._spill = tempfile.NamedTemporaryFile(
+                    "w", encoding="utf-8", prefix=SPILL_PREFIX, suffix=".txt", dir=self._spill_dir, delete=False,
+                )
+            self._spill.write(self._decoder.decode(data[in_memory:]))
+        self._kept += len(data)
+
+    def finish(self) -> CapturedOutput:
+        tail = self._decoder.decode(b"", final=True)
+        spill_path = None
+        if self._spill is not None:
+            self._spill.write(tail)
+            self._spill.close()
+            spill_path = self._spill.name
+        else:
+            self._head.append(tail)
+        return CapturedOutput(
+            text="".join(self._head),
+            total_bytes=self.total_bytes,
+            spill_path=spill_path,
+            truncated=self.truncated,
+        )
+
+    def discard(self) -> None:
+        """Remove the spill file, for output that won't be shown (timeouts, errors)."""
+        if self._spill is None:
+            return
+        self._spill.close()
+        try:
+            os.unlink(self._spill.name)
+        except OSError:
+            pass
+
+
+def prune_spills(directory: Path, max_age_seconds: float, max_total_bytes: int, keep: str | None = None) -> int:
+    """Remove spill files older than max_age_seconds, then the oldest beyond max_total_bytes.
+
+    keep (a path) is never removed. Returns the number of files removed.
+    """
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.startswith(SPILL_PREFIX) and e.is_file()]
+    except OSError:
+        return 0
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort(reverse=True)  # Newest first
+
+    cutoff = time.time() - max_age_seconds
+    total = 0
+    removed = 0
+    for mtime, size, path in files:
+        if path != keep and (mtime < cutoff or total + size > max_total_bytes):
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+            continue
+        total += size
+    if removed:
+        logger.info("Removed %d old CLI output file(s) from %s", removed, directory)
+    return removed
+
+
+class TailBuffer:
+    """Ring buffer keeping only the last ``max_bytes`` of a stream (for stderr diagnostics)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._chunks: deque[bytes] = deque()
+        self._size = 0
+        self.total_bytes = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        if len(data) >= self._max_bytes:
+            self._chunks.clear()
+            data = data[-self._max_bytes:]
+            self._size = 0
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size - len(self._chunks[0]) >= self._max_bytes:
+            self._size -= len(self._chunks.popleft())
+
+    def text(self) -> str:
+        data = b"".join(self._chunks)[-self._max_bytes:]
+        # The cut may land inside a multi-byte character; drop the fragment
+        return data.decode("utf-8", errors="replace").lstrip("�")
+
+
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SIMPLE_ESCAPES = {
+    ord('"'): '"', ord("\\"): "\\", ord("/"): "/",
+    ord("b"): "\b", ord("f"): "\f", ord("n"): "\n", ord("r"): "\r", ord("t"): "\t",
+}
+# A result event too large to buffer: its type, then the start of its "result" string
+_RESULT_EVENT = re.compile(rb'^\s*\{\s*"type"\s*:\s*"result"')
+_RESULT_VALUE = re.compile(rb'"result"\s*:\s*"')
+
+
+class _JsonStringReader:
+    """Decodes the body of a JSON string (after its opening quote) into a sink, piece by piece."""
+
+    def __init__(self, sink) -> None:
+        self._sink = sink
+        self._escape = b""
+        self._high_surrogate: int | None = None
+        self.done = False
+
+    def feed(self, data: bytes) -> int:
+        """Decode data; returns the offset just past the closing quote, or -1 if it wasn't reached."""
+        i = 0
+        while i < len(data):
+            if self._escape:
+                i = self._feed_escape(data, i)
+                continue
+            match = _STRING_SPECIAL.search(data, i)
+            end = match.start() if match else len(data)
+            if end > i:
+                self._emit("", data[i:end])
+            if match is None:
+                return -1
+            if data[end] == ord('"'):
+                self._emit("")
+                self.done = True
+                return end + 1
+            self._escape = b"\\"
+            i = end + 1
+        return -1
+
+    def _feed_escape(self, data: bytes, i: int) -> int:
+        """Collect one escape sequence (at most 6 bytes, maybe split across reads)."""
+        self._escape += data[i:i + 1]
+        i += 1
+        kind = self._escape[1]
+        if kind != ord("u"):
+            self._emit(_SIMPLE_ESCAPES.get(kind, "\ufffd"))
+            self._escape = b""
+            return i
+        if len(self._escape) < 6:
+            return i
+        try:
+            unit = int(self._escape[2:], 16)
+        except ValueError:
+            unit = 0xFFFD
+        self._escape = b""
+        if 0xDC00 <= unit < 0xE000 and self._high_surrogate is not None:
+            pair = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (unit - 0xDC00)
+            self._high_surrogate = None
+            self._emit(chr(pair))
+        elif 0xD800 <= unit < 0xDC00:
+            self._emit("")
+            self._high_surrogate = unit
+        else:
+            self._emit("\ufffd" if 0xD800 <= unit < 0xE000 else chr(unit))
+        return i
+
+    def _emit(self, text: str, raw: bytes = b"") -> None:
+        if self._high_surrogate is not None:
+            # A high surrogate not followed by its low half
+            self._high_surrogate = None
+            text = "\ufffd" + text
+        if text:
+            self._sink.feed(text.encode("utf-8"))
+        if raw:
+            self._sink.feed(raw)
+
+
+class StreamJsonParser:
+    """Line-splits stream-json output, tracks tool calls and feeds the reply text to a sink.
+
+    At most ``max_line_bytes`` of a line is buffered. The final result is passed to
+    ``sink`` (a BoundedCapture) as it is parsed, and a result line longer than the
+    limit is decoded straight into it; other oversized lines are skipped. Assistant
+    text, the fallback when no result arrives, is kept up to the same limit.
+    """
+
+    def __init__(self, on_tool_use: Callable[[str], None], max_line_bytes: int, sink) -> None:
+        self._on_tool_use = on_tool_use
+        self._max_line_bytes = max_line_bytes
+        self._sink = sink
+        self._pending = bytearray()
+        self._skipping = False
+        self._result_reader: Optional[_JsonStringReader] = None
+        self._has_result = False
+        self._text_parts: list[str] = []
+        self._text_bytes = 0
+        self.total_bytes = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        start = 0
+        while True:
+            newline = data.find(b"\n", start)
+            if newline == -1:
+                self._buffer(data[start:])
+                return
+            self._buffer(data[start:newline])
+            if not self._skipping:
+                self._handle_line(bytes(self._pending))
+            self._pending.clear()
+            self._skipping = False
+            self._result_reader = None
+            start = newline + 1
+
+    def _buffer(self, piece: bytes) -> None:
+        if self._result_reader is not None:
+            if not self._result_reader.done:
+                self._result_reader.feed(piece)
+            return
+        if self._skipping:
+            return
+        if len(self._pending) + len(piece) <= self._max_line_bytes:
+            self._pending += piece
+            return
+        head = bytes(self._pending) + piece
+        self._pending.clear()
+        self._skipping = True
+        value = _RESULT_VALUE.search(head) if _RESULT_EVENT.match(head) and not self._has_result else None
+        if value is not None:
+            self._has_result = True
+            self._result_reader = _JsonStringReader(self._sink)
+            self._result_reader.feed(head[value.end():])
+
+    def _handle_line(self, raw: bytes) -> None:
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(event, dict):
+            return
+        if event.get("type") == "assistant":
+            for block in event.get("message", {}).get("content", []):
+                if block.get("type") == "tool_use":
+                    self._on_tool_use(block.get("name", "tool"))
+                elif block.get("type") == "text":
+                    self._add_text(block.get("text", ""))
+        elif event.get("type") == "result":
+            result = event.get("result")
+            if isinstance(result, str) and not self._has_result:
+                self._has_result = True
+                self._sink.feed(result.encode("utf-8"))
+
+    def _add_text(self, text: str) -> None:
+        data = text.encode("utf-8")
+        # Joined with newlines in finish(); count them against the limit too
+        room = self._max_line_bytes - self._text_bytes - len(self._text_parts)
+        if room <= 0:
+            return
+        self._text_parts.append(data[:room].decode("utf-8", errors="ignore"))
+        self._text_bytes += min(len(data), room)
+
+    def finish(self) -> None:
+        """Handle a last line without a newline; without a result, feed the assistant text."""
+        if self._pending and not self._skipping:
+            self._handle_line(bytes(self._pending))
+        self._pending.clear()
+        if not self._has_result:
+            self._sink.feed("\n".join(self._text_parts).encode("utf-8"))
+
+
+async def pump(stream: asyncio.StreamReader, sink) -> None:
+    """Copy a subprocess pipe into a sink's feed() until EOF."""
+    while True:
+        chunk = await stream.read(READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        sink.feed(chunk)
@@ -0,0 +1,110 @@
+"""Reply post-processing: splitting CLI output into Webex-sized messages, off the event loop when large."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def split_message(text: str, max_bytes: int) -> list[str]:
+    """Split text into chunks that each fit within max_bytes when UTF-8 encoded.
+
+    Chunks break between lines where possible. Each line is encoded once and sizes
+    are tracked as running byte counts, so the cost is linear in the text's length.
+    """
+    if len(text) <= max_bytes // 4 or len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+
+    chunks: list[str] = []
+    current: list[str] = []  # Lines of the chunk being built; "empty" while current_bytes is 0
+    current_bytes = 0
+
+    for line in text.split("\n"):
+        line_bytes = len(line.encode("utf-8"))
+        # Joining onto a non-empty chunk costs one byte for the newline
+        candidate_bytes = current_bytes + 1 + line_bytes if current_bytes else line_bytes
+        if candidate_bytes > max_bytes:
+            if current_bytes:
+                chunks.append("\n".join(current))
+            current, current_bytes = [], 0
+            # Check if the single line itself exceeds the limit
+            if line_bytes > max_bytes:
+                # Hard-split the line without breaking multi-byte characters
+                chunks.extend(hard_split_line(line, max_bytes))
+            else:
+                current, current_bytes = [line], line_bytes
+        elif current_bytes:
+            current.append(line)
+            current_bytes = candidate_bytes
+        else:
+            current, current_bytes = [line], line_bytes
+
+    if current_bytes:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def hard_split_line(line: str, max_bytes: int) -> list[str]:
+    """Split a single long line by byte length without breaking UTF-8 characters."""
+    encoded = line.encode("utf-8")
+    parts: list[str] = []
+    start = 0
+    while start < len(encoded):
+        end = min(start + max_bytes, len(encoded))
+        # Back off to the start of a character (continuation bytes are 0b10xxxxxx)
+        while end < len(encoded) and end > start and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        if end == start:
+            # A single character wider than max_bytes goes out on its own
+            end = start + 1
+            while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+                end += 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start = end
+    return parts
+
+
+class PostProcessor:
+    """Runs reply post-processing inline when small and in a worker pool when large.
+
+    Splitting a reply near the output cap takes long enough to stall polling and every
+    other room, so replies over offload_bytes go to a process pool (or a thread pool,
+    which only bounds the stall: the GIL is still shared). The pool starts on first use.
+    """
+
+    def __init__(self, offload_bytes: int, executor: str = "process", workers: int = 1) -> None:
+        self.offload_bytes = offload_bytes
+        self._kind = executor
+        self._workers = workers
+        self._executor: Executor | None = None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self._kind == "thread":
+                self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix="postprocess")
+            else:
+                # spawn: don't fork a process that has live threads, sockets and an event loop
+                self._executor = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def split(self, text: str, max_bytes: int) -> list[str]:
+        # len() counts characters, a lower bound on the UTF-8 size, so no encoding for small replies
+        if self.offload_bytes <= 0 or len(text) <= self.offload_bytes:
+            return split_message(text, max_bytes)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool(), split_message, text, max_bytes)
+        except RuntimeError:
+            # Pool shut down or broken (e.g. a worker was killed): do it here rather than lose the reply
+            logger.warning("Post-processing pool unavailable; splitting inline", exc_info=True)
+            self._executor = None
+            return split_message(text, max_bytes)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from cursor_store import write_json_atomic
+
+try:
+    import psutil
+except ImportError:  # Optional: /proc or ps(1) is used instead
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Time a process group gets to exit after SIGTERM before it is SIGKILLed
+KILL_GRACE_SECONDS = 3.0
+
+_POSIX = os.name == "posix"
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class CliProcess:
+    pid: int
+    pgid: int | None  # Own process group on POSIX, so the whole tree can be signalled
+    room_id: str
+    session_id: str
+    started_at: float  # Epoch seconds
+
+
+@dataclass
+class ResourceUsage:
+    rss_bytes: int
+    cpu_seconds: float
+    processes: int
+
+
+def spawn_kwargs() -> dict:
+    """Extra create_subprocess_exec arguments that give the CLI its own process group."""
+    return {"start_new_session": True} if _POSIX else {}
+
+
+def _signal_group(pgid: int, sig: int) -> bool:
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+async def terminate_tree(process: asyncio.subprocess.Process, grace: float = KILL_GRACE_SECONDS) -> None:
+    """Stop a CLI process and everything it spawned (tool subprocesses included)."""
+    if not _POSIX:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        return
+
+    _signal_group(process.pid, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=grace)
+    except asyncio.TimeoutError:
+        pass
+    # Grandchildren can outlive the CLI itself; make sure nothing in the group survives
+    _signal_group(process.pid, signal.SIGKILL)
+    await process.wait()
+
+
+def _read_cmdline(pid: int) -> list[str] | None:
+    """Return a live process's argv, or None if it doesn't exist."""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return [a.decode("utf-8", "replace") for a in f.read().split(b"\0") if a]
+    except FileNotFoundError:
+        return None
+    except OSError:
+        pass
+    try:
+        out = subprocess.run(["ps", "-o", "command=", "-p", str(pid)], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.split() or None
+
+
+def group_usage(pgid: int) -> ResourceUsage | None:
+    """Sum RSS and CPU time over every process in a process group."""
+    if psutil is not None:
+        rss, cpu, count = 0, 0.0, 0
+        for proc in psutil.process_iter(["pid"]):
+            try:
+                if os.getpgid(proc.pid) != pgid:
+                    continue
+                rss += proc.memory_info().rss
+                times = proc.cpu_times()
+                cpu += times.user + times.system
+                count += 1
+            except (psutil.Error, ProcessLookupError, PermissionError):
+                continue
+        return ResourceUsage(rss, cpu, count) if count else None
+
+    if not os.path.isdir("/proc"):
+        return None
+    rss, cpu, count = 0, 0.0, 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm (field 2) may contain spaces; everything after the last ')' is fixed-width
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            cpu += (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+            rss += int(fields[21]) * _PAGE_SIZE
+            count += 1
+        except (OSError, IndexError, ValueError):
+            continue
+    return ResourceUsage(rss, cpu, count) if count else None
+
+
+class ProcessRegistry:
+    """Live claude CLI processes, mirrored to disk so a later run can reap orphans."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._live: dict[int, CliProcess] = {}
+
+    def live(self) -> list[CliProcess]:
+        return list(self._live.values())
+
+    def get(self, pid: int) -> CliProcess | None:
+        return self._live.get(pid)
+
+    async def add(self, process: asyncio.subprocess.Process, room_id: str, session_id: str) -> None:
+        self._live[process.pid] = CliProcess(
+            pid=process.pid,
+            pgid=process.pid if _POSIX else None,
+            room_id=room_id,
+            session_id=session_id,
+            started_at=time.time(),
+        )
+        await self._save()
+
+    async def remove(self, pid: int) -> None:
+        if self._live.pop(pid, None) is not None:
+            await self._save()
+
+    def usage(self, pid: int) -> ResourceUsage | None:
+        entry = self._live.get(pid)
+        if entry is None or entry.pgid is None:
+            return None
+        return group_usage(entry.pgid)
+
+    async def _save(self) -> None:
+        snapshot = [asdict(p) for p in self._live.values()]
+        try:
+            await asyncio.to_thread(write_json_atomic, self._path, snapshot)
+        except OSError:
+            logger.exception("Failed to save CLI process registry to %s", self._path)
+
+    def reap_orphans(self, grace: float = KILL_GRACE_SECONDS) -> int:
+        """Kill CLI process groups left behind by a previous run. Returns how many were reaped.
+
+        A recorded PID only counts as ours if its command line still carries the
+        session ID we launched it with, so a PID reused by an unrelated process is
+        left alone.
+        """
+        try:
+            with open(self._path) as f:
+                recorded = [CliProcess(**p) for p in json.load(f)]
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable process registry %s: %s", self._path, e)
+            recorded = []
+
+        orphans = []
+        for entry in recorded:
+            argv = _read_cmdline(entry.pid)
+            if not argv or entry.session_id not in argv:
+                continue
+            logger.warning(
+                "Reaping orphaned CLI process %d (room=%s, session=%s, started %.0fs ago)",
+                entry.pid, entry.room_id[:12], entry.session_id[:12], time.time() - entry.started_at,
+            )
+            if entry.pgid is not None and _POSIX:
+                _signal_group(entry.pgid, signal.SIGTERM)
+            else:
+                try:
+                    os.kill(entry.pid, signal.SIGTERM)
+                except OSError:
+                    pass
+            orphans.append(entry)
+
+        if orphans:
+            time.sleep(grace)
+            for entry in orphans:
+                if entry.pgid is not None and _POSIX:
+                    _signal_group(entry.pgid, signal.SIGKILL)
+
+        write_json_atomic(self._path, [])
+        return len(orphans)
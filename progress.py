@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from webex_api import WebexAPI
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL_SECONDS = 15.0
+# Under rate-limit pressure (or within this long after it) edits slow down by PRESSURE_SLOWDOWN
+PRESSURE_COOLDOWN_SECONDS = 60.0
+PRESSURE_SLOWDOWN = 4
+MAX_EDITS_PER_TICK = 5
+TICK_SECONDS = 1.0
+
+
+def format_elapsed(seconds: float) -> str:
+    """Format elapsed seconds as a compact string like '15s', '1m 30s', '5m'."""
+    s = int(seconds)
+    if s < 60:
+        return f"{s}s"
+    m = s // 60
+    remaining = s % 60
+    if remaining == 0:
+        return f"{m}m"
+    return f"{m}m {remaining}s"
+
+
+@dataclass
+class ProgressHandle:
+    """Progress of one in-flight turn, rendered into its "Thinking..." placeholder."""
+
+    api: WebexAPI
+    room_id: str
+    message_id: str
+    started: float = field(default_factory=time.monotonic)
+    tool_calls: int = 0
+    last_tool: str | None = None
+    shown: str = "Thinking..."
+    last_edit: float = field(default_factory=time.monotonic)
+    _inflight: asyncio.Task | None = field(default=None, repr=False)
+
+    def note_tool_use(self, name: str) -> None:
+        """Record a tool call reported by the CLI's streaming output."""
+        self.tool_calls += 1
+        self.last_tool = name
+
+    def render(self, now: float, granularity: float) -> str:
+        # Round elapsed down so early ticks produce identical text and are skipped
+        elapsed = int((now - self.started) // granularity * granularity)
+        details = format_elapsed(elapsed)
+        if self.tool_calls:
+            noun = "tool call" if self.tool_calls == 1 else "tool calls"
+            details += f" · {self.tool_calls} {noun}"
+            if self.last_tool:
+                details += f", last: {self.last_tool}"
+        return f"Thinking... ({details})"
+
+
+class ProgressScheduler:
+    """Single task that refreshes every tracked "Thinking..." message.
+
+    Edits that fall due together are sent as one batch across rooms, capped per tick
+    and oldest-first. Edits are skipped when the text wouldn't change, paused while
+    the Webex circuit is open, and slowed down after rate limiting.
+    """
+
+    def __init__(
+        self,
+        interval: float = PROGRESS_INTERVAL_SECONDS,
+        max_edits_per_tick: int = MAX_EDITS_PER_TICK,
+        tick: float = TICK_SECONDS,
+    ) -> None:
+        self._interval = interval
+        self._max_edits_per_tick = max_edits_per_tick
+        self._tick = tick
+        self._handles: list[ProgressHandle] = []
+        self._task: asyncio.Task | None = None
+
+    def track(self, api: WebexAPI, room_id: str, message_id: str) -> ProgressHandle:
+        handle = ProgressHandle(api=api, room_id=room_id, message_id=message_id)
+        self._handles.append(handle)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return handle
+
+    async def untrack(self, handle: ProgressHandle) -> None:
+        """Stop updating a handle, waiting for any edit already on the wire.
+
+        Waiting matters: the caller is about to overwrite the placeholder with the
+        real reply, and a late progress edit must not land on top of it.
+        """
+        if handle in self._handles:
+            self._handles.remove(handle)
+        inflight = handle._inflight
+        if inflight is not None and not inflight.done():
+            await asyncio.wait([inflight])
+
+    def _interval_for(self, api: WebexAPI, now: float) -> float | None:
+        """Edit interval for an API client right now, or None to skip edits entirely."""
+        if api.breaker.is_open or now < api.rate_limited_until:
+            return None
+        if api.rate_limited_until and now < api.rate_limited_until + PRESSURE_COOLDOWN_SECONDS:
+            return self._interval * PRESSURE_SLOWDOWN
+        return self._interval
+
+    async def _run(self) -> None:
+        while self._handles:
+            await asyncio.sleep(self._tick)
+            now = time.monotonic()
+            due: list[tuple[ProgressHandle, str]] = []
+            for handle in self._handles:
+                if handle._inflight is not None:
+                    continue
+                interval = self._interval_for(handle.api, now)
+                if interval is None or now - handle.last_edit < interval:
+                    continue
+                text = handle.render(now, self._interval)
+                if text == handle.shown:
+                    continue
+                due.append((handle, text))
+
+            due.sort(key=lambda item: item[0].last_edit)
+            for handle, text in due[: self._max_edits_per_tick]:
+                handle.last_edit = now
+                handle._inflight = asyncio.ensure_future(self._edit(handle, text))
+
+    async def _edit(self, handle: ProgressHandle, text: str) -> None:
+        try:
+            result = await handle.api.edit_message(handle.message_id, handle.room_id, text)
+            if result is not None:
+                handle.shown = text
+        except Exception:
+            logger.exception("Progress update failed for room %s", handle.room_id[:12])
+        finally:
+            handle._inflight = None
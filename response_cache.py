@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Directories that are too big or too volatile to fingerprint; .git is covered by HEAD/index
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", ".mypy_cache", ".pytest_cache", ".tox"}
+GIT_MARKERS = (".git/HEAD", ".git/index")
+
+
+@dataclass(frozen=True)
+class TurnFingerprint:
+    """What a turn's answer depends on besides the prompt: the session so far and the working tree."""
+
+    session_size: int
+    session_mtime_ns: int
+    tree: str
+
+
+def tree_fingerprint(cwd: str, max_files: int) -> str | None:
+    """Hash the path, size and mtime of every file under cwd.
+
+    Returns None when the tree has more than max_files entries (or can't be read),
+    in which case responses for it are simply not cached.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    seen = 0
+    for marker in GIT_MARKERS:
+        try:
+            st = os.stat(os.path.join(cwd, marker))
+        except OSError:
+            continue
+        digest.update(f"{marker}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+
+    stack = [cwd]
+    try:
+        while stack:
+            directory = stack.pop()
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+            for entry in entries:
+                seen += 1
+                if seen > max_files:
+                    return None
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                rel = os.path.relpath(entry.path, cwd)
+                digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    except OSError as e:
+        logger.debug("Can't fingerprint %s: %s", cwd, e)
+        return None
+    return digest.hexdigest()
+
+
+def fingerprint(session_path: Path, cwd: str, max_files: int) -> TurnFingerprint | None:
+    """Fingerprint a session and its working directory, or None if either can't be read."""
+    try:
+        st = session_path.stat()
+    except OSError:
+        return None
+    tree = tree_fingerprint(cwd, max_files)
+    if tree is None:
+        return None
+    return TurnFingerprint(st.st_size, st.st_mtime_ns, tree)
+
+
+@dataclass
+class _CachedResponse:
+    response: str
+    stored_at: float
+
+
+class ResponseCache:
+    """LRU + TTL cache of CLI replies keyed on session state, working tree and prompt.
+
+    A hit means the same prompt was answered for a session whose transcript and
+    working tree are exactly as they were right after that answer, so rerunning
+    it would repeat the same read-only work.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple, _CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: str, fp: TurnFingerprint, skip_permissions: bool, prompt: str) -> str | None:
+        key = (session_id, fp, skip_permissions, prompt)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.stored_at > self._ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.response
+
+    def put(self, session_id: str, fp: TurnFingerprint, skip_permissions: bool, prompt: str, response: str) -> None:
+        key = (session_id, fp, skip_permissions, prompt)
+        self._entries[key] = _CachedResponse(response, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Methods that can be replayed without side effects if the first attempt's outcome is unknown
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+@dataclass
+class RetryPolicy:
+    """Retry limits plus decorrelated-jitter backoff (sleep = rand(base, prev * 3), capped)."""
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_elapsed: float = 120.0  # Give up rather than start a wait that would overrun this
+    max_retry_after: float = 60.0
+
+    def next_delay(self, previous: float) -> float:
+        """Return the next backoff delay given the previous one (0 for the first retry)."""
+        upper = max(self.base_delay, previous * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+@dataclass
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of overall request volume.
+
+    Every request deposits ``ratio`` tokens and every retry spends one, so after an
+    outage the backlog of callers can't multiply traffic. ``min_per_second`` keeps a
+    trickle of retries available when request volume is low.
+    """
+
+    ratio: float = 0.2
+    min_per_second: float = 0.5
+    max_tokens: float = 10.0
+    _tokens: float = field(default=-1.0, repr=False)
+    _last_refill: float = field(default_factory=time.monotonic, repr=False)
+
+    def __post_init__(self) -> None:
+        if self._tokens < 0:
+            self._tokens = self.max_tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last_refill) * self.min_per_second)
+        self._last_refill = now
+
+    def record_request(self) -> None:
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Withdraw one retry token. Returns False when the budget is exhausted."""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+@dataclass
+class CircuitBreaker:
+    """Opens after consecutive failures and fails fast until ``reset_timeout`` passes.
+
+    After the timeout one probe request is let through (half-open); its outcome
+    either closes the breaker or re-opens it for another timeout.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    _failures: int = field(default=0, repr=False)
+    _opened_at: float | None = field(default=None, repr=False)
+    _probe_in_flight: bool = field(default=False, repr=False)
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will let a probe through (0 if closed)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if self._probe_in_flight or self.retry_in() > 0:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Webex API recovered, circuit closed")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """End a probe that finished without an outcome (cancelled, 401), so another can go."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(
+                    "Webex API degraded (%d consecutive failures), opening circuit for %.0fs",
+                    self._failures, self.reset_timeout,
+                )
+            self._opened_at = time.monotonic()
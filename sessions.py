@@ -2,13 +2,29 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 
-from config import CLAUDE_HISTORY_FILE, CLAUDE_PROJECTS_DIR, MAX_SESSIONS_DISPLAYED
+from config import CLAUDE_HISTORY_FILE, CLAUDE_PROJECTS_DIR, MAX_SESSIONS_DISPLAYED, SESSION_CATALOG_BUDGET_MB
+import metrics
 
 logger = logging.getLogger(__name__)
 
+_scan_seconds = metrics.histogram("bridge_session_scan_seconds", "Time spent scanning Claude session files", ("scan",))
+_scan_bytes = metrics.counter("bridge_session_scan_bytes_total", "Bytes read from Claude session files", ("scan",))
+_catalog_bytes = metrics.gauge("bridge_session_catalog_bytes", "Estimated memory held by session catalogs")
+_catalog_evictions = metrics.counter(
+    "bridge_session_catalog_evictions_total", "Session catalogs dropped to stay within the memory budget",
+)
+
+# Rough per-item cost of the index and cwd cache (dict slot, tuple, Path, str and int headers),
+# on top of the string lengths; only used to compare against the memory budget
+_ENTRY_BYTES = 350
+_CWD_BYTES = 430
+
 
 @dataclass
 class SessionInfo:
@@ -20,126 +36,259 @@ class SessionInfo:
     session_path: Path
 
 
+@dataclass(frozen=True)
+class ClaudeHome:
+    """Where a Claude Code install keeps its prompt history and session transcripts."""
+
+    history_file: Path
+    projects_dir: Path
+
+    @classmethod
+    def at(cls, config_dir: Path) -> ClaudeHome:
+        """The layout under a CLAUDE_CONFIG_DIR (by default ~/.claude)."""
+        return cls(config_dir / "history.jsonl", config_dir / "projects")
+
+
+DEFAULT_HOME = ClaudeHome(CLAUDE_HISTORY_FILE, CLAUDE_PROJECTS_DIR)
+
+
 def _encode_project_path(project: str) -> str:
     """Convert a project path to the Claude directory encoding (/ → -)."""
     return project.replace("/", "-")
 
 
-def _find_session_file(session_id: str, project: str) -> Path | None:
-    """Locate the .jsonl file for a session on disk."""
-    encoded = _encode_project_path(project)
-    session_file = CLAUDE_PROJECTS_DIR / encoded / f"{session_id}.jsonl"
-    if session_file.exists():
-        return session_file
-    return None
+def _truncate_display(display: str) -> str:
+    # Truncate display for readability
+    if len(display) > 80:
+        return display[:77] + "..."
+    return display
+
 
+def _read_jsonl(path: Path, scan: str):
+    """Yield the JSON objects in a JSONL file, skipping blank and malformed lines.
 
-def _extract_cwd(session_path: Path) -> str:
+    Bytes read are counted toward the session scan metrics under the given scan name.
+    """
+    read = 0
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                read += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    yield entry
+    finally:
+        _scan_bytes.inc(read, scan=scan)
+
+
+def _extract_cwd(session_path: Path, scan: str) -> str | None:
     """Read the session JSONL and extract the cwd from the first user message."""
-    with open(session_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    entries = _read_jsonl(session_path, scan)
+    try:
+        for entry in entries:
             if entry.get("type") == "user" and "cwd" in entry:
                 return entry["cwd"]
-    logger.warning("No cwd found in session %s, falling back to home directory", session_path.stem)
-    return str(Path.home())
+    finally:
+        entries.close()
+    return None
 
 
-def list_recent_sessions(limit: int = MAX_SESSIONS_DISPLAYED) -> list[SessionInfo]:
-    """Parse history.jsonl and return the most recent sessions with verified files."""
-    if not CLAUDE_HISTORY_FILE.exists():
-        logger.warning("History file not found: %s", CLAUDE_HISTORY_FILE)
-        return []
-
-    # Collect the latest entry per session
-    sessions: dict[str, dict] = {}
-    with open(CLAUDE_HISTORY_FILE) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            sid = entry.get("sessionId")
-            if not sid:
-                continue
-            # Keep latest entry per session (later lines overwrite earlier)
-            sessions[sid] = entry
-
-    # Sort by timestamp descending, verify files exist
-    sorted_entries = sorted(sessions.values(), key=lambda e: e.get("timestamp", 0), reverse=True)
-
-    results: list[SessionInfo] = []
-    for entry in sorted_entries:
-        if len(results) >= limit:
-            break
-        sid = entry["sessionId"]
-        project = entry.get("project", "")
-        session_path = _find_session_file(sid, project)
+class SessionCatalog:
+    """The sessions of one Claude home, with its own index and caches.
+
+    The index holds the latest history.jsonl entry per session. The file is only ever
+    appended to, so each lookup reads just the lines added since the previous one (the
+    whole file again if it shrank or was replaced). Transcript cwds are cached per file.
+    Methods are thread-safe; the bot calls them from worker threads.
+    """
+
+    def __init__(self, home: ClaudeHome) -> None:
+        self.home = home
+        self._lock = threading.Lock()
+        # session_id -> (project, display, timestamp), in first-seen order like the history
+        self._entries: dict[str, tuple[str, str, int]] = {}
+        self._newest_first: list[str] | None = None  # Rebuilt after the index changes
+        self._cwds: dict[Path, str] = {}
+        self._history_id: tuple[int, int] | None = None  # (st_dev, st_ino) of the indexed file
+        self._offset = 0  # Bytes of history.jsonl indexed so far (whole lines only)
+        self.size = 0  # Estimated bytes held by the index and caches
+
+    def find_session_file(self, session_id: str, project: str) -> Path | None:
+        """Locate the .jsonl file for a session on disk."""
+        session_file = self.home.projects_dir / _encode_project_path(project) / f"{session_id}.jsonl"
+        if session_file.exists():
+            return session_file
+        return None
+
+    def list_recent(self, limit: int = MAX_SESSIONS_DISPLAYED) -> list[SessionInfo]:
+        """The most recent sessions with verified files."""
+        with _scan_seconds.time(scan="recent"), self._lock:
+            if not self._refresh("recent"):
+                logger.warning("History file not found: %s", self.home.history_file)
+                return []
+            if self._newest_first is None:
+                entries = self._entries
+                self._newest_first = sorted(entries, key=lambda sid: entries[sid][2], reverse=True)
+
+            results: list[SessionInfo] = []
+            for sid in self._newest_first:
+                if len(results) >= limit:
+                    break
+                info = self._session_info(sid, "recent")
+                if info is not None:
+                    results.append(info)
+            return results
+
+    def get(self, session_id: str) -> SessionInfo | None:
+        """Look up a specific session by ID. Returns None if not found on disk."""
+        with _scan_seconds.time(scan="by_id"), self._lock:
+            if not self._refresh("by_id") or session_id not in self._entries:
+                return None
+            return self._session_info(session_id, "by_id")
+
+    def _session_info(self, session_id: str, scan: str) -> SessionInfo | None:
+        project, display, timestamp = self._entries[session_id]
+        session_path = self.find_session_file(session_id, project)
         if session_path is None:
-            continue
-        cwd = _extract_cwd(session_path)
-        display = entry.get("display", "")
-        # Truncate display for readability
-        if len(display) > 80:
-            display = display[:77] + "..."
-        results.append(SessionInfo(
-            session_id=sid,
+            return None
+        return SessionInfo(
+            session_id=session_id,
             project=project,
             display=display,
-            timestamp=entry.get("timestamp", 0),
-            cwd=cwd,
+            timestamp=timestamp,
+            cwd=self._cwd(session_path, scan),
             session_path=session_path,
-        ))
+        )
 
-    return results
+    def _cwd(self, session_path: Path, scan: str) -> str:
+        cwd = self._cwds.get(session_path)
+        if cwd is not None:
+            return cwd
+        cwd = _extract_cwd(session_path, scan)
+        if cwd is None:
+            # Not cached: the first user message may just not have been written yet
+            logger.warning("No cwd found in session %s, falling back to home directory", session_path.stem)
+            return str(Path.home())
+        self._cwds[session_path] = cwd
+        self.size += _CWD_BYTES + len(str(session_path)) + len(cwd)
+        return cwd
 
+    def _refresh(self, scan: str) -> bool:
+        """Index the lines appended to history.jsonl since the last call; False if it's missing."""
+        try:
+            st = os.stat(self.home.history_file)
+        except OSError:
+            return False
+        history_id = (st.st_dev, st.st_ino)
+        if history_id != self._history_id or st.st_size < self._offset:
+            self._clear()
+            self._history_id = history_id
+        if st.st_size == self._offset:
+            return True
 
-def get_session_by_id(session_id: str) -> SessionInfo | None:
-    """Look up a specific session by ID. Returns None if not found on disk."""
-    if not CLAUDE_HISTORY_FILE.exists():
-        return None
+        read = 0
+        try:
+            with open(self.home.history_file, "rb") as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Still being written; picked up next time
+                    read += len(line)
+                    self._index_line(line)
+        except OSError as e:
+            logger.warning("Can't read history file %s: %s", self.home.history_file, e)
+        finally:
+            self._offset += read
+            _scan_bytes.inc(read, scan=scan)
+        return True
 
-    # Find the session in history
-    target_entry = None
-    with open(CLAUDE_HISTORY_FILE) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if entry.get("sessionId") == session_id:
-                target_entry = entry
-
-    if target_entry is None:
-        return None
+    def _index_line(self, line: bytes) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(entry, dict):
+            return
+        sid = entry.get("sessionId")
+        if not sid:
+            return
+        # Keep latest entry per session (later lines overwrite earlier)
+        value = (entry.get("project", ""), _truncate_display(entry.get("display", "")), entry.get("timestamp", 0))
+        previous = self._entries.get(sid)
+        if previous is not None:
+            self.size -= len(previous[0]) + len(previous[1])
+        else:
+            self.size += _ENTRY_BYTES + len(sid)
+        self.size += len(value[0]) + len(value[1])
+        self._entries[sid] = value
+        self._newest_first = None
 
-    project = target_entry.get("project", "")
-    session_path = _find_session_file(session_id, project)
-    if session_path is None:
-        return None
+    def _clear(self) -> None:
+        self._entries = {}
+        self._newest_first = None
+        self._cwds = {}
+        self._offset = 0
+        self.size = 0
 
-    cwd = _extract_cwd(session_path)
-    display = target_entry.get("display", "")
-    if len(display) > 80:
-        display = display[:77] + "..."
-
-    return SessionInfo(
-        session_id=session_id,
-        project=project,
-        display=display,
-        timestamp=target_entry.get("timestamp", 0),
-        cwd=cwd,
-        session_path=session_path,
-    )
+
+class CatalogPool:
+    """Session catalogs for any number of Claude homes within one memory budget.
+
+    Catalogs are kept in least-recently-used order. Whenever one is handed out, the
+    coldest others are dropped until the estimated total fits the budget; a dropped
+    catalog is rebuilt from disk on its next use. The catalog in use is never dropped.
+    """
+
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = budget_bytes
+        self._catalogs: OrderedDict[ClaudeHome, SessionCatalog] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, home: ClaudeHome) -> SessionCatalog:
+        with self._lock:
+            catalog = self._catalogs.get(home)
+            if catalog is None:
+                catalog = self._catalogs[home] = SessionCatalog(home)
+            else:
+                self._catalogs.move_to_end(home)
+            self._trim()
+            return catalog
+
+    def __len__(self) -> int:
+        return len(self._catalogs)
+
+    def _trim(self) -> None:
+        total = sum(c.size for c in self._catalogs.values())
+        while total > self.budget_bytes and len(self._catalogs) > 1:
+            home, catalog = self._catalogs.popitem(last=False)
+            total -= catalog.size
+            _catalog_evictions.inc()
+            logger.info("Dropped session catalog for %s (%d KB) to stay within budget", home.history_file, catalog.size // 1024)
+        _catalog_bytes.set(total)
+
+
+catalogs = CatalogPool(int(SESSION_CATALOG_BUDGET_MB * 1024 * 1024))
+
+
+def find_session_file(session_id: str, project: str) -> Path | None:
+    """Locate the .jsonl file for a session in the default Claude home."""
+    return catalogs.get(DEFAULT_HOME).find_session_file(session_id, project)
+
+
+def list_recent_sessions(limit: int = MAX_SESSIONS_DISPLAYED) -> list[SessionInfo]:
+    """Most recent sessions in the default Claude home."""
+    return catalogs.get(DEFAULT_HOME).list_recent(limit)
+
+
+def get_session_by_id(session_id: str) -> SessionInfo | None:
+    """Look up a session in the default Claude home."""
+    return catalogs.get(DEFAULT_HOME).get(session_id)
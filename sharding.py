@@ -0,0 +1,200 @@
+"""Worker mode: several bridge processes share one bot, each polling its own shard of rooms.
+
+Workers announce themselves with heartbeats in a SQLite table in the shared state
+directory. Every worker hashes the live worker IDs onto the same consistent-hash ring
+and handles only the rooms that land on its own points. When a worker stops
+heartbeating, its rooms move to the others; when one joins, it takes a share from each.
+
+Workers can briefly disagree about the ring, so before handling a room's messages a
+worker also takes an expiring lease on the room in the same database. A room only
+changes hands once the previous worker's lease has run out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Points per worker on the ring; more points spread rooms more evenly
+VNODES = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of keys (room IDs) onto workers.
+
+    Adding or removing a worker only moves the keys on that worker's points.
+    """
+
+    def __init__(self, workers: Iterable[str], vnodes: int = VNODES) -> None:
+        self.workers = tuple(sorted(set(workers)))
+        points = sorted((_hash(f"{worker}#{n}"), worker) for worker in self.workers for n in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [worker for _, worker in points]
+
+    def owner(self, key: str) -> str | None:
+        """The worker that owns key, or None if there are no workers."""
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class WorkerRegistry:
+    """Heartbeat table shared by the workers (SQLite, so it works across processes on one host)."""
+
+    def __init__(self, path: Path, worker_id: str, ttl: float) -> None:
+        self._path = path
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self._conn: sqlite3.Connection | None = None
+
+    def open(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # Only used from one worker thread at a time (heartbeats run one after another)
+        self._conn = sqlite3.connect(str(self._path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            " worker_id TEXT PRIMARY KEY,"
+            " heartbeat REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " room_id TEXT PRIMARY KEY,"
+            " worker_id TEXT NOT NULL,"
+            " expires REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def heartbeat(self) -> list[str]:
+        """Record that this worker is alive, forget dead ones, and return the live worker IDs."""
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, heartbeat) VALUES (?, ?)",
+                (self.worker_id, now),
+            )
+            self._conn.execute("DELETE FROM workers WHERE heartbeat < ?", (now - self.ttl,))
+            rows = self._conn.execute("SELECT worker_id FROM workers ORDER BY worker_id").fetchall()
+        return [worker_id for (worker_id,) in rows]
+
+    def claim(self, room_id: str) -> tuple[bool, str | None]:
+        """Take or renew this worker's lease on a room for ttl seconds.
+
+        Returns whether the lease is now ours, and the worker that held it before
+        (None if no worker ever did).
+        """
+        now = time.time()
+        with self._conn:
+            # Take the write lock first, so two workers can't both see the lease as free
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT worker_id, expires FROM leases WHERE room_id = ?", (room_id,)).fetchone()
+            if row is not None and row[0] != self.worker_id and row[1] > now:
+                return False, row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO leases (room_id, worker_id, expires) VALUES (?, ?, ?)",
+                (room_id, self.worker_id, now + self.ttl),
+            )
+        return True, row[0] if row is not None else None
+
+    def leave(self) -> None:
+        """Remove this worker and end its leases so the others take over its rooms right away."""
+        if self._conn is None:
+            return
+        with self._conn:
+            self._conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+            self._conn.execute("UPDATE leases SET expires = 0 WHERE worker_id = ?", (self.worker_id,))
+        self._conn.close()
+        self._conn = None
+
+
+class Shard:
+    """This worker's share of the rooms, kept current by a heartbeat task.
+
+    version changes whenever the set of live workers does, or a room's lease is taken
+    over from another worker, so the poller knows when to pick up state that other
+    workers saved for rooms it now owns. A worker whose last successful heartbeat is
+    older than the TTL owns nothing: the others have dropped it from their rings.
+    """
+
+    def __init__(self, registry: WorkerRegistry, heartbeat_seconds: float) -> None:
+        self.worker_id = registry.worker_id
+        self._registry = registry
+        self._heartbeat_seconds = heartbeat_seconds
+        self.ring = HashRing([self.worker_id])
+        self.version = 0
+        self._last_beat = time.monotonic()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def stale(self) -> bool:
+        return time.monotonic() - self._last_beat > self._registry.ttl
+
+    def owns(self, key: str) -> bool:
+        return not self.stale and self.ring.owner(key) == self.worker_id
+
+    async def claim(self, room_id: str) -> bool:
+        """Whether this worker may handle the room's messages now; takes or renews its lease."""
+        if not self.owns(room_id):
+            return False
+        try:
+            granted, previous = await asyncio.to_thread(self._registry.claim, room_id)
+        except sqlite3.Error:
+            logger.exception("Could not take the lease on room %s", room_id[:12])
+            return False
+        if granted and previous not in (None, self.worker_id):
+            # Another worker handled the room last: pick up what it saved first, then handle it next cycle
+            logger.info("Worker %s: took over room %s from %s", self.worker_id, room_id[:12], previous)
+            self.version += 1
+            return False
+        return granted
+
+    async def start(self) -> None:
+        """Join the ring. Waits one heartbeat so workers started together see each other."""
+        await asyncio.to_thread(self._registry.open)
+        await self._beat()
+        await asyncio.sleep(self._heartbeat_seconds)
+        await self._beat()
+        self._task = asyncio.ensure_future(self._heartbeat_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self._registry.leave)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_seconds)
+            try:
+                await self._beat()
+            except sqlite3.Error:
+                # Keep the current ring; if this persists, the others will take over our rooms
+                logger.exception("Worker heartbeat failed")
+                if self.stale:
+                    logger.warning("Worker %s: no heartbeat for %.0fs, not handling any rooms", self.worker_id, self._registry.ttl)
+
+    async def _beat(self) -> None:
+        workers = await asyncio.to_thread(self._registry.heartbeat)
+        self._last_beat = time.monotonic()
+        if self.worker_id not in workers:
+            workers.append(self.worker_id)
+        if tuple(sorted(workers)) != self.ring.workers:
+            self.ring = HashRing(workers)
+            self.version += 1
+            logger.info("Worker %s: %d live worker(s): %s", self.worker_id, len(workers), ", ".join(sorted(workers)))
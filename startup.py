@@ -0,0 +1,47 @@
+"""Timing for the startup pipeline: concurrent phases and time to first poll."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Awaitable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StartupTimer:
+    """Records how long each startup phase took (phases may overlap) and logs a breakdown."""
+
+    def __init__(self, started: float | None = None) -> None:
+        # perf_counter() reading taken when startup began, e.g. before the heavy imports
+        self.started = time.perf_counter() if started is None else started
+        self.phases: dict[str, float] = {}
+        self.reported = False
+
+    def record(self, name: str, since: float) -> None:
+        self.phases[name] = time.perf_counter() - since
+
+    async def run(self, name: str, awaitable: Awaitable[T], critical: bool = True) -> T | None:
+        """Await a phase and time it. A failing non-critical phase is logged and yields None."""
+        since = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            if critical:
+                raise
+            logger.warning("Startup phase %s failed; continuing without it", name, exc_info=True)
+            return None
+        finally:
+            self.record(name, since)
+
+    def report(self, milestone: str) -> None:
+        """Log the time from startup to milestone with each phase's duration, once."""
+        if self.reported:
+            return
+        self.reported = True
+        breakdown = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        logger.info(
+            "Startup: %s after %.0fms (%s)", milestone, (time.perf_counter() - self.started) * 1000, breakdown,
+        )
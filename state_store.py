@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+FLUSH_DELAY_SECONDS = 0.5
+
+
+class StateStore:
+    """Write-behind persistence for per-room bot state, backed by SQLite in WAL mode.
+
+    schedule() only records the latest snapshot for a room; a background task writes
+    pending snapshots in one transaction shortly after, off the event loop. Several
+    changes to the same room within the delay collapse into a single row write.
+    """
+
+    def __init__(self, path: Path, flush_delay: float = FLUSH_DELAY_SECONDS) -> None:
+        self._path = path
+        self._flush_delay = flush_delay
+        self._conn: sqlite3.Connection | None = None
+        self._pending: dict[str, dict] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._writing: asyncio.Future | None = None
+
+    def open(self) -> dict[str, dict]:
+        """Open (creating if needed) the database and return every stored room snapshot."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used from one worker thread at a time (the flusher), never concurrently
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS room_state ("
+            " room_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        return self._read_all(self._conn)
+
+    def read(self) -> dict[str, dict]:
+        """Re-read every stored room snapshot, e.g. rows written by another worker process.
+
+        Uses a connection of its own, so it is safe while the flusher is writing.
+        """
+        conn = sqlite3.connect(str(self._path), timeout=5.0)
+        try:
+            return self._read_all(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read_all(conn: sqlite3.Connection) -> dict[str, dict]:
+        states: dict[str, dict] = {}
+        for room_id, data in conn.execute("SELECT room_id, data FROM room_state"):
+            try:
+                states[room_id] = json.loads(data)
+            except ValueError:
+                logger.warning("Dropping unreadable saved state for room %s", room_id[:12])
+        return states
+
+    def schedule(self, room_id: str, snapshot: dict) -> None:
+        """Queue a room's latest state for writing. Cheap; never blocks."""
+        self._pending[room_id] = snapshot
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._flush_loop())
+        self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Let a burst of changes accumulate into one transaction
+            await asyncio.sleep(self._flush_delay)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all pending snapshots now."""
+        if not self._pending or self._conn is None:
+            return
+        if self._writing is not None and not self._writing.done():
+            await asyncio.wait([self._writing])
+        batch, self._pending = self._pending, {}
+        # The write runs to completion even if the awaiting task is cancelled
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, batch))
+        try:
+            await asyncio.shield(self._writing)
+        except sqlite3.Error:
+            logger.exception("Failed to persist room state")
+            # Keep anything newer that arrived meanwhile; retry the rest next flush
+            self._pending = {**batch, **self._pending}
+
+    def _write(self, batch: dict[str, dict]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO room_state (room_id, data, updated_at) VALUES (?, ?, ?)",
+                [(room_id, json.dumps(snapshot), now) for room_id, snapshot in batch.items()],
+            )
+
+    async def close(self) -> None:
+        """Flush outstanding writes and close the database."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._writing is not None and not self._writing.done():
+            await asyncio.wait([self._writing])
+        await self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
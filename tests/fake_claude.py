@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Stand-in for the `claude` CLI, for tests and benchmarks of claude_cli.py.
+
+Accepts the arguments the bridge passes (--print, --output-format text|stream-json,
+--verbose, --resume ID | --session-id ID, --dangerously-skip-permissions, -- MESSAGE)
+and behaves according to environment variables:
+
+    FAKE_CLAUDE_DELAY         seconds to wait before any output (default 0)
+    FAKE_CLAUDE_OUTPUT_BYTES  size of the reply text (default: just the echo line)
+    FAKE_CLAUDE_CHUNKS        write the reply in this many pieces (default 1)
+    FAKE_CLAUDE_CHUNK_DELAY   seconds between pieces (default 0)
+    FAKE_CLAUDE_TOOL_CALLS    tool_use events emitted in stream-json mode (default 0)
+    FAKE_CLAUDE_STDERR        text written to stderr
+    FAKE_CLAUDE_EXIT_CODE     exit status (default 0)
+    FAKE_CLAUDE_HANG          1 = never finish; 'child' = also leave a sleeping child process
+
+Point the bridge at it with CLAUDE_CLI_PATH=/path/to/tests/fake_claude.py.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def _env_float(name: str, default: float = 0.0) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+def parse_args(argv: list[str]) -> dict:
+    opts = {"print": False, "format": "text", "resume": None, "session_id": None, "message": None}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--":
+            opts["message"] = " ".join(argv[i + 1:])
+            break
+        if arg == "--print":
+            opts["print"] = True
+        elif arg in ("--verbose", "--dangerously-skip-permissions"):
+            pass
+        elif arg in ("--output-format", "--resume", "--session-id") and i + 1 < len(argv):
+            key = {"--output-format": "format", "--resume": "resume", "--session-id": "session_id"}[arg]
+            opts[key] = argv[i + 1]
+            i += 1
+        else:
+            sys.exit(f"fake_claude: unsupported argument {arg!r}")
+        i += 1
+
+    if not opts["print"]:
+        sys.exit("fake_claude: only --print mode is supported")
+    if opts["format"] not in ("text", "stream-json"):
+        sys.exit(f"fake_claude: unknown output format {opts['format']!r}")
+    if (opts["resume"] is None) == (opts["session_id"] is None):
+        sys.exit("fake_claude: exactly one of --resume or --session-id is required")
+    if opts["message"] is None:
+        sys.exit("fake_claude: no message given")
+    return opts
+
+
+def reply_text(message: str) -> str:
+    text = f"fake reply to: {message}"
+    size = int(_env_float("FAKE_CLAUDE_OUTPUT_BYTES", 0))
+    if size > len(text):
+        filler = "lorem ipsum dolor sit amet\n"
+        text += "\n" + (filler * (size // len(filler) + 1))[: size - len(text) - 1]
+    return text
+
+
+def _write_in_pieces(data: str) -> None:
+    pieces = max(1, int(_env_float("FAKE_CLAUDE_CHUNKS", 1)))
+    pause = _env_float("FAKE_CLAUDE_CHUNK_DELAY")
+    step = -(-len(data) // pieces) or 1
+    for start in range(0, len(data), step):
+        if start and pause:
+            time.sleep(pause)
+        sys.stdout.write(data[start:start + step])
+        sys.stdout.flush()
+
+
+def _event(**fields) -> str:
+    return json.dumps(fields) + "\n"
+
+
+def main() -> None:
+    opts = parse_args(sys.argv[1:])
+    session_id = opts["resume"] or opts["session_id"]
+
+    hang = os.environ.get("FAKE_CLAUDE_HANG", "")
+    if hang:
+        if hang == "child":
+            # Like a tool subprocess: only killing the whole process group stops it
+            subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+        while True:
+            time.sleep(3600)
+
+    time.sleep(_env_float("FAKE_CLAUDE_DELAY"))
+    stderr = os.environ.get("FAKE_CLAUDE_STDERR", "")
+    if stderr:
+        sys.stderr.write(stderr)
+        sys.stderr.flush()
+
+    text = reply_text(opts["message"])
+    if opts["format"] == "text":
+        _write_in_pieces(text)
+    else:
+        out = _event(type="system", subtype="init", session_id=session_id)
+        for n in range(int(_env_float("FAKE_CLAUDE_TOOL_CALLS"))):
+            out += _event(
+                type="assistant",
+                session_id=session_id,
+                message={"content": [{"type": "tool_use", "id": f"tool-{n}", "name": "Bash", "input": {}}]},
+            )
+        out += _event(type="assistant", session_id=session_id, message={"content": [{"type": "text", "text": text}]})
+        out += _event(type="result", subtype="success", session_id=session_id, result=text)
+        _write_in_pieces(out)
+
+    sys.exit(int(_env_float("FAKE_CLAUDE_EXIT_CODE")))
+
+
+if __name__ == "__main__":
+    main()
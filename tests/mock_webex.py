@@ -0,0 +1,224 @@
+"""In-process mock of the Webex REST endpoints the bridge uses, for integration tests and benchmarks.
+
+Covers GET /people/me, GET /rooms, GET/POST /messages, GET /messages/direct and
+PUT /messages/{id}, with configurable latency and 429 injection. Rooms are 1:1
+rooms between the bot and simulated users.
+
+    mock = MockWebex(latency=0.02, rate_limit_every=50)
+    await mock.start()
+    room_id = mock.add_room("alice@example.com")
+    mock.post_user_message(room_id, "hello")
+    api = WebexAPI(base_url=mock.url, token="test")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+BOT_ID = "bot-person-id"
+BOT_EMAIL = "bridge-bot@webex.bot"
+
+
+def _webex_time(epoch: float) -> str:
+    """Format epoch seconds the way Webex does: ISO-8601 UTC with milliseconds."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{int(epoch % 1 * 1000):03d}Z"
+
+
+@dataclass
+class MockRoom:
+    id: str
+    person_email: str
+    person_id: str
+    messages: list[dict] = field(default_factory=list)  # Oldest first
+    last_activity: float = field(default_factory=time.time)
+
+
+class MockWebex:
+    """Serves a fake Webex API over HTTP on 127.0.0.1.
+
+    latency/jitter delay every response (seconds). rate_limit_every returns a 429
+    for every Nth request; rate_limit_probability does so at random. Both send
+    Retry-After: retry_after.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_every: int = 0,
+        rate_limit_probability: float = 0.0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self.rooms: dict[str, MockRoom] = {}
+        self._rooms_by_email: dict[str, MockRoom] = {}
+        self._messages: dict[str, tuple[MockRoom, dict]] = {}
+        self._next_id = 0
+        self.calls: Counter[str] = Counter()  # "METHOD /endpoint" -> count
+        self.rate_limited = 0
+        self._requests = 0
+        self._server: asyncio.AbstractServer | None = None
+        self.url = ""
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/v1"
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # -- Simulated world -------------------------------------------------------------
+
+    def _new_id(self, prefix: str) -> str:
+        self._next_id += 1
+        return f"{prefix}-{self._next_id}"
+
+    def add_room(self, person_email: str) -> str:
+        """Create (or return) the direct room between the bot and a user."""
+        room = self._rooms_by_email.get(person_email.lower())
+        if room is None:
+            room = MockRoom(self._new_id("room"), person_email, self._new_id("person"))
+            self.rooms[room.id] = room
+            self._rooms_by_email[person_email.lower()] = room
+        return room.id
+
+    def _add_message(self, room: MockRoom, person_id: str, person_email: str, **content) -> dict:
+        now = time.time()
+        msg = {
+            "id": self._new_id("msg"),
+            "roomId": room.id,
+            "roomType": "direct",
+            "personId": person_id,
+            "personEmail": person_email,
+            "created": _webex_time(now),
+            **content,
+        }
+        room.messages.append(msg)
+        room.last_activity = now
+        self._messages[msg["id"]] = (room, msg)
+        return msg
+
+    def post_user_message(self, room_id: str, text: str) -> dict:
+        """Simulate the room's user sending a message."""
+        room = self.rooms[room_id]
+        return self._add_message(room, room.person_id, room.person_email, text=text)
+
+    def bot_messages(self, room_id: str) -> list[dict]:
+        return [m for m in self.rooms[room_id].messages if m["personId"] == BOT_ID]
+
+    # -- HTTP ------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+
+                status, payload, extra = await self._respond(method, target, body)
+                data = json.dumps(payload).encode() if payload is not None else b""
+                head = f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                head += "Content-Type: application/json\r\n"
+                head += f"Content-Length: {len(data)}\r\n"
+                for name, value in extra.items():
+                    head += f"{name}: {value}\r\n"
+                writer.write(head.encode() + b"\r\n" + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str, body: bytes) -> tuple[int, dict | None, dict]:
+        url = urlsplit(target)
+        path = url.path[len("/v1"):] if url.path.startswith("/v1") else url.path
+        params = dict(parse_qsl(url.query))
+        parts = [p for p in path.split("/") if p]
+        endpoint = "/" + "/".join(p if i == 0 or p in ("me", "direct") else "{id}" for i, p in enumerate(parts))
+        self.calls[f"{method} {endpoint}"] += 1
+        self._requests += 1
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if (self.rate_limit_every and self._requests % self.rate_limit_every == 0) or (
+            self.rate_limit_probability and self._random.random() < self.rate_limit_probability
+        ):
+            self.rate_limited += 1
+            return 429, {"message": "Too Many Requests"}, {"Retry-After": str(self.retry_after)}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"message": "Invalid JSON"}, {}
+
+        if method == "GET" and path == "/people/me":
+            return 200, {"id": BOT_ID, "emails": [BOT_EMAIL], "displayName": "Bridge Bot"}, {}
+        if method == "GET" and path == "/rooms":
+            rooms = sorted(self.rooms.values(), key=lambda r: r.last_activity, reverse=True)
+            rooms = rooms[: int(params.get("max", "100"))]
+            return 200, {"items": [{"id": r.id, "type": "direct", "title": r.person_email} for r in rooms]}, {}
+        if method == "GET" and path == "/messages":
+            return self._list_messages(params)
+        if method == "GET" and path == "/messages/direct":
+            room = self._rooms_by_email.get(params.get("personEmail", "").lower())
+            return 200, {"items": list(reversed(room.messages)) if room else []}, {}
+        if method == "POST" and path == "/messages":
+            return self._create_message(payload)
+        if method == "PUT" and len(parts) == 2 and parts[0] == "messages":
+            found = self._messages.get(parts[1])
+            if found is None:
+                return 404, {"message": "Message not found"}, {}
+            found[1].update({k: v for k, v in payload.items() if k in ("markdown", "text")}, updated=_webex_time(time.time()))
+            return 200, found[1], {}
+        return 404, {"message": f"No mock for {method} {path}"}, {}
+
+    def _list_messages(self, params: dict) -> tuple[int, dict, dict]:
+        room = self.rooms.get(params.get("roomId", ""))
+        if room is None:
+            return 404, {"message": "Room not found"}, {}
+        newest_first = list(reversed(room.messages))
+        before = params.get("beforeMessage")
+        if before:
+            ids = [m["id"] for m in newest_first]
+            newest_first = newest_first[ids.index(before) + 1:] if before in ids else []
+        return 200, {"items": newest_first[: int(params.get("max", "50"))]}, {}
+
+    def _create_message(self, payload: dict) -> tuple[int, dict, dict]:
+        if "roomId" in payload:
+            room = self.rooms.get(payload["roomId"])
+            if room is None:
+                return 404, {"message": "Room not found"}, {}
+        elif "toPersonEmail" in payload:
+            room = self.rooms[self.add_room(payload["toPersonEmail"])]
+        else:
+            return 400, {"message": "roomId or toPersonEmail required"}, {}
+        content = {k: payload[k] for k in ("text", "markdown", "attachments") if k in payload}
+        return 200, self._add_message(room, BOT_ID, BOT_EMAIL, **content), {}
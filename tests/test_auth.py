@@ -0,0 +1,83 @@
+"""Tests for auth.py allowlists and user profiles."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+import json
+from pathlib import Path
+
+from auth import Authorizer, UserProfile, load_profiles
+from config import CLI_TIMEOUT_SECONDS
+
+
+def test_listed_emails_ignore_case_and_whitespace():
+    auth = Authorizer(emails=[" Alice@Example.com ", ""])
+    assert auth.is_authorized("alice@example.com")
+    assert auth.is_authorized("ALICE@example.com ")
+    assert not auth.is_authorized("bob@example.com")
+    assert not auth.is_authorized("")
+
+
+def test_domain_rule_matches_whole_domain_only():
+    auth = Authorizer(domains=["@Example.com"])
+    assert auth.is_authorized("carol@example.com")
+    assert not auth.is_authorized("carol@evil-example.com")
+    assert not auth.is_authorized("carol@sub.example.com")
+    assert not auth.is_authorized("carol@example.com.evil.org")
+    assert not auth.is_authorized("@example.com")
+
+
+def test_profiles_authorize_and_default():
+    alice = UserProfile("alice@example.com", Path("/homes/alice"), allow_skip_permissions=False)
+    auth = Authorizer(domains=["example.com"], profiles=[alice], user_homes=Path("/state/homes"))
+    assert auth.is_authorized("Alice@example.com")
+    assert auth.profile("ALICE@example.com") is alice
+    # Users let in by the allowlist get their own home and safe mode, never the owner's
+    default = auth.profile("dave@example.com")
+    assert default.claude_config_dir == Path("/state/homes/dave@example.com")
+    assert not default.allow_skip_permissions
+    assert default.cli_timeout_seconds == CLI_TIMEOUT_SECONDS
+
+
+def test_owner_keeps_the_bridge_home_and_skip_permissions():
+    bob = UserProfile("bob@example.com", cli_timeout_seconds=60)
+    auth = Authorizer(profiles=[bob], owner=" Owner@Example.com", user_homes=Path("/state/homes"))
+    assert auth.is_authorized("owner@example.com")
+    owner = auth.profile("OWNER@example.com")
+    assert owner.claude_config_dir is None
+    assert owner.allow_skip_permissions
+    # A profile without a home still doesn't share the owner's
+    assert auth.profile("bob@example.com").claude_config_dir == Path("/state/homes/bob@example.com")
+
+
+def test_user_home_stays_inside_the_homes_directory():
+    auth = Authorizer(emails=["../../etc@x", ".."], user_homes=Path("/state/homes"))
+    for email in ("../../etc@x", ".."):
+        assert auth.profile(email).claude_config_dir.parent == Path("/state/homes")
+
+
+def test_load_profiles(tmp_path):
+    users = tmp_path / "users.json"
+    users.write_text(json.dumps({
+        "Alice@Example.com": {"claude_config_dir": "/homes/alice", "allow_skip_permissions": False},
+        "bob@example.com": {"cli_timeout_seconds": 60},
+    }))
+    alice, bob = sorted(load_profiles(users), key=lambda p: p.email)
+    assert alice == UserProfile("alice@example.com", Path("/homes/alice"), False, CLI_TIMEOUT_SECONDS)
+    assert bob.claude_config_dir is None
+    assert not bob.allow_skip_permissions
+    assert bob.cli_timeout_seconds == 60.0
+
+
+def test_load_profiles_invalid_file_grants_nothing(tmp_path):
+    bad = tmp_path / "users.json"
+    bad.write_text("[not json")
+    assert load_profiles(bad) == []
+    bad.write_text(json.dumps(["alice@example.com"]))
+    assert load_profiles(bad) == []
+    assert load_profiles(tmp_path / "missing.json") == []
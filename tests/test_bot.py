@@ -1,5 +1,7 @@
-"""Tests for bot.py pure functions: split_message, _hard_split_line, _relative_time."""
+"""Tests for bot.py: split_message, _hard_split_line, _relative_time, poll window sizing, state and fingerprints."""
 
+import asyncio
+import json
 import os
 import sys
 import time
@@ -10,7 +12,18 @@ os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from bot import split_message, _hard_split_line, _relative_time
+from bot import (
+    BotState,
+    POLL_WINDOW_MAX,
+    POLL_WINDOW_MIN,
+    _poll_window,
+    _record_burst,
+    _relative_time,
+    _turn_fingerprint,
+    split_message,
+)
+from postprocess import hard_split_line as _hard_split_line
+from sessions import ClaudeHome, SessionCatalog, SessionInfo
 
 
 # ---------------------------------------------------------------------------
@@ -146,3 +159,86 @@ class TestRelativeTime:
         now_ms = int(time.time() * 1000)
         future = now_ms + (60 * 60 * 1000)  # 1 hour in the future
         assert _relative_time(future) == "just now"
+
+
+# ---------------------------------------------------------------------------
+# Adaptive poll window
+# ---------------------------------------------------------------------------
+
+class TestPollWindow:
+    def test_quiet_room_uses_minimum(self):
+        assert _poll_window("quiet-room") == POLL_WINDOW_MIN
+
+    def test_window_grows_with_bursts_and_is_capped(self):
+        room = "busy-room"
+        for _ in range(10):
+            _record_burst(room, 25)
+        assert POLL_WINDOW_MIN < _poll_window(room) <= POLL_WINDOW_MAX
+        assert _poll_window(room) % POLL_WINDOW_MIN == 0
+
+        for _ in range(10):
+            _record_burst(room, 1000)
+        assert _poll_window(room) == POLL_WINDOW_MAX
+
+    def test_window_shrinks_when_bursts_stop(self):
+        room = "calming-room"
+        for _ in range(5):
+            _record_burst(room, 40)
+        for _ in range(30):
+            _record_burst(room, 0)
+        assert _poll_window(room) == POLL_WINDOW_MIN
+
+
+# ---------------------------------------------------------------------------
+# BotState persistence
+# ---------------------------------------------------------------------------
+
+class TestBotStateSnapshot:
+    def test_round_trip(self, tmp_path):
+        session = SessionInfo(
+            session_id="abc",
+            project="/work",
+            display="fix tests",
+            timestamp=123,
+            cwd="/work",
+            session_path=tmp_path / "abc.jsonl",
+        )
+        state = BotState(
+            session_id="abc",
+            session_cwd="/work",
+            session_label="fix tests",
+            skip_permissions=True,
+            pending_sessions=[session],
+            processing=True,
+        )
+
+        restored = BotState.from_dict(json.loads(json.dumps(state.to_dict())))
+
+        assert restored.session_id == "abc"
+        assert restored.skip_permissions is True
+        assert restored.pending_sessions == [session]
+        # In-flight turn state is not persisted
+        assert restored.processing is False
+
+
+# ---------------------------------------------------------------------------
+# Response cache fingerprints
+# ---------------------------------------------------------------------------
+
+class TestTurnFingerprint:
+    def test_transcript_is_found_when_project_differs_from_cwd(self, tmp_path):
+        home = ClaudeHome.at(tmp_path / "claude")
+        transcript = home.projects_dir / "-work-repo" / "s1.jsonl"
+        transcript.parent.mkdir(parents=True)
+        transcript.write_text(json.dumps({"type": "user", "cwd": "/work/repo"}) + "\n")
+        home.history_file.write_text(json.dumps({"sessionId": "s1", "project": "/work/repo", "timestamp": 1}) + "\n")
+        cwd = tmp_path / "moved"
+        cwd.mkdir()
+        catalog = SessionCatalog(home)
+
+        stored = asyncio.run(_turn_fingerprint("s1", str(transcript), str(cwd), catalog))
+        looked_up = asyncio.run(_turn_fingerprint("s1", "", str(cwd), catalog))
+
+        assert stored is not None
+        assert stored.session_size == transcript.stat().st_size
+        assert looked_up == stored
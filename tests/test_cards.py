@@ -0,0 +1,57 @@
+"""Tests for cards.py templates and pre-encoded card message bodies."""
+
+import json
+import os
+import sys
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+import cards
+from webex_api import encode_card_message
+
+
+class TestCardTemplate:
+    def test_render_matches_plain_dict(self):
+        template = cards.CardTemplate(cards.adaptive_card(
+            {"type": "TextBlock", "text": cards.slot("title")},
+            {"type": "FactSet", "facts": [{"title": "A", "value": "1"}, cards.spread("facts")]},
+        ))
+        rendered = template.render(
+            title='say "hi" \\ ·',
+            facts=[cards.FACT.render(title="B", value="2"), cards.FACT.render(title="C", value="3")],
+        )
+        assert json.loads(rendered) == cards.adaptive_card(
+            {"type": "TextBlock", "text": 'say "hi" \\ ·'},
+            {"type": "FactSet", "facts": [
+                {"title": "A", "value": "1"}, {"title": "B", "value": "2"}, {"title": "C", "value": "3"},
+            ]},
+        )
+        assert template.slots == {"title", "facts"}
+
+    def test_empty_spread_leaves_valid_json(self):
+        rendered = cards.STATUS_CONNECTED.render(session="s", directory="d", mode="m", extra=[])
+        facts = json.loads(rendered)["body"][1]["facts"]
+        assert [f["title"] for f in facts] == ["Session", "Directory", "Mode"]
+
+    def test_spread_must_follow_another_element(self):
+        with pytest.raises(ValueError):
+            cards.CardTemplate({"items": [cards.spread("rows")]})
+
+    def test_static_template_renders_verbatim(self):
+        template = cards.CardTemplate({"type": "TextBlock", "text": "fixed"})
+        assert template.render() == '{"type":"TextBlock","text":"fixed"}'
+
+
+def test_encode_card_message_wraps_card_json():
+    body = encode_card_message({"roomId": "room-1"}, cards.welcome([("/new", "Start")], "tip"), "fallback ✓")
+    decoded = json.loads(body)
+    assert decoded["roomId"] == "room-1"
+    assert decoded["text"] == "fallback ✓"
+    attachment = decoded["attachments"][0]
+    assert attachment["contentType"] == "application/vnd.microsoft.card.adaptive"
+    assert attachment["content"]["body"][1]["facts"] == [{"title": "/new", "value": "Start"}]
@@ -0,0 +1,145 @@
+"""Tests for claude_cli.py against the fake claude CLI (tests/fake_claude.py)."""
+
+import os
+import sys
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+import claude_cli
+from process_registry import ProcessRegistry
+
+FAKE_CLAUDE = os.path.join(os.path.dirname(__file__), "fake_claude.py")
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="fake CLI is run via its shebang")
+
+
+def _group_alive(pgid):
+    """True if any non-zombie process is left in the process group."""
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[2]) == pgid and fields[0] != "Z":
+            return True
+    return False
+
+
+@pytest.fixture
+def fake_cli(tmp_path, monkeypatch):
+    """Route claude_cli at the fake CLI with a throwaway process registry."""
+    for name in list(os.environ):
+        if name.startswith("FAKE_CLAUDE_"):
+            monkeypatch.delenv(name)
+    with patch.object(claude_cli, "CLAUDE_CLI_PATH", FAKE_CLAUDE), \
+            patch.object(claude_cli, "registry", ProcessRegistry(tmp_path / "processes.json")):
+        yield monkeypatch
+
+
+class TestClaudeCli:
+    @pytest.mark.asyncio
+    async def test_text_reply(self, fake_cli, tmp_path):
+        reply = await claude_cli.send_message("sess-1", "hello", str(tmp_path))
+        assert reply == "fake reply to: hello"
+
+    @pytest.mark.asyncio
+    async def test_stream_json_reports_tool_calls(self, fake_cli, tmp_path):
+        fake_cli.setenv("FAKE_CLAUDE_TOOL_CALLS", "3")
+        tools = []
+        reply = await claude_cli.start_new_session("sess-1", "go", str(tmp_path), on_tool_use=tools.append)
+        assert reply == "fake reply to: go"
+        assert tools == ["Bash", "Bash", "Bash"]
+
+    @pytest.mark.asyncio
+    async def test_stream_json_reply_beyond_the_spill_limit(self, fake_cli, tmp_path):
+        fake_cli.setenv("FAKE_CLAUDE_OUTPUT_BYTES", "200000")
+        fake_cli.setenv("FAKE_CLAUDE_CHUNKS", "25")
+        spill_dir = tmp_path / "output"
+        with patch.object(claude_cli, "CLI_OUTPUT_SPILL_BYTES", 4096), \
+                patch.object(claude_cli, "CLI_OUTPUT_SPILL_DIR", spill_dir):
+            reply = await claude_cli.start_new_session("sess-1", "go", str(tmp_path), on_tool_use=lambda name: None)
+
+        assert reply.startswith("fake reply to: go")
+        assert "too large to post in full" in reply
+        (spilled,) = spill_dir.iterdir()
+        head = reply.split("\n\n_Output was too large")[0]
+        assert len(head.encode()) + spilled.stat().st_size == 200000
+
+    @pytest.mark.asyncio
+    async def test_nonzero_exit_is_reported(self, fake_cli, tmp_path):
+        fake_cli.setenv("FAKE_CLAUDE_EXIT_CODE", "1")
+        fake_cli.setenv("FAKE_CLAUDE_STDERR", "token expired")
+        reply = await claude_cli.send_message("sess-1", "hello", str(tmp_path))
+        assert "exit code 1" in reply
+        assert "credentials" in reply
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_hung_cli(self, fake_cli, tmp_path):
+        fake_cli.setenv("FAKE_CLAUDE_HANG", "1")
+        with patch.object(claude_cli, "CLI_TIMEOUT_SECONDS", 0.5):
+            started = time.monotonic()
+            reply = await claude_cli.send_message("sess-1", "hello", str(tmp_path))
+        assert reply.startswith("Error: CLI timed out")
+        assert time.monotonic() - started < 5
+        assert claude_cli.registry.live() == []
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_process_group(self, fake_cli, tmp_path):
+        fake_cli.setenv("FAKE_CLAUDE_HANG", "child")
+        started = asyncio.Event()
+        procs = []
+
+        def on_started(process):
+            procs.append(process)
+            started.set()
+
+        task = asyncio.ensure_future(
+            claude_cli.send_message("sess-1", "hello", str(tmp_path), on_process_started=on_started)
+        )
+        await asyncio.wait_for(started.wait(), timeout=10)
+        await asyncio.sleep(0.2)  # Let the fake start its child
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        if os.path.isdir("/proc"):
+            assert not _group_alive(procs[0].pid)
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_registering_kills_process(self, fake_cli, tmp_path):
+        fake_cli.setenv("FAKE_CLAUDE_HANG", "1")
+        procs = []
+        saves = []
+
+        async def stuck_save():
+            saves.append(1)
+            if len(saves) == 1:  # Only the write made by add() hangs
+                await asyncio.Event().wait()
+
+        task = asyncio.ensure_future(
+            claude_cli.send_message("sess-1", "hello", str(tmp_path), on_process_started=procs.append)
+        )
+        with patch.object(claude_cli.registry, "_save", stuck_save):
+            for _ in range(200):
+                if procs:
+                    break
+                await asyncio.sleep(0.05)
+            assert procs, "on_process_started was not called while the registry write was pending"
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(task, timeout=10)
+
+        assert procs[0].returncode is not None
+        assert claude_cli.registry.live() == []
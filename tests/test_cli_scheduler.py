@@ -0,0 +1,118 @@
+"""Tests for cli_scheduler.py: concurrency cap, round-robin fairness, load-aware admission."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from cli_scheduler import CliScheduler
+
+
+async def _hold(scheduler, room_id, order, release):
+    async with scheduler.slot(room_id):
+        order.append(room_id)
+        await release.wait()
+
+
+class TestCliScheduler:
+    @pytest.mark.asyncio
+    async def test_caps_concurrency(self):
+        scheduler = CliScheduler(max_concurrency=2)
+        release = asyncio.Event()
+        order = []
+        tasks = [asyncio.ensure_future(_hold(scheduler, f"room-{i}", order, release)) for i in range(5)]
+        await asyncio.sleep(0.01)
+
+        assert scheduler.running == 2
+        assert scheduler.queued == 3
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.running == 0
+        assert len(order) == 5
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_rooms(self):
+        scheduler = CliScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+        order = []
+        blocker = asyncio.ensure_future(_hold(scheduler, "blocker", order, gate))
+        await asyncio.sleep(0)
+
+        done = asyncio.Event()
+        done.set()
+        # Busy room queues three runs before the quiet room queues one
+        tasks = [asyncio.ensure_future(_hold(scheduler, "busy", order, done)) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(_hold(scheduler, "quiet", order, done)))
+        await asyncio.sleep(0)
+
+        gate.set()
+        await asyncio.gather(blocker, *tasks)
+        assert order == ["blocker", "busy", "quiet", "busy", "busy"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = CliScheduler(max_concurrency=1)
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.ensure_future(_hold(scheduler, "a", order, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(_hold(scheduler, "b", order, release))
+        await asyncio.sleep(0)
+        assert scheduler.queued == 1
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queued == 0
+
+        release.set()
+        await holder
+        assert scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_high_load_holds_all_but_first_run(self):
+        scheduler = CliScheduler(max_concurrency=4, max_load_per_cpu=1.0, host_sample_seconds=0)
+        release = asyncio.Event()
+        order = []
+        with patch("cli_scheduler._load_per_cpu", return_value=5.0):
+            tasks = [asyncio.ensure_future(_hold(scheduler, f"room-{i}", order, release)) for i in range(3)]
+            await asyncio.sleep(0.01)
+            assert scheduler.running == 1
+            assert scheduler.queued == 2
+
+        # Load drops: the next finished run admits everyone waiting
+        with patch("cli_scheduler._load_per_cpu", return_value=0.1):
+            release.set()
+            await asyncio.gather(*tasks)
+        assert len(order) == 3
+
+    @pytest.mark.asyncio
+    async def test_low_memory_holds_runs(self):
+        scheduler = CliScheduler(max_concurrency=4, min_free_memory_mb=1024)
+        release = asyncio.Event()
+        order = []
+        with patch("cli_scheduler._free_memory_bytes", return_value=100 * 1024 * 1024):
+            tasks = [asyncio.ensure_future(_hold(scheduler, f"room-{i}", order, release)) for i in range(2)]
+            await asyncio.sleep(0.01)
+            assert scheduler.running == 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_host_reading_is_reused_between_dispatches(self):
+        scheduler = CliScheduler(max_concurrency=8, max_load_per_cpu=1.0)
+        release = asyncio.Event()
+        order = []
+        with patch("cli_scheduler._load_per_cpu", return_value=0.1) as load:
+            tasks = [asyncio.ensure_future(_hold(scheduler, f"room-{i}", order, release)) for i in range(5)]
+            await asyncio.sleep(0.01)
+            assert scheduler.running == 5
+            release.set()
+            await asyncio.gather(*tasks)
+        assert load.call_count == 1
@@ -0,0 +1,78 @@
+"""Tests for cursor_store.py: durable poll cursors and atomic writes."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+
+import pytest
+
+from cursor_store import CursorStore, write_json_atomic
+
+
+class TestCursorStore:
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        path = tmp_path / "state" / "cursors.json"
+        store = CursorStore(path)
+        store.advance("room-1", "msg-9", "2026-01-01T00:00:00.000Z")
+        await store.flush()
+
+        reloaded = CursorStore(path)
+        reloaded.load()
+        assert "room-1" in reloaded
+        assert reloaded.get("room-1").last_seen == "msg-9"
+        assert reloaded.get("room-1").last_created == "2026-01-01T00:00:00.000Z"
+
+    @pytest.mark.asyncio
+    async def test_flush_skips_when_unchanged(self, tmp_path):
+        path = tmp_path / "cursors.json"
+        store = CursorStore(path)
+        store.advance("room-1", "msg-1")
+        await store.flush()
+        path.unlink()
+
+        store.advance("room-1", "msg-1")  # Same position: nothing to write
+        await store.flush()
+        assert not path.exists()
+
+    def test_missing_file_starts_empty(self, tmp_path):
+        store = CursorStore(tmp_path / "nope.json")
+        store.load()
+        assert len(store) == 0
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        path = tmp_path / "cursors.json"
+        path.write_text("{not json")
+        store = CursorStore(path)
+        store.load()
+        assert len(store) == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_stores_merge_their_rooms(self, tmp_path):
+        path = tmp_path / "cursors.json"
+        worker_a, worker_b = CursorStore(path, shared=True), CursorStore(path, shared=True)
+        worker_a.load()
+        worker_b.load()
+        worker_a.advance("room-a", "msg-1")
+        await worker_a.flush()
+        worker_b.advance("room-b", "msg-2")
+        await worker_b.flush()  # Must not drop room-a, which worker_b never loaded
+
+        worker_a.advance("room-a", "msg-3")
+        await worker_a.flush()
+        merged = CursorStore(path)
+        merged.load()
+        assert merged.get("room-a").last_seen == "msg-3"
+        assert merged.get("room-b").last_seen == "msg-2"
+
+
+class TestWriteJsonAtomic:
+    def test_replaces_without_leaving_temp_files(self, tmp_path):
+        path = tmp_path / "data.json"
+        write_json_atomic(path, {"a": 1})
+        write_json_atomic(path, {"a": 2})
+        assert json.loads(path.read_text()) == {"a": 2}
+        assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
@@ -0,0 +1,38 @@
+"""Tests for event_loop.py: backend selection and fallback."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import logging
+
+import pytest
+
+import event_loop
+
+
+async def _loop_type() -> str:
+    await asyncio.sleep(0)
+    return type(asyncio.get_running_loop()).__module__
+
+
+def test_asyncio_backend():
+    assert event_loop.loop_factory("asyncio") is asyncio.new_event_loop
+    assert event_loop.run(_loop_type(), "asyncio").startswith("asyncio")
+
+
+def test_missing_uvloop_falls_back(monkeypatch, caplog):
+    monkeypatch.setattr(event_loop, "uvloop", None)
+    with caplog.at_level(logging.WARNING, logger="event_loop"):
+        assert event_loop.loop_factory("uvloop") is asyncio.new_event_loop
+    assert "not installed" in caplog.text
+    caplog.clear()
+    assert event_loop.loop_factory("auto") is asyncio.new_event_loop
+    assert not caplog.records
+
+
+def test_uvloop_backend():
+    pytest.importorskip("uvloop")
+    assert event_loop.run(_loop_type(), "uvloop").startswith("uvloop")
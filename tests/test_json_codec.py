@@ -0,0 +1,28 @@
+"""Tests for json_codec.py codec selection."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch
+
+import pytest
+
+import json_codec
+
+
+@pytest.mark.parametrize("codec", [c for c in (json_codec.STDLIB, json_codec.ORJSON) if c is not None])
+def test_round_trip(codec):
+    value = {"text": "héllo \"quoted\" ✓", "items": [1, 2.5, None, True]}
+    encoded = codec.dumps(value)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == value
+
+
+def test_falls_back_to_stdlib_without_orjson():
+    with patch.object(json_codec, "ORJSON", None):
+        assert json_codec.get_codec("auto") is json_codec.STDLIB
+        assert json_codec.get_codec("orjson") is json_codec.STDLIB
+    assert json_codec.get_codec("stdlib") is json_codec.STDLIB
+    assert json_codec.get_codec("bogus") is json_codec.STDLIB
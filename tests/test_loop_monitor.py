@@ -0,0 +1,64 @@
+"""Tests for loop_monitor.py: lag measurement and the blocked-loop watchdog."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+import loop_monitor
+from loop_monitor import LoopMonitor, configure_loop
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_blocked_loop_is_reported_with_its_stack(caplog):
+    monitor = LoopMonitor(interval=0.02, threshold=0.1)
+    stalls = loop_monitor._loop_stalls.value()
+    lag_samples = loop_monitor._loop_lag.count()
+    with caplog.at_level(logging.WARNING, logger="loop_monitor"):
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+            _block_the_loop(0.4)
+            await asyncio.sleep(0.1)
+        finally:
+            await monitor.stop()
+
+    assert loop_monitor._loop_stalls.value() == stalls + 1
+    assert loop_monitor._loop_lag.count() > lag_samples
+    blocked = [r.getMessage() for r in caplog.records if "blocked" in r.getMessage()]
+    assert len(blocked) == 1
+    assert "_block_the_loop" in blocked[0]
+    # One stall, one log record: no separate lag warning once the loop is free
+    assert len(caplog.records) == 1
+
+
+@pytest.mark.asyncio
+async def test_quiet_loop_reports_nothing(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.2)
+    with caplog.at_level(logging.WARNING, logger="loop_monitor"):
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+    assert not caplog.records
+
+
+@pytest.mark.asyncio
+async def test_configure_loop_debug():
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    try:
+        configure_loop(loop, debug=True, slow_callback_seconds=0.05)
+        assert loop.get_debug()
+        assert loop.slow_callback_duration == 0.05
+    finally:
+        loop.set_debug(debug)
@@ -0,0 +1,128 @@
+"""Tests for metrics.py: metric types, text exposition and the /metrics endpoint."""
+
+import os
+import sys
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from metrics import Registry, serve
+from webex_api import _endpoint
+
+
+class TestRegistry:
+    def test_counter_and_gauge_render(self):
+        registry = Registry()
+        hits = registry.counter("hits_total", "Hits", ("room",))
+        hits.inc(room="a")
+        hits.inc(2, room="a")
+        registry.gauge("queued", "Queued").set(4)
+
+        text = registry.render()
+        assert "# TYPE hits_total counter" in text
+        assert 'hits_total{room="a"} 3' in text
+        assert "queued 4" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            latency.observe(value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "latency_seconds_count 4" in text
+        assert latency.count() == 4
+
+    def test_same_name_returns_existing_metric(self):
+        registry = Registry()
+        assert registry.counter("c", "C") is registry.counter("c", "C")
+        with pytest.raises(ValueError):
+            registry.gauge("c", "C")
+
+    def test_label_mismatch_rejected(self):
+        registry = Registry()
+        with pytest.raises(ValueError):
+            registry.counter("c", "C", ("room",)).inc(status="200")
+
+
+    def test_updates_from_threads_while_rendering(self):
+        registry = Registry()
+        hist = registry.histogram("work_seconds", "Work", ("kind",))
+        total = registry.counter("work_total", "Work")
+
+        def work(n):
+            for i in range(2000):
+                hist.observe(0.01, kind=str((n + i) % 50))
+                total.inc()
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            registry.render()
+        for t in threads:
+            t.join()
+        assert sum(hist.count(kind=str(k)) for k in range(50)) == 16000
+        assert total.value() == 16000
+
+
+class TestEndpointLabel:
+    def test_ids_are_collapsed(self):
+        assert _endpoint("/messages/Y2lzY29zcGFyazovL3Vz") == "/messages/{id}"
+        assert _endpoint("/people/me") == "/people/me"
+        assert _endpoint("/messages/direct") == "/messages/direct"
+        assert _endpoint("/rooms") == "/rooms"
+
+
+class TestServe:
+    @pytest.mark.asyncio
+    async def test_serves_metrics_and_404(self):
+        registry = Registry()
+        registry.counter("up_total", "Up").inc()
+        server = await serve(0, registry=registry)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async def get(path: str) -> bytes:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                await writer.drain()
+                data = await reader.read()
+                writer.close()
+                return data
+
+            ok = await get("/metrics")
+            assert ok.startswith(b"HTTP/1.1 200")
+            assert b"up_total 1" in ok
+            assert (await get("/other")).startswith(b"HTTP/1.1 404")
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_render_error_is_a_500(self, caplog):
+        registry = Registry()
+        server = await serve(0, registry=registry)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with patch.object(registry, "render", side_effect=RuntimeError("boom")):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+                await writer.drain()
+                data = await reader.read()
+                writer.close()
+            assert data.startswith(b"HTTP/1.1 500")
+            assert "Error serving metrics" in caplog.text
+        finally:
+            server.close()
+            await server.wait_closed()
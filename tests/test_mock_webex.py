@@ -0,0 +1,215 @@
+"""Integration tests: WebexAPI and the poll loop against the mock Webex server."""
+
+import os
+import sys
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+
+import bot
+from retry_policy import RetryPolicy
+from tracing import Tracer
+from tests.mock_webex import BOT_ID, MockWebex
+from webex_api import WebexAPI
+
+
+@asynccontextmanager
+async def running_mock():
+    """A started mock server plus a WebexAPI client pointed at it."""
+    mock = MockWebex()
+    await mock.start()
+    api = WebexAPI(base_url=mock.url, token="test", retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.02))
+    try:
+        await api.start()
+        yield mock, api
+    finally:
+        await api.close()
+        await mock.close()
+
+
+class TestWebexAPIAgainstMock:
+    @pytest.mark.asyncio
+    async def test_authenticates_and_sends(self):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("alice@example.com")
+            assert api.bot_id == BOT_ID
+
+            sent = await api.send_message(room_id, "hi")
+            edited = await api.edit_message(sent["id"], room_id, "hi again")
+            assert edited["markdown"] == "hi again"
+            assert mock.calls["POST /messages"] == 1
+            assert mock.calls["PUT /messages/{id}"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pages_back_to_cursor_after_burst(self):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("alice@example.com")
+            cursor = mock.post_user_message(room_id, "seen")
+            for i in range(25):
+                mock.post_user_message(room_id, f"burst {i}")
+
+            messages, reached = await api.list_messages_since(room_id, cursor["id"], cursor["created"], window=10)
+            assert reached
+            assert len(messages) == 25
+            assert messages[0]["text"] == "burst 24"
+
+    @pytest.mark.asyncio
+    async def test_retries_injected_429(self):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("alice@example.com")
+            mock.rate_limit_every = 2
+            mock.retry_after = 0
+            await api.list_messages(room_id)
+            assert mock.rate_limited == 1
+            assert mock.calls["GET /messages"] == 2
+
+
+class TestPollLoopAgainstMock:
+    @pytest.mark.asyncio
+    async def test_new_message_is_dispatched(self, tmp_path):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("test@example.com")
+            mock.post_user_message(room_id, "earlier")
+            seen = []
+
+            with patch.object(bot, "POLL_CURSOR_FILE", tmp_path / "cursors.json"), \
+                    patch.object(bot, "POLL_INTERVAL_SECONDS", 0.01), \
+                    patch.object(bot, "_start_turn", lambda api, room, text: seen.append((room, text))):
+                task = asyncio.ensure_future(bot.poll_loop(api))
+                try:
+                    # First cycle initializes the room (welcome card), the next picks up new messages
+                    for _ in range(200):
+                        if mock.bot_messages(room_id):
+                            break
+                        await asyncio.sleep(0.01)
+                    mock.post_user_message(room_id, "what changed?")
+                    for _ in range(200):
+                        if seen:
+                            break
+                        await asyncio.sleep(0.01)
+                finally:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+
+            assert seen == [(room_id, "what changed?")]
+
+    @pytest.mark.asyncio
+    async def test_messages_in_one_batch_are_answered_in_order(self, tmp_path):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("test@example.com")
+            mock.post_user_message(room_id, "earlier")
+            state = bot.get_state(room_id)
+            state.session_id, state.session_cwd = "session-1", str(tmp_path)
+
+            async def fake_cli(session_id, message, **kwargs):
+                await asyncio.sleep(0.05)
+                return f"answer to {message}"
+
+            with patch.object(bot, "POLL_CURSOR_FILE", tmp_path / "cursors.json"), \
+                    patch.object(bot, "POLL_INTERVAL_SECONDS", 0.01), \
+                    patch.object(bot, "cli_send_message", fake_cli):
+                task = asyncio.ensure_future(bot.poll_loop(api))
+                try:
+                    for _ in range(200):
+                        if mock.bot_messages(room_id):
+                            break
+                        await asyncio.sleep(0.01)
+                    mock.post_user_message(room_id, "first")
+                    mock.post_user_message(room_id, "second")
+                    for _ in range(300):
+                        texts = [m.get("markdown") for m in mock.bot_messages(room_id)]
+                        if "answer to second" in texts:
+                            break
+                        await asyncio.sleep(0.01)
+                finally:
+                    task.cancel()
+                    await asyncio.gather(task, *bot._turn_tasks, return_exceptions=True)
+                    bot._room_states.pop(room_id, None)
+
+            texts = [m.get("markdown") for m in mock.bot_messages(room_id)]
+            assert not any("Still processing" in (t or "") for t in texts)
+            assert texts.index("answer to first") < texts.index("answer to second")
+
+    @pytest.mark.asyncio
+    async def test_message_trace_covers_queueing_and_delivery(self, tmp_path):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("test@example.com")
+            mock.post_user_message(room_id, "earlier")
+            state = bot.get_state(room_id)
+            state.session_id, state.session_cwd = "session-1", str(tmp_path)
+            tracer = Tracer(tmp_path / "traces.jsonl")
+
+            async def fake_cli(session_id, message, **kwargs):
+                await asyncio.sleep(0.05)
+                return f"answer to {message}"
+
+            with patch.object(bot, "POLL_CURSOR_FILE", tmp_path / "cursors.json"), \
+                    patch.object(bot, "POLL_INTERVAL_SECONDS", 0.01), \
+                    patch.object(bot, "tracer", tracer), \
+                    patch.object(bot, "cli_send_message", fake_cli):
+                task = asyncio.ensure_future(bot.poll_loop(api))
+                try:
+                    for _ in range(200):
+                        if mock.bot_messages(room_id):
+                            break
+                        await asyncio.sleep(0.01)
+                    mock.post_user_message(room_id, "first")
+                    mock.post_user_message(room_id, "second")
+                    for _ in range(300):
+                        if not bot._turn_tasks and "answer to second" in [m.get("markdown") for m in mock.bot_messages(room_id)]:
+                            break
+                        await asyncio.sleep(0.01)
+                finally:
+                    task.cancel()
+                    await asyncio.gather(task, *bot._turn_tasks, return_exceptions=True)
+                    bot._room_states.pop(room_id, None)
+            tracer.close()
+
+        with open(tmp_path / "traces.jsonl") as f:
+            spans = [json.loads(line) for line in f]
+        roots = {s["trace_id"]: s for s in spans if s["name"] == "webex.message"}
+        assert len(roots) == 2
+        waits = [s for s in spans if s["name"] == "turn.queue_wait"]
+        assert len(waits) == 1 and waits[0]["duration_ms"] >= 40
+        for span in spans:
+            if span["name"] == "deliver":
+                assert roots[span["trace_id"]]["end_time_unix_nano"] >= span["end_time_unix_nano"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("owns_room", [True, False])
+    async def test_first_run_welcome_comes_from_the_room_owner(self, tmp_path, owns_room):
+        async with running_mock() as (mock, api):
+            room_id = mock.add_room("test@example.com")
+            mock.post_user_message(room_id, "hello?")
+
+            class OneRoomShard:
+                version = 0
+
+                def owns(self, key):
+                    # The owner's email hashes here either way; only the room decides
+                    return key == room_id if owns_room else key != room_id
+
+                async def claim(self, key):
+                    return self.owns(key)
+
+            with patch.object(bot, "POLL_CURSOR_FILE", tmp_path / "cursors.json"), \
+                    patch.object(bot, "POLL_INTERVAL_SECONDS", 0.01), \
+                    patch.object(bot, "handle_sessions", lambda *args: asyncio.sleep(0)):
+                task = asyncio.ensure_future(bot.poll_loop(api, shard=OneRoomShard()))
+                try:
+                    await asyncio.sleep(0.2)
+                finally:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    bot._room_states.pop(room_id, None)
+
+            assert len(mock.bot_messages(room_id)) == (1 if owns_room else 0)
@@ -0,0 +1,136 @@
+"""Tests for output_capture.py: bounded, incremental CLI output capture."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+import time
+
+import pytest
+
+from output_capture import BoundedCapture, StreamJsonParser, TailBuffer, prune_spills
+
+
+class TestBoundedCapture:
+    def test_small_output_stays_in_memory(self):
+        capture = BoundedCapture(max_bytes=100, spill_bytes=50)
+        capture.feed(b"hello ")
+        capture.feed(b"world")
+        out = capture.finish()
+        assert out.text == "hello world"
+        assert out.spill_path is None
+        assert not out.truncated
+
+    def test_multibyte_char_split_across_reads(self):
+        data = "héllo €".encode("utf-8")
+        capture = BoundedCapture(max_bytes=100, spill_bytes=100)
+        for i in range(len(data)):
+            capture.feed(data[i:i + 1])
+        assert capture.finish().text == "héllo €"
+
+    def test_spills_then_truncates(self):
+        capture = BoundedCapture(max_bytes=30, spill_bytes=10)
+        capture.feed(b"a" * 10 + b"b" * 15)
+        capture.feed(b"c" * 20)
+        out = capture.finish()
+        try:
+            assert out.text == "a" * 10
+            assert out.total_bytes == 45
+            assert out.truncated
+            with open(out.spill_path, encoding="utf-8") as f:
+                assert f.read() == "b" * 15 + "c" * 5
+        finally:
+            os.unlink(out.spill_path)
+
+    def test_discard_removes_the_spill_file(self, tmp_path):
+        capture = BoundedCapture(max_bytes=100, spill_bytes=5, spill_dir=tmp_path / "output")
+        capture.feed(b"x" * 20)
+        capture.discard()
+        assert list((tmp_path / "output").iterdir()) == []
+
+
+class TestPruneSpills:
+    def test_removes_old_files_then_oldest_beyond_the_size_cap(self, tmp_path):
+        now = time.time()
+        for name, age, size in (("a", 10, 40), ("b", 20, 40), ("c", 30, 40), ("d", 99999, 1)):
+            path = tmp_path / f"claude-output-{name}.txt"
+            path.write_bytes(b"x" * size)
+            os.utime(path, (now - age, now - age))
+        (tmp_path / "unrelated.txt").write_bytes(b"x" * 500)
+
+        assert prune_spills(tmp_path, max_age_seconds=3600, max_total_bytes=100) == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "claude-output-a.txt", "claude-output-b.txt", "unrelated.txt",
+        ]
+
+    def test_never_removes_the_kept_file(self, tmp_path):
+        path = tmp_path / "claude-output-new.txt"
+        path.write_bytes(b"x" * 200)
+        assert prune_spills(tmp_path, max_age_seconds=3600, max_total_bytes=100, keep=str(path)) == 0
+        assert path.exists()
+
+
+class TestTailBuffer:
+    def test_keeps_only_the_end(self):
+        tail = TailBuffer(max_bytes=8)
+        for piece in (b"first-", b"second-", b"third"):
+            tail.feed(piece)
+        assert tail.text() == "nd-third"
+        assert tail.total_bytes == 18
+
+    def test_drops_partial_leading_character(self):
+        tail = TailBuffer(max_bytes=4)
+        tail.feed("x€ab".encode("utf-8"))  # Cut lands inside the 3-byte euro sign
+        assert tail.text() == "ab"
+
+
+class TestStreamJsonParser:
+    def test_reports_tools_and_result_across_chunks(self):
+        tools = []
+        capture = BoundedCapture(10_000, 10_000)
+        parser = StreamJsonParser(tools.append, 1000, capture)
+        events = [
+            {"type": "assistant", "message": {"content": [{"type": "tool_use", "name": "Bash"}]}},
+            {"type": "result", "result": "done"},
+        ]
+        data = "".join(json.dumps(e) + "\n" for e in events).encode()
+        for i in range(0, len(data), 7):
+            parser.feed(data[i:i + 7])
+        parser.finish()
+        assert capture.finish().text == "done"
+        assert tools == ["Bash"]
+
+    def test_skips_oversized_line(self):
+        capture = BoundedCapture(10_000, 10_000)
+        parser = StreamJsonParser(lambda name: None, 50, capture)
+        huge = json.dumps({"type": "user", "blob": "x" * 500}).encode()
+        parser.feed(huge[:200])
+        parser.feed(huge[200:] + b"\n")
+        parser.feed(json.dumps({"type": "result", "result": "ok"}).encode())
+        parser.finish()
+        assert capture.finish().text == "ok"
+
+    @pytest.mark.parametrize("ensure_ascii", [True, False])
+    def test_oversized_result_is_decoded_into_the_sink(self, ensure_ascii):
+        reply = "line \"one\"\n\ttab \\ slash / é 中文 😀 " * 200
+        line = json.dumps({"type": "result", "subtype": "success", "result": reply, "session_id": "s"},
+                          ensure_ascii=ensure_ascii).encode() + b"\n"
+        capture = BoundedCapture(100_000, 100_000)
+        parser = StreamJsonParser(lambda name: None, 256, capture)
+        for i in range(0, len(line), 5):
+            parser.feed(line[i:i + 5])
+            assert len(parser._pending) <= 256
+        parser.feed(json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "x"}]}}).encode())
+        parser.finish()
+        assert capture.finish().text == reply
+
+    def test_assistant_text_fallback_is_bounded(self):
+        capture = BoundedCapture(100_000, 100_000)
+        parser = StreamJsonParser(lambda name: None, 100, capture)
+        for _ in range(10):
+            event = {"type": "assistant", "message": {"content": [{"type": "text", "text": "y" * 40}]}}
+            parser.feed(json.dumps(event).encode() + b"\n")
+        parser.finish()
+        assert len(capture.finish().text) <= 100
@@ -0,0 +1,74 @@
+"""Tests for postprocess.py: reply splitting and the offloading post-processor."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import random
+
+import pytest
+
+from postprocess import PostProcessor, split_message
+
+
+def _reference_split(text: str, max_bytes: int) -> list[str]:
+    """The original character-by-character algorithm, kept as the behavior to match."""
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+    chunks: list[str] = []
+    current = ""
+    for line in text.split("\n"):
+        candidate = current + "\n" + line if current else line
+        if len(candidate.encode("utf-8")) > max_bytes:
+            if current:
+                chunks.append(current)
+                current = ""
+            if len(line.encode("utf-8")) > max_bytes:
+                part = ""
+                for char in line:
+                    if len((part + char).encode("utf-8")) > max_bytes:
+                        if part:
+                            chunks.append(part)
+                        part = char
+                    else:
+                        part += char
+                if part:
+                    chunks.append(part)
+            else:
+                current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def test_matches_reference_split():
+    rng = random.Random(7)
+    pieces = ["a", "bc", " ", "\n", "\n\n", "é", "€", "\U0001f600"]
+    for _ in range(3000):
+        text = "".join(rng.choice(pieces) * rng.randint(1, 6) for _ in range(rng.randint(0, 40)))
+        max_bytes = rng.randint(1, 24)
+        assert split_message(text, max_bytes) == _reference_split(text, max_bytes), (text, max_bytes)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_large_replies_are_offloaded(executor):
+    text = "\n".join(f"line {n} " + "é" * (n % 50) for n in range(5000))
+    processor = PostProcessor(offload_bytes=1000, executor=executor)
+    try:
+        assert await processor.split("short", 100) == ["short"]
+        assert processor._executor is None  # Small replies never start the pool
+        assert await processor.split(text, 7439) == split_message(text, 7439)
+        assert processor._executor is not None
+    finally:
+        processor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_falls_back_inline_when_pool_is_gone():
+    processor = PostProcessor(offload_bytes=10, executor="thread")
+    processor._pool().shutdown()
+    assert await processor.split("x" * 30, 10) == ["x" * 10] * 3
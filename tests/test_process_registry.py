@@ -0,0 +1,106 @@
+"""Tests for process_registry.py: process-group kills, orphan reaping, resource usage."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import subprocess
+import pytest
+
+from process_registry import ProcessRegistry, group_usage, spawn_kwargs, terminate_tree
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX-only")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Zombies still accept signal 0; treat them as gone
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+async def _spawn_with_grandchild():
+    """Start a shell that forks a long sleep and prints the sleeper's PID."""
+    process = await asyncio.create_subprocess_exec(
+        "sh", "-c", "sleep 60 & echo $!; wait",
+        stdout=asyncio.subprocess.PIPE,
+        **spawn_kwargs(),
+    )
+    grandchild = int((await process.stdout.readline()).decode())
+    return process, grandchild
+
+
+class TestTerminateTree:
+    @pytest.mark.asyncio
+    async def test_kills_grandchildren(self):
+        process, grandchild = await _spawn_with_grandchild()
+
+        await terminate_tree(process, grace=0.5)
+
+        assert process.returncode is not None
+        for _ in range(50):
+            if not _alive(grandchild):
+                break
+            await asyncio.sleep(0.02)
+        assert not _alive(grandchild)
+
+
+class TestRegistry:
+    @pytest.mark.asyncio
+    async def test_add_remove_persists(self, tmp_path):
+        path = tmp_path / "procs.json"
+        registry = ProcessRegistry(path)
+        process, _ = await _spawn_with_grandchild()
+
+        await registry.add(process, "room-1", "session-1")
+        assert registry.get(process.pid).room_id == "room-1"
+        assert "session-1" in path.read_text()
+
+        usage = registry.usage(process.pid)
+        if os.path.isdir("/proc"):
+            assert usage is not None and usage.processes >= 2 and usage.rss_bytes > 0
+
+        await terminate_tree(process, grace=0.5)
+        await registry.remove(process.pid)
+        assert registry.live() == []
+        assert "session-1" not in path.read_text()
+
+    def test_reap_orphans_kills_matching_group_only(self, tmp_path):
+        path = tmp_path / "procs.json"
+        sleeper = [sys.executable, "-c", "import time; time.sleep(60)"]
+        orphan = subprocess.Popen(sleeper + ["orphan-session"], start_new_session=True)
+        unrelated = subprocess.Popen(sleeper, start_new_session=True)
+        try:
+            path.write_text(
+                '[{"pid": %d, "pgid": %d, "room_id": "r", "session_id": "orphan-session", "started_at": 0},'
+                ' {"pid": %d, "pgid": %d, "room_id": "r", "session_id": "other-session", "started_at": 0}]'
+                % (orphan.pid, orphan.pid, unrelated.pid, unrelated.pid)
+            )
+
+            reaped = ProcessRegistry(path).reap_orphans(grace=0.1)
+
+            assert reaped == 1
+            assert orphan.wait(timeout=5) is not None
+            assert unrelated.poll() is None
+            assert path.read_text() == "[]"
+        finally:
+            for p in (orphan, unrelated):
+                if p.poll() is None:
+                    p.kill()
+                    p.wait()
+
+    def test_reap_without_file_is_noop(self, tmp_path):
+        assert ProcessRegistry(tmp_path / "none.json").reap_orphans() == 0
+
+
+class TestGroupUsage:
+    def test_unknown_group(self):
+        assert group_usage(2 ** 22 + 12345) is None
@@ -0,0 +1,110 @@
+"""Tests for progress.py: batched, deduplicated "Thinking..." edits."""
+
+import os
+import sys
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from progress import ProgressHandle, ProgressScheduler, format_elapsed
+from webex_api import WebexAPI
+
+
+@pytest.fixture
+def api():
+    instance = WebexAPI()
+    instance.edit_message = AsyncMock(return_value={"id": "m"})
+    return instance
+
+
+class TestRender:
+    def test_plain_elapsed(self, api):
+        handle = ProgressHandle(api=api, room_id="r", message_id="m", started=100.0)
+        assert handle.render(131.0, 15) == "Thinking... (30s)"
+
+    def test_tool_calls(self, api):
+        handle = ProgressHandle(api=api, room_id="r", message_id="m", started=0.0)
+        handle.note_tool_use("Read")
+        handle.note_tool_use("Bash")
+        assert handle.render(90.0, 15) == "Thinking... (1m 30s · 2 tool calls, last: Bash)"
+
+    def test_format_elapsed(self):
+        assert format_elapsed(5) == "5s"
+        assert format_elapsed(60) == "1m"
+        assert format_elapsed(95) == "1m 35s"
+
+
+class TestScheduler:
+    @pytest.mark.asyncio
+    async def test_batches_due_edits_and_caps_per_tick(self, api):
+        scheduler = ProgressScheduler(interval=10, max_edits_per_tick=2, tick=0.05)
+        handles = [scheduler.track(api, f"room-{i}", f"msg-{i}") for i in range(3)]
+        for handle in handles:
+            handle.started -= 60
+            handle.last_edit -= 60
+
+        await asyncio.sleep(0.07)
+        edited = {call.args[0] for call in api.edit_message.call_args_list}
+        assert len(edited) == 2
+
+        await asyncio.sleep(0.05)
+        edited = {call.args[0] for call in api.edit_message.call_args_list}
+        assert len(edited) == 3
+
+        for handle in handles:
+            await scheduler.untrack(handle)
+
+    @pytest.mark.asyncio
+    async def test_skips_unchanged_text(self, api):
+        scheduler = ProgressScheduler(interval=0.01, tick=0.01)
+        handle = scheduler.track(api, "room", "msg")
+        handle.shown = handle.render(time.monotonic(), 0.01)
+        handle.render = lambda now, granularity: handle.shown
+
+        await asyncio.sleep(0.05)
+        api.edit_message.assert_not_called()
+        await scheduler.untrack(handle)
+
+    @pytest.mark.asyncio
+    async def test_pauses_while_rate_limited(self, api):
+        scheduler = ProgressScheduler(interval=0.01, tick=0.01)
+        api.rate_limited_until = time.monotonic() + 60
+        handle = scheduler.track(api, "room", "msg")
+        handle.started -= 60
+
+        await asyncio.sleep(0.05)
+        api.edit_message.assert_not_called()
+        await scheduler.untrack(handle)
+
+    @pytest.mark.asyncio
+    async def test_untrack_waits_for_inflight_edit(self, api):
+        release = asyncio.Event()
+        finished = []
+
+        async def slow_edit(*args):
+            await release.wait()
+            finished.append(args)
+            return {"id": "m"}
+
+        api.edit_message = slow_edit
+        scheduler = ProgressScheduler(interval=0.01, tick=0.01)
+        handle = scheduler.track(api, "room", "msg")
+        handle.started -= 60
+        handle.last_edit -= 60
+        await asyncio.sleep(0.03)
+        assert handle._inflight is not None
+
+        untrack = asyncio.ensure_future(scheduler.untrack(handle))
+        await asyncio.sleep(0)
+        assert not untrack.done()
+        release.set()
+        await untrack
+        assert finished
@@ -0,0 +1,77 @@
+"""Tests for response_cache.py: fingerprints and LRU/TTL eviction."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch
+
+from response_cache import ResponseCache, TurnFingerprint, fingerprint, tree_fingerprint
+
+
+def _fp(tree: str = "t") -> TurnFingerprint:
+    return TurnFingerprint(session_size=10, session_mtime_ns=1, tree=tree)
+
+
+class TestFingerprint:
+    def test_tree_changes_when_a_file_changes(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        target = tmp_path / "src" / "a.py"
+        target.write_text("x = 1\n")
+        first = tree_fingerprint(str(tmp_path), max_files=100)
+        assert tree_fingerprint(str(tmp_path), max_files=100) == first
+
+        target.write_text("x = 22\n")
+        assert tree_fingerprint(str(tmp_path), max_files=100) != first
+
+    def test_skipped_dirs_dont_count(self, tmp_path):
+        (tmp_path / "node_modules").mkdir()
+        first = tree_fingerprint(str(tmp_path), max_files=100)
+        (tmp_path / "node_modules" / "dep.js").write_text("")
+        assert tree_fingerprint(str(tmp_path), max_files=100) == first
+
+    def test_oversized_tree_is_not_fingerprinted(self, tmp_path):
+        for i in range(5):
+            (tmp_path / f"f{i}").write_text("")
+        assert tree_fingerprint(str(tmp_path), max_files=3) is None
+
+    def test_session_file_is_part_of_fingerprint(self, tmp_path):
+        session = tmp_path / "s.jsonl"
+        session.write_text("{}\n")
+        first = fingerprint(session, str(tmp_path / "missing-is-fine"), max_files=10)
+        assert first is None  # Unreadable cwd: not cacheable
+
+        cwd = tmp_path / "work"
+        cwd.mkdir()
+        first = fingerprint(session, str(cwd), max_files=10)
+        with open(session, "a") as f:
+            f.write("{}\n")
+        assert fingerprint(session, str(cwd), max_files=10).session_size != first.session_size
+
+
+class TestResponseCache:
+    def test_hit_requires_identical_key(self):
+        cache = ResponseCache(ttl=60, max_entries=10)
+        cache.put("s1", _fp(), False, "git status", "clean")
+        assert cache.get("s1", _fp(), False, "git status") == "clean"
+        assert cache.get("s1", _fp("other"), False, "git status") is None
+        assert cache.get("s1", _fp(), True, "git status") is None
+        assert cache.get("s2", _fp(), False, "git status") is None
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(ttl=60, max_entries=10)
+        with patch("response_cache.time.monotonic", return_value=100.0):
+            cache.put("s1", _fp(), False, "q", "a")
+        with patch("response_cache.time.monotonic", return_value=161.0):
+            assert cache.get("s1", _fp(), False, "q") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(ttl=60, max_entries=2)
+        cache.put("s1", _fp(), False, "a", "1")
+        cache.put("s1", _fp(), False, "b", "2")
+        cache.get("s1", _fp(), False, "a")  # "b" is now least recently used
+        cache.put("s1", _fp(), False, "c", "3")
+        assert cache.get("s1", _fp(), False, "b") is None
+        assert cache.get("s1", _fp(), False, "a") == "1"
@@ -0,0 +1,109 @@
+"""Tests for sessions.py catalogs and the shared catalog pool."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+import json
+from pathlib import Path
+
+import sessions
+from sessions import CatalogPool, ClaudeHome, SessionCatalog
+
+
+def _add_session(home: ClaudeHome, session_id: str, project: str, display: str, timestamp: int) -> None:
+    transcript = home.projects_dir / project.replace("/", "-") / f"{session_id}.jsonl"
+    transcript.parent.mkdir(parents=True, exist_ok=True)
+    if not transcript.exists():
+        transcript.write_text(json.dumps({"type": "user", "cwd": project}) + "\n")
+    with open(home.history_file, "a") as f:
+        f.write(json.dumps({"sessionId": session_id, "project": project, "display": display, "timestamp": timestamp}) + "\n")
+
+
+def _home(tmp_path: Path, name: str = "claude") -> ClaudeHome:
+    home = ClaudeHome.at(tmp_path / name)
+    home.projects_dir.mkdir(parents=True)
+    home.history_file.touch()
+    return home
+
+
+def test_list_recent_newest_first_with_latest_entry(tmp_path):
+    home = _home(tmp_path)
+    _add_session(home, "a", "/work/a", "first", 1)
+    _add_session(home, "b", "/work/b", "second", 2)
+    _add_session(home, "a", "/work/a", "x" * 100, 3)
+    (home.projects_dir / "-work-gone").mkdir()
+    with open(home.history_file, "a") as f:
+        f.write("not json\n" + json.dumps({"sessionId": "gone", "project": "/work/gone", "timestamp": 9}) + "\n")
+
+    recent = SessionCatalog(home).list_recent(10)
+    assert [s.session_id for s in recent] == ["a", "b"]
+    assert recent[0].display == "x" * 77 + "..."
+    assert recent[0].cwd == "/work/a"
+
+
+def test_refresh_reads_only_appended_lines(tmp_path):
+    home = _home(tmp_path)
+    _add_session(home, "a", "/work/a", "first", 1)
+    catalog = SessionCatalog(home)
+    assert catalog.get("b") is None
+
+    before = sessions._scan_bytes.value(scan="by_id")
+    _add_session(home, "b", "/work/b", "second", 2)
+    appended = home.history_file.stat().st_size - catalog._offset
+    assert catalog.get("b").display == "second"
+    # Only the new history line, plus b's transcript for its cwd
+    transcript = (home.projects_dir / "-work-b" / "b.jsonl").stat().st_size
+    assert sessions._scan_bytes.value(scan="by_id") - before == appended + transcript
+
+    # A partly written line waits for its newline
+    with open(home.history_file, "a") as f:
+        f.write('{"sessionId": "c", "project": "/work/a"')
+    assert catalog.get("c") is None
+    with open(home.history_file, "a") as f:
+        f.write(', "timestamp": 3}\n')
+    (home.projects_dir / "-work-a" / "c.jsonl").write_text(json.dumps({"type": "user", "cwd": "/work/a"}) + "\n")
+    assert catalog.list_recent(1)[0].session_id == "c"
+
+
+def test_replaced_history_is_reindexed(tmp_path):
+    home = _home(tmp_path)
+    _add_session(home, "a", "/work/a", "first", 1)
+    catalog = SessionCatalog(home)
+    assert catalog.get("a") is not None
+
+    replacement = home.history_file.with_suffix(".new")
+    replacement.write_text(json.dumps({"sessionId": "b", "project": "/work/a", "timestamp": 5}) + "\n")
+    (home.projects_dir / "-work-a" / "b.jsonl").write_text("{}\n")
+    os.replace(replacement, home.history_file)
+    assert catalog.get("a") is None
+    assert [s.session_id for s in catalog.list_recent(10)] == ["b"]
+
+
+def test_pool_evicts_least_recently_used(tmp_path):
+    homes = [_home(tmp_path, f"user{n}") for n in range(3)]
+    for n, home in enumerate(homes):
+        for i in range(5):
+            _add_session(home, f"s{n}-{i}", f"/work/{n}", "prompt", i)
+
+    pool = CatalogPool(budget_bytes=10**9)
+    for home in homes:
+        pool.get(home).list_recent(10)
+    per_catalog = pool.get(homes[0]).size
+    assert len(pool) == 3
+
+    # Room for two: the coldest (user1, since user0 was just used) goes
+    pool.budget_bytes = per_catalog * 2 + per_catalog // 2
+    first = pool.get(homes[0])
+    assert len(pool) == 2
+    assert list(pool._catalogs) == [homes[2], homes[0]]
+    assert pool.get(homes[0]) is first
+
+    # The catalog in use stays even when it alone is over budget
+    pool.budget_bytes = 1
+    assert pool.get(homes[1]).list_recent(1)
+    assert list(pool._catalogs) == [homes[1]]
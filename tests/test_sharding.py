@@ -0,0 +1,118 @@
+"""Tests for sharding.py: consistent hashing and the worker heartbeat table."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+
+import sharding
+from sharding import HashRing, Shard, WorkerRegistry
+
+ROOMS = [f"room-{n}" for n in range(2000)]
+
+
+def test_ring_spreads_rooms_and_moves_few_on_change():
+    three = HashRing(["w1", "w2", "w3"])
+    owners = {room: three.owner(room) for room in ROOMS}
+    counts = [list(owners.values()).count(w) for w in ("w1", "w2", "w3")]
+    assert min(counts) > len(ROOMS) / 3 * 0.6
+
+    # w3 leaves: only its rooms move, and they spread over the others
+    two = HashRing(["w2", "w1"])
+    moved = [room for room in ROOMS if two.owner(room) != owners[room]]
+    assert all(owners[room] == "w3" for room in moved)
+    assert {two.owner(room) for room in moved} == {"w1", "w2"}
+    assert HashRing([]).owner("room-1") is None
+
+
+def test_registry_expires_dead_workers(tmp_path):
+    path = tmp_path / "workers.db"
+    alive, dead = WorkerRegistry(path, "alive", ttl=10), WorkerRegistry(path, "dead", ttl=10)
+    alive.open()
+    dead.open()
+    with patch.object(sharding.time, "time", return_value=1000.0):
+        dead.heartbeat()
+    with patch.object(sharding.time, "time", return_value=1005.0):
+        assert alive.heartbeat() == ["alive", "dead"]
+    with patch.object(sharding.time, "time", return_value=1011.0):
+        assert alive.heartbeat() == ["alive"]
+    alive.leave()
+    dead.leave()
+
+
+@pytest.mark.asyncio
+async def test_shards_split_rooms_and_take_over(tmp_path):
+    path = tmp_path / "workers.db"
+    first = Shard(WorkerRegistry(path, "w1", ttl=10), heartbeat_seconds=0.01)
+    second = Shard(WorkerRegistry(path, "w2", ttl=10), heartbeat_seconds=0.01)
+    await first.start()
+    await second.start()
+    await first._beat()
+    try:
+        for room in ROOMS[:200]:
+            assert first.owns(room) != second.owns(room)
+        version = first.version
+        await second.stop()
+        await first._beat()
+        assert first.version == version + 1
+        assert all(first.owns(room) for room in ROOMS[:200])
+    finally:
+        await first.stop()
+
+
+@pytest.mark.asyncio
+async def test_room_changes_hands_only_after_the_lease_expires(tmp_path):
+    path = tmp_path / "workers.db"
+    first = Shard(WorkerRegistry(path, "w1", ttl=10), heartbeat_seconds=1)
+    second = Shard(WorkerRegistry(path, "w2", ttl=10), heartbeat_seconds=1)
+    first._registry.open()
+    second._registry.open()
+    try:
+        await first._beat()
+        room = next(r for r in ROOMS if HashRing(["w1", "w2"]).owner(r) == "w2")
+        assert await first.claim(room)
+
+        # w2 joins; until w1's next heartbeat both think the room is theirs
+        await second._beat()
+        assert first.owns(room) and second.owns(room)
+        assert not await second.claim(room)
+        assert await first.claim(room)
+
+        await first._beat()
+        assert not await first.claim(room)
+        assert not await second.claim(room)
+
+        with patch.object(sharding.time, "time", return_value=time.time() + 11):
+            version = second.version
+            # The first claim after the lease runs out picks up w1's saved state before handling
+            assert not await second.claim(room)
+            assert second.version == version + 1
+            assert await second.claim(room)
+        assert not await first.claim(room)
+    finally:
+        first._registry.leave()
+        second._registry.leave()
+
+
+@pytest.mark.asyncio
+async def test_worker_without_a_heartbeat_stops_handling_rooms(tmp_path):
+    shard = Shard(WorkerRegistry(tmp_path / "workers.db", "w1", ttl=10), heartbeat_seconds=0.01)
+    await shard.start()
+    try:
+        assert shard.owns("room-1")
+        with patch.object(shard._registry, "heartbeat", side_effect=sqlite3.OperationalError("disk I/O error")):
+            await asyncio.sleep(0.05)
+            with patch.object(sharding.time, "monotonic", return_value=time.monotonic() + 11):
+                assert not shard.owns("room-1")
+                assert not await shard.claim("room-1")
+        await shard._beat()
+        assert shard.owns("room-1")
+    finally:
+        await shard.stop()
@@ -0,0 +1,46 @@
+"""Tests for startup.py phase timing."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import logging
+
+import pytest
+
+from startup import StartupTimer
+
+
+async def _fail():
+    raise OSError("boom")
+
+
+async def _value():
+    return 42
+
+
+class TestStartupTimer:
+    @pytest.mark.asyncio
+    async def test_phases_are_timed(self):
+        timer = StartupTimer()
+        assert await timer.run("ok", _value()) == 42
+        assert await timer.run("optional", _fail(), critical=False) is None
+        assert set(timer.phases) == {"ok", "optional"}
+
+    @pytest.mark.asyncio
+    async def test_critical_failure_propagates(self):
+        timer = StartupTimer()
+        with pytest.raises(OSError):
+            await timer.run("verify", _fail())
+        assert "verify" in timer.phases
+
+    def test_report_logs_once(self, caplog):
+        timer = StartupTimer()
+        timer.phases["imports"] = 0.25
+        with caplog.at_level(logging.INFO, logger="startup"):
+            timer.report("first poll")
+            timer.report("first poll")
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "first poll after" in messages[0] and "imports 250ms" in messages[0]
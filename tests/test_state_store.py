@@ -0,0 +1,54 @@
+"""Tests for state_store.py: write-behind SQLite persistence of room state."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from state_store import StateStore
+
+
+class TestStateStore:
+    @pytest.mark.asyncio
+    async def test_scheduled_state_survives_reopen(self, tmp_path):
+        path = tmp_path / "state.db"
+        store = StateStore(path, flush_delay=0)
+        assert store.open() == {}
+        store.schedule("room-1", {"session_id": "abc"})
+        await store.close()
+
+        reopened = StateStore(path)
+        assert reopened.open() == {"room-1": {"session_id": "abc"}}
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_burst_of_changes_is_one_write(self, tmp_path):
+        store = StateStore(tmp_path / "state.db", flush_delay=0.02)
+        store.open()
+
+        with patch.object(store, "_write", wraps=store._write) as write:
+            for i in range(10):
+                store.schedule("room-1", {"n": i})
+            store.schedule("room-2", {"n": 0})
+            await asyncio.sleep(0.1)
+
+        assert write.call_count == 1
+        assert write.call_args.args[0] == {"room-1": {"n": 9}, "room-2": {"n": 0}}
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_schedule_does_not_write_synchronously(self, tmp_path):
+        path = tmp_path / "state.db"
+        store = StateStore(path, flush_delay=10)
+        store.open()
+        store.schedule("room-1", {"n": 1})
+
+        peek = StateStore(path)
+        assert peek.open() == {}
+        await peek.close()
+        await store.close()
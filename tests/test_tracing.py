@@ -0,0 +1,111 @@
+"""Tests for tracing.py: span nesting, propagation into tasks and JSON-lines export."""
+
+import os
+import sys
+
+os.environ.setdefault("WEBEX_BOT_TOKEN", "test-token")
+os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from tracing import Tracer
+
+
+def _read_spans(path):
+    with open(path) as f:
+        return {s["name"]: s for s in map(json.loads, f)}
+
+
+class TestTracer:
+    def test_spans_nest_under_trace(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(path)
+        with tracer.trace("webex.message", room_id="r1"):
+            tracer.record("poll.detect", time.time() - 2, time.time())
+            with tracer.span("deliver", chunks=2):
+                pass
+        tracer.close()
+
+        spans = _read_spans(path)
+        root = spans["webex.message"]
+        assert root["parent_span_id"] is None
+        assert root["attributes"] == {"room_id": "r1"}
+        for name in ("poll.detect", "deliver"):
+            assert spans[name]["trace_id"] == root["trace_id"]
+            assert spans[name]["parent_span_id"] == root["span_id"]
+        assert spans["poll.detect"]["duration_ms"] >= 1900
+        assert spans["deliver"]["attributes"]["chunks"] == 2
+
+    def test_no_spans_outside_a_trace(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(path)
+        with tracer.span("webex.request") as span:
+            assert span is None
+        tracer.record("orphan", 0, 1)
+        assert not path.exists()
+
+    def test_disabled_tracer_is_noop(self):
+        tracer = Tracer(None)
+        with tracer.trace("webex.message") as root:
+            assert root is None
+            with tracer.span("turn") as span:
+                assert span is None
+
+    @pytest.mark.asyncio
+    async def test_background_task_joins_trace(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(path)
+
+        async def turn():
+            await asyncio.sleep(0)
+            with tracer.span("turn"):
+                raise RuntimeError("boom")
+
+        with tracer.trace("webex.message"):
+            task = asyncio.ensure_future(turn())
+        await asyncio.gather(task, return_exceptions=True)
+        tracer.close()
+
+        spans = _read_spans(path)
+        assert spans["turn"]["trace_id"] == spans["webex.message"]["trace_id"]
+        assert spans["turn"]["status"] == "ERROR"
+        assert spans["turn"]["error"] == "RuntimeError"
+
+    @pytest.mark.asyncio
+    async def test_held_span_ends_when_released(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(path)
+        with tracer.trace("webex.message"):
+            release = tracer.hold()
+        await asyncio.sleep(0.05)
+        with tracer.trace("other"):
+            pass
+        release()
+        tracer.close()
+
+        spans = _read_spans(path)
+        assert spans["webex.message"]["duration_ms"] >= 40
+        assert spans["webex.message"]["end_time_unix_nano"] > spans["other"]["end_time_unix_nano"]
+
+    def test_spans_are_written_by_the_writer_thread(self, tmp_path, monkeypatch):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(path)
+        writers = set()
+        write_spans = tracer._write_spans
+        monkeypatch.setattr(tracer, "_write_spans", lambda: (writers.add(threading.get_ident()), write_spans()))
+        with tracer.trace("webex.message"):
+            for n in range(2000):
+                tracer.record("webex.request", 0, 1, n=n)
+        tracer.close()
+
+        with open(path) as f:
+            assert sum(1 for _ in f) == 2001
+        assert writers and threading.get_ident() not in writers
+
@@ -9,12 +9,15 @@ os.environ.setdefault("WEBEX_USER_EMAIL", "test@example.com")
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
-from webex_api import WebexAPI
+from json_codec import JsonCodec
+from retry_policy import CircuitBreaker, RetryBudget, RetryPolicy
+from webex_api import CircuitOpenError, WebexAPI
 
 
 def _make_response(status_code, json_data=None, headers=None):
@@ -23,6 +26,7 @@ def _make_response(status_code, json_data=None, headers=None):
     resp.status_code = status_code
     resp.headers = headers or {}
     resp.json.return_value = json_data or {}
+    resp.content = json.dumps(json_data or {}).encode()
     resp.request = MagicMock()
     resp.raise_for_status = MagicMock()
     if status_code >= 400:
@@ -146,3 +150,419 @@ class TestClientNotStarted:
         api = WebexAPI()
         with pytest.raises(RuntimeError, match="Call start"):
             await api._request("GET", "/test")
+
+
+class TestGetCoalescing:
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_gets_share_one_request(self, api):
+        release = asyncio.Event()
+
+        async def slow_request(*args, **kwargs):
+            await release.wait()
+            return _make_response(200, {"items": [{"id": "m1"}]})
+
+        api._client.request.side_effect = slow_request
+        waiters = [asyncio.ensure_future(api.list_messages("room-1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert api._client.request.call_count == 1
+        assert all(r == [{"id": "m1"}] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_different_params_are_not_coalesced(self, api):
+        api._client.request.return_value = _make_response(200, {"items": []})
+        await asyncio.gather(api.list_messages("room-1"), api.list_messages("room-2"))
+        assert api._client.request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_not_cached(self, api):
+        api._client.request.return_value = _make_response(404)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.list_messages("room-1")
+        api._client.request.return_value = _make_response(200, {"items": []})
+        assert await api.list_messages("room-1") == []
+        assert not api._inflight
+
+
+class TestGetCache:
+    @pytest.mark.asyncio
+    async def test_ttl_cache_serves_repeat_gets(self):
+        api = WebexAPI(cache_ttl=10)
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api._client.request.return_value = _make_response(200, {"items": [{"id": "r1"}]})
+
+        await api.list_direct_rooms()
+        await api.list_direct_rooms()
+
+        assert api._client.request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_no_ttl_by_default(self, api):
+        api._client.request.return_value = _make_response(200, {"items": []})
+        await api.list_direct_rooms()
+        await api.list_direct_rooms()
+        assert api._client.request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation_returns_cached_body_on_304(self, api):
+        first = _make_response(200, {"items": [{"id": "m1"}]}, headers={"ETag": '"v1"'})
+        not_modified = _make_response(304)
+        not_modified.raise_for_status.side_effect = None
+        api._client.request.side_effect = [first, not_modified]
+
+        assert await api.list_messages("room-1") == [{"id": "m1"}]
+        assert await api.list_messages("room-1") == [{"id": "m1"}]
+
+        second_call = api._client.request.call_args_list[1]
+        assert second_call.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    @pytest.mark.asyncio
+    async def test_304_after_invalidation_keeps_the_revalidated_body(self, api):
+        first = _make_response(200, {"items": [{"id": "m1"}]}, headers={"ETag": '"v1"'})
+        not_modified = _make_response(304)
+        not_modified.raise_for_status.side_effect = None
+        reached, gate = asyncio.Event(), asyncio.Event()
+
+        async def request(method, path, **kwargs):
+            if kwargs.get("headers"):
+                reached.set()
+                await gate.wait()
+                return not_modified
+            return first
+
+        api._client.request.side_effect = request
+        await api.list_messages("room-1")
+        pending = asyncio.ensure_future(api.list_messages("room-1"))
+        await reached.wait()
+        api._invalidate("/messages")
+        gate.set()
+
+        assert await pending == [{"id": "m1"}]
+
+    @pytest.mark.asyncio
+    async def test_unsolicited_304_refetches_without_revalidation(self, api):
+        not_modified = _make_response(304)
+        not_modified.raise_for_status.side_effect = None
+        api._client.request.side_effect = [not_modified, _make_response(200, {"items": [{"id": "m1"}]})]
+
+        assert await api.list_messages("room-1") == [{"id": "m1"}]
+        assert api._client.request.call_count == 2
+        assert all(call.kwargs["headers"] is None for call in api._client.request.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_cached_family(self):
+        api = WebexAPI(cache_ttl=10)
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api._client.request.return_value = _make_response(200, {"items": []})
+
+        await api.list_messages("room-1")
+        await api.send_message("room-1", "hi")
+        await api.list_messages("room-1")
+
+        assert api._client.request.call_count == 3
+
+
+class TestIdempotency:
+    @pytest.mark.asyncio
+    async def test_post_not_replayed_after_read_error(self, api):
+        api._client.request.side_effect = httpx.ReadError("connection reset")
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(httpx.ReadError):
+                await api._request("POST", "/messages", json={"roomId": "r", "markdown": "hi"})
+
+        assert api._client.request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_post_replayed_after_connect_error(self, api):
+        api._client.request.side_effect = [
+            httpx.ConnectError("connection refused"),
+            _make_response(200, {"id": "m1"}),
+        ]
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            result = await api._request("POST", "/messages", json={"roomId": "r", "markdown": "hi"})
+
+        assert result == {"id": "m1"}
+
+    @pytest.mark.asyncio
+    async def test_post_not_replayed_after_500(self, api):
+        api._client.request.return_value = _make_response(500)
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(httpx.HTTPStatusError):
+                await api._request("POST", "/messages", json={"roomId": "r", "markdown": "hi"})
+
+        assert api._client.request.call_count == 1
+
+
+class TestRetryLimits:
+    @pytest.mark.asyncio
+    async def test_retry_after_beyond_deadline_fails_fast(self):
+        api = WebexAPI(retry_policy=RetryPolicy(max_attempts=3, max_elapsed=10))
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api._client.request.return_value = _make_response(429, headers={"Retry-After": "30"})
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(httpx.HTTPStatusError, match="Retries exhausted"):
+                await api._request("GET", "/test")
+
+        mock_sleep.assert_not_called()
+        assert api._client.request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_stops_retries(self, api):
+        api._budget = RetryBudget(max_tokens=1, min_per_second=0, ratio=0)
+        api._client.request.side_effect = httpx.ConnectError("connection refused")
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(httpx.ConnectError):
+                await api._request("GET", "/a")
+            with pytest.raises(httpx.ConnectError):
+                await api._request("GET", "/b")
+
+        # First call spends the only token on one retry; second call can't retry
+        assert api._client.request.call_count == 3
+
+
+class TestCircuitBreaker:
+    @pytest.mark.asyncio
+    async def test_opens_after_threshold_and_fails_fast(self):
+        api = WebexAPI(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api._client.request.return_value = _make_response(500)
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            # The second failure opens the breaker, which also ends this call's retries
+            with pytest.raises(CircuitOpenError):
+                await api._request("GET", "/test")
+            assert api.breaker.is_open
+            calls = api._client.request.call_count
+            assert calls == 2
+            with pytest.raises(CircuitOpenError):
+                await api._request("GET", "/test")
+
+        assert api._client.request.call_count == calls
+
+    @pytest.mark.asyncio
+    async def test_retries_stop_once_the_breaker_opens(self):
+        api = WebexAPI(
+            retry_policy=RetryPolicy(max_attempts=5),
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        )
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api._client.request.return_value = _make_response(500)
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(CircuitOpenError):
+                await api._request("GET", "/test")
+
+        assert api._client.request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_probe_closes_the_breaker(self):
+        api = WebexAPI(
+            retry_policy=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0),
+        )
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api.breaker.record_failure()
+        api._client.request.return_value = _make_response(429, headers={"Retry-After": "1"})
+        with pytest.raises(httpx.HTTPStatusError, match="Retries exhausted"):
+            await api._request("GET", "/test")
+
+        assert not api.breaker.is_open
+        api._client.request.return_value = _make_response(200, {"ok": True})
+        assert await api._request("GET", "/test") == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_lets_the_next_one_through(self):
+        api = WebexAPI(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api.breaker.record_failure()
+        started = asyncio.Event()
+
+        async def hang(*args, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        api._client.request.side_effect = hang
+        probe = asyncio.ensure_future(api._request("GET", "/test"))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        api._client.request.side_effect = None
+        api._client.request.return_value = _make_response(200, {"ok": True})
+        assert await api._request("GET", "/test") == {"ok": True}
+        assert not api.breaker.is_open
+
+    def test_half_open_probe_closes_on_success(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.is_open
+        assert breaker.allow()  # probe
+        assert not breaker.allow()  # only one probe at a time
+        breaker.record_success()
+        assert not breaker.is_open
+
+
+class TestRetryPolicy:
+    def test_decorrelated_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(base_delay=1, max_delay=10)
+        delay = 0.0
+        for _ in range(50):
+            delay = policy.next_delay(delay)
+            assert 1 <= delay <= 10
+
+
+class TestCodec:
+    @pytest.mark.asyncio
+    async def test_json_bodies_are_encoded_by_the_codec(self):
+        encoded = []
+        codec = JsonCodec("test", lambda obj: encoded.append(obj) or b'{"x":1}', json.loads)
+        api = WebexAPI(codec=codec)
+        api._client = AsyncMock(spec=httpx.AsyncClient)
+        api._client.request.return_value = _make_response(200, {"id": "m1"})
+
+        await api.edit_message("m1", "room-1", "edited")
+
+        assert encoded == [{"roomId": "room-1", "markdown": "edited"}]
+        assert api._client.request.call_args.kwargs["content"] == b'{"x":1}'
+
+
+class TestIdempotentSend:
+    @pytest.mark.asyncio
+    async def test_encoded_card_is_posted_as_is(self, api):
+        api._client.request.return_value = _make_response(200, {"id": "m1"})
+        body = b'{"roomId":"room-1","text":"hi","attachments":[]}'
+        result = await api.send_encoded_message(body, room_id="room-1", text="hi")
+
+        assert result == {"id": "m1"}
+        call = api._client.request.call_args
+        assert call.args[:2] == ("POST", "/messages")
+        assert call.kwargs["content"] == body
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_failure_reconciles_instead_of_resending(self, api):
+        api.bot_id = "bot"
+        delivered = {"id": "m1", "personId": "bot", "markdown": "hello", "created": "2099-01-01T00:00:00.000Z"}
+        api._client.request.side_effect = [
+            httpx.ReadError("connection reset"),
+            _make_response(200, {"items": [delivered]}),
+        ]
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            result = await api.send_message("room-1", "hello")
+
+        assert result == delivered
+        posts = [c for c in api._client.request.call_args_list if c.args[0] == "POST"]
+        assert len(posts) == 1
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_failure_resends_when_not_found(self, api):
+        api.bot_id = "bot"
+        api._client.request.side_effect = [
+            httpx.ReadError("connection reset"),
+            _make_response(200, {"items": [{"id": "old", "personId": "bot", "markdown": "other"}]}),
+            _make_response(200, {"id": "m2"}),
+        ]
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            result = await api.send_message("room-1", "hello")
+
+        assert result == {"id": "m2"}
+
+    @pytest.mark.asyncio
+    async def test_failed_reconcile_raises_the_post_error(self, api):
+        api.bot_id = "bot"
+        api._client.request.side_effect = [
+            httpx.ReadError("connection reset"),
+            _make_response(400),
+        ]
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(httpx.ReadError, match="connection reset"):
+                await api.send_message("room-1", "hello")
+
+        assert [c.args[0] for c in api._client.request.call_args_list] == ["POST", "GET"]
+
+    @pytest.mark.asyncio
+    async def test_already_matched_message_is_not_reused(self, api):
+        api.bot_id = "bot"
+        first = {"id": "m1", "personId": "bot", "markdown": "same"}
+        api._client.request.side_effect = [
+            _make_response(200, first),
+            httpx.ReadError("connection reset"),
+            _make_response(200, {"items": [first]}),
+            _make_response(200, {"id": "m2"}),
+        ]
+
+        with patch("webex_api.asyncio.sleep", new_callable=AsyncMock):
+            await api.send_message("room-1", "same")
+            result = await api.send_message("room-1", "same")
+
+        assert result == {"id": "m2"}
+
+    @pytest.mark.asyncio
+    async def test_unambiguous_failure_is_raised(self, api):
+        api._client.request.return_value = _make_response(400)
+        with pytest.raises(httpx.HTTPStatusError):
+            await api.send_message("room-1", "hello")
+        assert api._client.request.call_count == 1
+
+
+class TestListMessagesSince:
+    @pytest.mark.asyncio
+    async def test_cursor_in_first_window_is_single_request(self, api):
+        api._client.request.return_value = _make_response(200, {"items": [{"id": "m3"}, {"id": "m2"}, {"id": "m1"}]})
+
+        messages, reached = await api.list_messages_since("room", "m2", window=3)
+
+        assert reached
+        assert [m["id"] for m in messages] == ["m3"]
+        assert api._client.request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_pages_back_until_cursor(self, api):
+        api._client.request.side_effect = [
+            _make_response(200, {"items": [{"id": "m6"}, {"id": "m5"}]}),
+            _make_response(200, {"items": [{"id": "m4"}, {"id": "m3"}]}),
+            _make_response(200, {"items": [{"id": "m2"}, {"id": "m1"}]}),
+        ]
+
+        messages, reached = await api.list_messages_since("room", "m2", window=2)
+
+        assert reached
+        assert [m["id"] for m in messages] == ["m6", "m5", "m4", "m3"]
+        second = api._client.request.call_args_list[1]
+        assert second.kwargs["params"]["beforeMessage"] == "m5"
+
+    @pytest.mark.asyncio
+    async def test_older_timestamp_stops_when_cursor_was_deleted(self, api):
+        api._client.request.return_value = _make_response(200, {"items": [
+            {"id": "m3", "created": "2026-01-01T00:00:03.000Z"},
+            {"id": "m1", "created": "2026-01-01T00:00:01.000Z"},
+        ]})
+
+        messages, reached = await api.list_messages_since(
+            "room", "m2", cursor_created="2026-01-01T00:00:02.000Z", window=2,
+        )
+
+        assert reached
+        assert [m["id"] for m in messages] == ["m3"]
+
+    @pytest.mark.asyncio
+    async def test_page_limit_reports_cursor_not_reached(self, api):
+        api._client.request.side_effect = [
+            _make_response(200, {"items": [{"id": f"a{i}"}, {"id": f"b{i}"}]}) for i in range(5)
+        ]
+
+        messages, reached = await api.list_messages_since("room", "gone", window=2, max_pages=3)
+
+        assert not reached
+        assert len(messages) == 6
+        assert api._client.request.call_count == 3
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from config import TRACE_FILE
+
+logger = logging.getLogger(__name__)
+
+# Most spans the writer thread serializes and writes in one go
+EXPORT_BATCH = 512
+
+
+@dataclass
+class Span:
+    """One timed step of handling a message. Field names follow OpenTelemetry's span model."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start_ns: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    end_ns: int | None = None
+    error: str | None = None
+    # Work the span waits for beyond its block (see Tracer.hold), and whether the block is done
+    _holds: int = field(default=0, repr=False)
+    _exited: bool = field(default=False, repr=False)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": end_ns,
+            "duration_ms": round((end_ns - self.start_ns) / 1e6, 3),
+            "status": "ERROR" if self.error else "OK",
+            **({"error": self.error} if self.error else {}),
+            "attributes": self.attributes,
+        }
+
+
+# Innermost open span of the current task; asyncio copies it into tasks spawned beneath it
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Records spans for each incoming message and appends them as JSON lines to a file.
+
+    Spans are only recorded inside a trace() block (or a task started from one), so
+    background work such as polling doesn't produce orphan spans. With no path
+    configured every call is a cheap no-op. Finished spans are handed to a writer
+    thread, which serializes and appends them in batches, so the event loop never
+    waits on the disk.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self._path = path
+        self._file = None
+        self._queue: queue.SimpleQueue[Span | None] = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._path is not None
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """Start a new trace whose root span covers the block."""
+        if not self.enabled:
+            yield None
+            return
+        root = Span(name, os.urandom(16).hex(), os.urandom(8).hex(), None, time.time_ns(), attributes)
+        with self._activate(root):
+            yield root
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """Time the block as a child of the current span, if there is a trace in progress."""
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+        child = Span(name, parent.trace_id, os.urandom(8).hex(), parent.span_id, time.time_ns(), attributes)
+        with self._activate(child):
+            yield child
+
+    def record(self, name: str, start: float, end: float, **attributes: Any) -> None:
+        """Record a finished child span from epoch-second timestamps measured elsewhere."""
+        parent = _current.get()
+        if parent is None:
+            return
+        span = Span(name, parent.trace_id, os.urandom(8).hex(), parent.span_id, int(start * 1e9), attributes)
+        span.end_ns = int(end * 1e9)
+        self._export(span)
+
+    def hold(self) -> Callable[[], None]:
+        """Keep the current span open past the end of its block, until the returned callback runs.
+
+        For work that outlives the block, such as a task started from it.
+        """
+        span = _current.get()
+        if span is None:
+            return lambda: None
+        span._holds += 1
+
+        def release() -> None:
+            span._holds -= 1
+            if span._holds == 0 and span._exited:
+                self._end(span)
+
+        return release
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[None]:
+        token = _current.set(span)
+        try:
+            yield
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            span._exited = True
+            if span._holds == 0:
+                self._end(span)
+
+    def _end(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        self._export(span)
+
+    def _export(self, span: Span) -> None:
+        if self._path is None:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_spans, name="trace-writer", daemon=True)
+            self._writer.start()
+        self._queue.put(span)
+
+    def _write_spans(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < EXPORT_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [s for s in batch if s is not None]
+            if spans and self._path is not None:
+                try:
+                    if self._file is None:
+                        self._path.parent.mkdir(parents=True, exist_ok=True)
+                        self._file = open(self._path, "a", encoding="utf-8")
+                    self._file.write("".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans))
+                    self._file.flush()
+                except OSError:
+                    logger.exception("Failed to write spans to %s; tracing disabled", self._path)
+                    self._path = None
+            if None in batch:
+                return
+
+    def close(self) -> None:
+        """Write out the spans still queued and close the file."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+tracer = Tracer(TRACE_FILE)
@@ -2,34 +2,176 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
 import httpx
 
-from config import WEBEX_BASE_URL, WEBEX_BOT_TOKEN
+from config import (
+    WEBEX_BASE_URL,
+    WEBEX_BOT_TOKEN,
+    WEBEX_GET_CACHE_MAX_ENTRIES,
+    WEBEX_GET_CACHE_TTL_SECONDS,
+    WEBEX_JSON_CODEC,
+)
+import cards
+from json_codec import JsonCodec, get_codec
+import metrics
+from retry_policy import IDEMPOTENT_METHODS, CircuitBreaker, RetryBudget, RetryPolicy
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 
+# Failures raised before the request left the client; safe to replay for any method
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# How many times a message POST may be attempted when each failure is ambiguous
+MAX_SEND_ATTEMPTS = 3
+# Recent messages scanned when checking whether an ambiguous POST actually landed
+RECONCILE_WINDOW = 20
+# Tolerated clock difference between us and Webex when matching by creation time
+RECONCILE_CLOCK_SKEW_SECONDS = 30.0
+OUTBOX_MAX_ENTRIES = 200
+# Upper bound on pages fetched when catching up on a room after a burst
+MAX_CATCHUP_PAGES = 10
+ADAPTIVE_CARD_CONTENT_TYPE = "application/vnd.microsoft.card.adaptive"
+
+_request_seconds = metrics.histogram(
+    "bridge_webex_request_seconds", "Latency of individual Webex API HTTP attempts",
+    ("method", "endpoint", "status"),
+)
+_rate_limited = metrics.counter(
+    "bridge_webex_rate_limited_total", "Webex API responses with status 429", ("endpoint",),
+)
+# Path segments that name a resource rather than identify one
+_FIXED_SEGMENTS = {"me", "direct"}
+
+_CacheKey = tuple  # (path, sorted params)
+
+
+def _endpoint(path: str) -> str:
+    """Collapse IDs out of an API path so it can be used as a metric label."""
+    parts = [p for p in path.split("/") if p]
+    return "/" + "/".join(p if i == 0 or p in _FIXED_SEGMENTS else "{id}" for i, p in enumerate(parts))
+
+
+@dataclass
+class _CacheEntry:
+    data: Any
+    etag: str | None
+    fetched_at: float
+
+
+@dataclass
+class _OutboxEntry:
+    """A message we intend to send, kept so an ambiguous POST can be reconciled."""
+
+    key: str
+    room_id: str | None
+    to_email: str | None
+    markdown: str | None
+    text: str | None
+    created_at: float  # Wall clock, comparable with Webex "created"
+    message_id: str | None = None
+
+
+def parse_webex_time(value: str) -> float | None:
+    """Parse a Webex ISO-8601 'created' timestamp into epoch seconds."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _is_ambiguous(exc: Exception) -> bool:
+    """True if a failed POST may still have been accepted by the server."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 and exc.response.status_code != 503
+    return isinstance(exc, httpx.RequestError) and not isinstance(exc, (_UNSENT_ERRORS, CircuitOpenError))
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised without touching the network while the Webex circuit breaker is open."""
+
+
+def _cache_key(path: str, params: dict | None) -> _CacheKey:
+    return (path, tuple(sorted(params.items())) if params else ())
+
+
+def encode_card_message(destination: dict[str, str], card_json: str, fallback_text: str) -> bytes:
+    """Encode a /messages body around an Adaptive Card that is already JSON text."""
+    head = "".join(f"{cards.dumps_str(key)}:{cards.dumps_str(value)}," for key, value in destination.items())
+    return (
+        f'{{{head}"text":{cards.dumps_str(fallback_text)},'
+        f'"attachments":[{{"contentType":"{ADAPTIVE_CARD_CONTENT_TYPE}","content":{card_json}}}]}}'
+    ).encode()
+
+
+def _card_message(destination: dict[str, str], card: dict | str, fallback_text: str) -> dict | bytes:
+    if isinstance(card, str):
+        return encode_card_message(destination, card, fallback_text)
+    return {
+        **destination,
+        "text": fallback_text,
+        "attachments": [{"contentType": ADAPTIVE_CARD_CONTENT_TYPE, "content": card}],
+    }
+
 
 class WebexAPI:
     """Thin async wrapper around the Webex REST API using httpx."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache_ttl: float = WEBEX_GET_CACHE_TTL_SECONDS,
+        retry_policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        base_url: str = WEBEX_BASE_URL,
+        token: str = WEBEX_BOT_TOKEN,
+        codec: JsonCodec | None = None,
+    ) -> None:
+        self._base_url = base_url
+        self._token = token
+        self._codec = codec or get_codec(WEBEX_JSON_CODEC)
         self._client: httpx.AsyncClient | None = None
         self.bot_id: str | None = None
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=MAX_RETRIES)
+        self._budget = RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        # Monotonic deadline of the most recent Retry-After, so callers can ease off
+        self.rate_limited_until = 0.0
+        self._cache_ttl = cache_ttl
+        # Identical GETs issued while one is already on the wire share its result
+        self._inflight: dict[_CacheKey, asyncio.Task] = {}
+        # Recent GET responses, kept for the TTL window and for ETag revalidation
+        self._cache: OrderedDict[_CacheKey, _CacheEntry] = OrderedDict()
+        # Intents of recent message POSTs; delivered IDs are never matched twice
+        self._outbox: OrderedDict[str, _OutboxEntry] = OrderedDict()
 
     async def start(self) -> None:
         """Initialize the HTTP client, verify the token, and cache bot_id."""
+        self.open()
+        await self.verify()
+
+    def open(self) -> None:
+        """Create the HTTP client. Requests can be made before verify() completes."""
         self._client = httpx.AsyncClient(
-            base_url=WEBEX_BASE_URL,
+            base_url=self._base_url,
             headers={
-                "Authorization": f"Bearer {WEBEX_BOT_TOKEN}",
+                "Authorization": f"Bearer {self._token}",
                 "Content-Type": "application/json",
             },
             timeout=30.0,
         )
-        data = await self._request("GET", "/people/me")
+
+    async def verify(self) -> None:
+        """Check the token against /people/me and cache bot_id."""
+        data = await self._get("/people/me")
         self.bot_id = data["id"]
         display_name = data.get("displayName", "Unknown")
         logger.info("Bot authenticated as: %s (id=%s)", display_name, self.bot_id)
@@ -46,122 +188,391 @@ class WebexAPI:
         path: str,
         json: dict | None = None,
         params: dict | None = None,
+        content: bytes | None = None,
     ) -> dict:
-        """Make an API request with rate-limit and transient-error retry handling."""
+        """Make an API request and return the decoded JSON body.
+
+        content is an already-encoded JSON body, sent as-is instead of json.
+        """
+        if method != "GET":
+            self._invalidate(path)
+        response = await self._send(method, path, json=json, params=params, content=content)
+        return self._codec.loads(response.content)
+
+    async def _get(self, path: str, params: dict | None = None) -> dict:
+        """GET with request coalescing, an optional short TTL cache, and ETag revalidation.
+
+        The returned dict may be shared with other callers and must not be mutated.
+        """
+        key = _cache_key(path, params)
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry.fetched_at < self._cache_ttl:
+            self._cache.move_to_end(key)
+            return entry.data
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, path, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_fetch_done(key, t))
+        # Shield so one caller being cancelled doesn't abort the request for the others
+        return await asyncio.shield(task)
+
+    def _on_fetch_done(self, key: _CacheKey, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; awaiting callers still see it
+
+    async def _fetch(self, key: _CacheKey, path: str, params: dict | None) -> dict:
+        entry = self._cache.get(key)
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+        response = await self._send("GET", path, params=params, headers=headers)
+
+        if response.status_code == 304:
+            if headers is not None:
+                # Evicted or invalidated while in flight: the server vouched for this copy
+                entry.fetched_at = time.monotonic()
+                self._store(key, entry)
+                return entry.data
+            # Nothing to revalidate against: ask again for the full body
+            response = await self._send("GET", path, params=params)
+            if response.status_code == 304:
+                raise httpx.HTTPStatusError(
+                    "304 Not Modified for an unconditional GET", request=response.request, response=response,
+                )
+
+        data = self._codec.loads(response.content)
+        etag = response.headers.get("ETag")
+        if self._cache_ttl > 0 or etag:
+            self._store(key, _CacheEntry(data=data, etag=etag, fetched_at=time.monotonic()))
+        return data
+
+    def _store(self, key: _CacheKey, entry: _CacheEntry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > WEBEX_GET_CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def _invalidate(self, path: str) -> None:
+        """Drop cached GETs for the resource family a write touches (e.g. /messages/...)."""
+        family = path.split("/", 2)[1] if path.startswith("/") else path
+        stale = [k for k in self._cache if k[0].split("/", 2)[1] == family]
+        for k in stale:
+            del self._cache[k]
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        json: dict | None = None,
+        params: dict | None = None,
+        headers: dict | None = None,
+        idempotent: bool | None = None,
+        content: bytes | None = None,
+    ) -> httpx.Response:
+        """Send a request with rate-limit and transient-error retry handling.
+
+        Non-idempotent requests (POST) are only replayed when the failure proves the
+        server never acted on them: connect-phase errors, 429 and 503.
+        """
         if self._client is None:
             raise RuntimeError("Call start() before making requests")
+        if json is not None:
+            content = self._codec.dumps(json)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if not self.breaker.allow():
+            raise self._circuit_open()
 
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                response = await self._client.request(method, path, json=json, params=params)
-            except httpx.RequestError as exc:
-                # Transient network errors (connect, read, DNS, etc.)
-                if attempt < MAX_RETRIES:
-                    wait = min(2 ** attempt, 30)
+        policy = self._retry_policy
+        self._budget.record_request()
+        started = time.monotonic()
+        endpoint = _endpoint(path)
+        delay = 0.0
+        # The half-open probe must end in an outcome, or the breaker never lets another through
+        probing = self.breaker.is_open
+        try:
+            for attempt in range(1, policy.max_attempts + 1):
+                if attempt > 1:
+                    # Earlier attempts may have opened the breaker; retries obey it like new calls
+                    was_open = self.breaker.is_open
+                    if not self.breaker.allow():
+                        raise self._circuit_open()
+                    probing = probing or was_open
+                last_attempt = attempt == policy.max_attempts
+                sent, sent_at = time.perf_counter(), time.time()
+                try:
+                    response = await self._client.request(
+                        method, path, content=content, params=params, headers=headers,
+                    )
+                except httpx.RequestError as exc:
+                    _request_seconds.observe(time.perf_counter() - sent, method=method, endpoint=endpoint, status="error")
+                    tracer.record("webex.request", sent_at, time.time(), method=method, endpoint=endpoint, status="error")
+                    # Transient network errors (connect, read, DNS, etc.)
+                    self.breaker.record_failure()
+                    replayable = idempotent or isinstance(exc, _UNSENT_ERRORS)
+                    if replayable and not last_attempt:
+                        delay = policy.next_delay(delay)
+                        if self._may_retry(started, delay):
+                            logger.warning(
+                                "Request error (attempt %d/%d): %s — retrying in %.1fs",
+                                attempt, policy.max_attempts, exc, delay,
+                            )
+                            await asyncio.sleep(delay)
+                            continue
+                    elif not replayable:
+                        logger.warning("Request error on %s %s, not replaying non-idempotent request: %s", method, path, exc)
+                    raise
+
+                _request_seconds.observe(
+                    time.perf_counter() - sent, method=method, endpoint=endpoint, status=str(response.status_code),
+                )
+                tracer.record(
+                    "webex.request", sent_at, time.time(), method=method, endpoint=endpoint, status=response.status_code,
+                )
+                if response.status_code == 429:
+                    _rate_limited.inc(endpoint=endpoint)
+                    # The server is alive, just busy: that resolves a probe, and isn't a failure
+                    self.breaker.record_success()
+                    try:
+                        retry_after = min(int(response.headers.get("Retry-After", "5")), policy.max_retry_after)
+                    except ValueError:
+                        retry_after = 5
+                    self.rate_limited_until = time.monotonic() + retry_after
+                    if last_attempt or time.monotonic() - started + retry_after > policy.max_elapsed:
+                        break
                     logger.warning(
-                        "Request error (attempt %d/%d): %s — retrying in %ds",
-                        attempt, MAX_RETRIES, exc, wait,
+                        "Rate limited (attempt %d/%d), retrying in %ds",
+                        attempt, policy.max_attempts, retry_after,
                     )
-                    await asyncio.sleep(wait)
+                    await asyncio.sleep(retry_after)
                     continue
-                raise
 
-            if response.status_code == 429:
-                try:
-                    retry_after = min(int(response.headers.get("Retry-After", "5")), 60)
-                except ValueError:
-                    retry_after = 5
-                logger.warning(
-                    "Rate limited (attempt %d/%d), retrying in %ds",
-                    attempt, MAX_RETRIES, retry_after,
-                )
-                await asyncio.sleep(retry_after)
-                continue
+                if response.status_code == 401:
+                    logger.error("Authentication failed (401). Check WEBEX_BOT_TOKEN.")
+                    raise SystemExit("Fatal: Webex API returned 401 Unauthorized.")
 
-            if response.status_code == 401:
-                logger.error("Authentication failed (401). Check WEBEX_BOT_TOKEN.")
-                raise SystemExit("Fatal: Webex API returned 401 Unauthorized.")
+                # Retry on transient server errors (5xx)
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                    if (idempotent or response.status_code == 503) and not last_attempt:
+                        delay = policy.next_delay(delay)
+                        if self._may_retry(started, delay):
+                            logger.warning(
+                                "Server error %d (attempt %d/%d), retrying in %.1fs",
+                                response.status_code, attempt, policy.max_attempts, delay,
+                            )
+                            await asyncio.sleep(delay)
+                            continue
+                    response.raise_for_status()
 
-            # Retry on transient server errors (5xx)
-            if response.status_code >= 500 and attempt < MAX_RETRIES:
-                wait = min(2 ** attempt, 30)
-                logger.warning(
-                    "Server error %d (attempt %d/%d), retrying in %ds",
-                    response.status_code, attempt, MAX_RETRIES, wait,
-                )
-                await asyncio.sleep(wait)
-                continue
+                self.breaker.record_success()
+                if response.status_code == 304:
+                    return response
 
-            response.raise_for_status()
-            return response.json()
+                response.raise_for_status()
+                return response
 
-        # Exhausted retries
-        logger.error("Retries exhausted after %d attempts", MAX_RETRIES)
-        raise httpx.HTTPStatusError(
-            "Retries exhausted",
-            request=response.request,
-            response=response,
-        )
+            # Exhausted retries
+            logger.error("Retries exhausted after %d attempts", attempt)
+            raise httpx.HTTPStatusError(
+                "Retries exhausted",
+                request=response.request,
+                response=response,
+            )
+        finally:
+            if probing:
+                self.breaker.release_probe()
+
+    def _circuit_open(self) -> CircuitOpenError:
+        return CircuitOpenError(f"Webex API circuit open, next probe in {self.breaker.retry_in():.0f}s")
+
+    def _may_retry(self, started: float, delay: float) -> bool:
+        """Check the per-call deadline and the shared retry budget before backing off."""
+        if time.monotonic() - started + delay > self._retry_policy.max_elapsed:
+            return False
+        if not self._budget.try_spend():
+            logger.warning("Retry budget exhausted, failing fast")
+            return False
+        return True
 
     async def list_direct_rooms(self, max_rooms: int = 50) -> list[dict]:
         """List direct (1:1) rooms sorted by last activity."""
-        data = await self._request(
-            "GET",
+        data = await self._get(
             "/rooms",
             params={"type": "direct", "sortBy": "lastactivity", "max": str(max_rooms)},
         )
-        return data.get("items", [])
-
-    async def list_messages(self, room_id: str, max_messages: int = 10) -> list[dict]:
-        """List messages in a room (newest first)."""
-        data = await self._request(
-            "GET",
-            "/messages",
-            params={"roomId": room_id, "max": str(max_messages)},
-        )
-        return data.get("items", [])
+        return list(data.get("items", []))
+
+    async def find_direct_room(self, email: str) -> str | None:
+        """ID of the bot's 1:1 room with a person, or None if they have never talked."""
+        data = await self._get("/messages/direct", params={"personEmail": email})
+        items = data.get("items", [])
+        return items[0].get("roomId") if items else None
+
+    async def list_messages(
+        self,
+        room_id: str,
+        max_messages: int = 10,
+        before_message: str | None = None,
+    ) -> list[dict]:
+        """List messages in a room (newest first), optionally only those before a message ID."""
+        params = {"roomId": room_id, "max": str(max_messages)}
+        if before_message:
+            params["beforeMessage"] = before_message
+        data = await self._get("/messages", params=params)
+        return list(data.get("items", []))
+
+    async def list_messages_since(
+        self,
+        room_id: str,
+        cursor_id: str,
+        cursor_created: str = "",
+        window: int = 10,
+        max_pages: int = MAX_CATCHUP_PAGES,
+    ) -> tuple[list[dict], bool]:
+        """Return messages newer than cursor_id (newest first) and whether the cursor was reached.
+
+        Fetches one window and, if the cursor isn't in it, pages backwards with
+        beforeMessage until it is. A message older than cursor_created also ends the
+        walk, so a deleted cursor message doesn't send us to max_pages.
+        """
+        cursor_time = parse_webex_time(cursor_created) if cursor_created else None
+        collected: list[dict] = []
+        page = await self.list_messages(room_id, max_messages=window)
+        for page_number in range(1, max_pages + 1):
+            for msg in page:
+                if msg["id"] == cursor_id:
+                    return collected, True
+                created = parse_webex_time(msg.get("created", "")) if cursor_time is not None else None
+                if created is not None and created < cursor_time:
+                    return collected, True
+                collected.append(msg)
+            if len(page) < window or page_number == max_pages:
+                break
+            page = await self.list_messages(room_id, max_messages=window, before_message=page[-1]["id"])
+        return collected, len(page) < window
 
     async def send_message(self, room_id: str, text: str) -> dict:
         """Send a text message to a room."""
-        return await self._request(
-            "POST",
-            "/messages",
-            json={"roomId": room_id, "markdown": text},
+        return await self._post_message(
+            {"roomId": room_id, "markdown": text},
+            room_id=room_id,
+            markdown=text,
         )
 
-    async def send_card_message(self, room_id: str, card: dict, fallback_text: str) -> dict:
-        """Send a message with an Adaptive Card attachment."""
-        return await self._request(
-            "POST",
-            "/messages",
-            json={
-                "roomId": room_id,
-                "text": fallback_text,
-                "attachments": [
-                    {
-                        "contentType": "application/vnd.microsoft.card.adaptive",
-                        "content": card,
-                    }
-                ],
-            },
+    async def send_card_message(self, room_id: str, card: dict | str, fallback_text: str) -> dict:
+        """Send a message with an Adaptive Card attachment (a dict, or JSON text from cards.py)."""
+        return await self._post_message(
+            _card_message({"roomId": room_id}, card, fallback_text),
+            room_id=room_id,
+            text=fallback_text,
         )
 
-    async def send_card_to_email(self, email: str, card: dict, fallback_text: str) -> dict:
+    async def send_card_to_email(self, email: str, card: dict | str, fallback_text: str) -> dict:
         """Send a message with an Adaptive Card to a person by email (creates 1:1 room if needed)."""
-        return await self._request(
-            "POST",
-            "/messages",
-            json={
-                "toPersonEmail": email,
-                "text": fallback_text,
-                "attachments": [
-                    {
-                        "contentType": "application/vnd.microsoft.card.adaptive",
-                        "content": card,
-                    }
-                ],
-            },
+        return await self._post_message(
+            _card_message({"toPersonEmail": email}, card, fallback_text),
+            to_email=email,
+            text=fallback_text,
+        )
+
+    async def send_encoded_message(
+        self,
+        body: bytes,
+        room_id: str | None = None,
+        to_email: str | None = None,
+        text: str | None = None,
+    ) -> dict:
+        """Send a pre-encoded /messages body (see encode_card_message) to room_id or to_email.
+
+        text is the body's fallback text, used to find the message if delivery is ambiguous.
+        """
+        return await self._post_message(body, room_id=room_id, to_email=to_email, text=text)
+
+    async def _post_message(
+        self,
+        body: dict | bytes,
+        room_id: str | None = None,
+        to_email: str | None = None,
+        markdown: str | None = None,
+        text: str | None = None,
+    ) -> dict:
+        """POST a message with at-most-once semantics across ambiguous failures.
+
+        The intent is recorded in the outbox first. If the connection drops after the
+        request may have reached Webex, recent messages are checked for our copy before
+        anything is resent.
+        """
+        entry = _OutboxEntry(
+            key=uuid.uuid4().hex,
+            room_id=room_id,
+            to_email=to_email,
+            markdown=markdown,
+            text=text,
+            created_at=time.time(),
         )
+        self._outbox[entry.key] = entry
+        while len(self._outbox) > OUTBOX_MAX_ENTRIES:
+            self._outbox.popitem(last=False)
+
+        attempt = 1
+        while True:
+            try:
+                if isinstance(body, bytes):
+                    result = await self._request("POST", "/messages", content=body)
+                else:
+                    result = await self._request("POST", "/messages", json=body)
+            except (httpx.HTTPStatusError, httpx.RequestError) as exc:
+                if not _is_ambiguous(exc) or attempt >= MAX_SEND_ATTEMPTS:
+                    raise
+                # Give Webex a moment to make the message visible before looking for it
+                await asyncio.sleep(self._retry_policy.next_delay(0.0))
+                try:
+                    existing = await self._reconcile(entry)
+                except Exception as reconcile_exc:
+                    # Without the lookup a resend could duplicate; report the POST's failure, not the lookup's
+                    logger.warning("Could not check whether message %s was delivered: %s", entry.key[:8], reconcile_exc)
+                    raise exc from reconcile_exc
+                if existing is not None:
+                    logger.info("Message %s was delivered despite %s; not resending", entry.key[:8], exc)
+                    entry.message_id = existing.get("id")
+                    return existing
+                logger.warning(
+                    "Message %s not delivered (attempt %d/%d): %s — resending",
+                    entry.key[:8], attempt, MAX_SEND_ATTEMPTS, exc,
+                )
+                attempt += 1
+                continue
+            entry.message_id = result.get("id")
+            return result
+
+    async def _reconcile(self, entry: _OutboxEntry) -> dict | None:
+        """Find a message matching an outbox entry among the bot's recent messages.
+
+        Reads bypass the GET cache and coalescing so the result reflects the POST.
+        """
+        if entry.room_id is not None:
+            path, params = "/messages", {"roomId": entry.room_id, "max": str(RECONCILE_WINDOW)}
+        else:
+            path, params = "/messages/direct", {"personEmail": entry.to_email}
+        response = await self._send("GET", path, params=params)
+        messages = self._codec.loads(response.content).get("items", [])
+
+        delivered = {e.message_id for e in self._outbox.values() if e.message_id}
+        not_before = entry.created_at - RECONCILE_CLOCK_SKEW_SECONDS
+        for msg in messages:
+            if msg.get("personId") != self.bot_id or msg.get("id") in delivered:
+                continue
+            created = parse_webex_time(msg.get("created", ""))
+            if created is not None and created < not_before:
+                continue
+            if entry.markdown is not None and msg.get("markdown") == entry.markdown:
+                return msg
+            if entry.markdown is None and entry.text is not None and msg.get("text") == entry.text:
+                return msg
+        return None
 
     async def edit_message(self, message_id: str, room_id: str, text: str) -> dict | None:
         """Edit an existing message. Returns None on failure (caller should fallback)."""